@@ -1,5 +1,11 @@
 # actuarial-fastapi/api/auth_deps.py
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
@@ -12,18 +18,108 @@ JWT_SIGNING_KEY = (
     or "dev-secret"
 )
 ALGORITHM = os.environ.get("SIMPLE_JWT_ALGORITHM", "HS256")
+# number of verified tokens kept in memory; 0 disables the cache
+JWT_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE", 4096))
 
 
-def verify_jwt(creds: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+class VerifiedTokenCache:
     """
-    Simple dependency to verify HS256 JWT issued by Django SimpleJWT.
-    Returns decoded payload dict on success or raises HTTPException(401).
+    Bounded LRU of already-verified token payloads.
+
+    Entries are keyed by a 16-byte BLAKE2b digest of the raw token (not the token
+    itself) and remember the token's `exp`, so an expired token is never served
+    from cache: it is dropped and re-verified, which raises the usual 401.
+    """
+
+    def __init__(self, maxsize: int = JWT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[dict]:
+        if self.maxsize <= 0:
+            return None
+        key = self._key(token)
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            exp, payload = entry
+            if exp is not None and now >= exp:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(payload)
+
+    def put(self, token: str, payload: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        exp = payload.get("exp")
+        exp = float(exp) if isinstance(exp, (int, float)) else None
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (exp, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+token_cache = VerifiedTokenCache()
+
+
+def decode_token(token: str) -> dict:
+    """
+    Verify an HS256 JWT issued by Django SimpleJWT and return its payload;
+    raises HTTPException(401). Verified payloads are cached until their `exp`
+    (see VerifiedTokenCache).
     """
-    token = creds.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, JWT_SIGNING_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    token_cache.put(token, payload)
+    return payload
+
+
+def verify_jwt(creds: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """
+    Simple dependency to verify HS256 JWT issued by Django SimpleJWT.
+    Returns decoded payload dict on success or raises HTTPException(401).
+    """
+    return decode_token(creds.credentials)
@@ -3,27 +3,133 @@
 Dependency helpers for the actuarial-fastapi service.
 
 Provides:
-- get_request_id(): simple UUID request id dependency
-- run_pensionlib(): run CPU-bound pensionlib code in threadpool
+- get_request_id(): the request's id (the caller's X-Request-ID when sent)
+- get_cancel_token(): stop flag for client disconnect / propagated deadline
+- run_pensionlib(): run CPU-bound pensionlib code in threadpool (timed: queue wait vs compute;
+  refuses to start once the request deadline has passed)
 - get_simple_logger(): convenience for routes/tests (optional)
 """
 
 import asyncio
+import contextvars
 import functools
 import logging
-import uuid
-from typing import Any, Callable
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request
+from pensionlib.cancel import Cancelled
+
+from . import metrics, profiling, tracing
 
 logger = logging.getLogger("pensionlib_api.deps")
 
 
-def get_request_id() -> str:
+def get_request_id(request: Request) -> str:
     """
-    Dependency that returns a unique request id (UUID hex string).
+    Dependency that returns this request's id: the one RequestIDLoggingMiddleware
+    assigned (so route logs match request.start/end), else the caller's
+    X-Request-ID, else a new UUID hex string.
     Use in routes like:
         request_id: str = Depends(deps.get_request_id)
     """
-    return uuid.uuid4().hex
+    rid = getattr(request.state, "request_id", None)
+    return rid or tracing.incoming_request_id(request.headers)
+
+
+# seconds the caller is still prepared to wait (set by the Django proxy);
+# relative rather than absolute so clock skew between hosts does not matter
+DEADLINE_HEADER = tracing.DEADLINE_HEADER
+# 499: client closed request (nginx convention); nobody reads the body
+CLIENT_CLOSED_REQUEST = 499
+
+
+class CancelToken:
+    """
+    Set once the client disconnects or the propagated deadline passes.
+
+    should_stop() is thread-safe, so it can be passed as `should_stop` to
+    pensionlib loops running in the executor. Disconnects can only be seen
+    from the event loop: call `await token.check()` between chunks, or wrap
+    a long executor call in `await token.wait(...)`.
+    """
+
+    def __init__(
+        self, request: Optional[Request] = None, timeout: Optional[float] = None
+    ):
+        self.request = request
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.reason: Optional[str] = None  # "disconnected" | "deadline" | "superseded"
+        self._stopped = threading.Event()
+
+    def cancel(self, reason: str) -> None:
+        if not self._stopped.is_set():
+            self.reason = reason
+            self._stopped.set()
+
+    def should_stop(self) -> bool:
+        if self._stopped.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+            return True
+        return False
+
+    async def check(self) -> bool:
+        """should_stop(), also polling the client connection."""
+        if (
+            not self._stopped.is_set()
+            and self.request is not None
+            and await self.request.is_disconnected()
+        ):
+            self.cancel("disconnected")
+        return self.should_stop()
+
+    async def wait(self, awaitable, interval: float = 0.1):
+        """
+        Await `awaitable` (e.g. a run_pensionlib call whose loop polls
+        should_stop), calling check() every `interval` seconds meanwhile.
+        Polling happens in the request's own task: is_disconnected() must not
+        run from a side task under BaseHTTPMiddleware.
+        """
+        work = asyncio.ensure_future(awaitable)
+        try:
+            while True:
+                done, _ = await asyncio.wait({work}, timeout=interval)
+                if done:
+                    return work.result()
+                await self.check()  # once set, the executor loop raises Cancelled
+        finally:
+            if not work.done():
+                work.cancel()
+
+    def error(self, route: str) -> HTTPException:
+        """HTTP error for a request stopped early (counted per route/reason)."""
+        return cancelled_error(route, self.reason or "deadline")
+
+
+def cancelled_error(route: str, reason: str = "deadline") -> HTTPException:
+    """504 (deadline) or 499 (client gone), counted in cancelled_requests_total."""
+    metrics.CANCELLED_REQUESTS.inc(route=route, reason=reason)
+    if reason == "deadline":
+        return HTTPException(status_code=504, detail="Request deadline exceeded")
+    return HTTPException(
+        status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request"
+    )
+
+
+def get_cancel_token(request: Request) -> CancelToken:
+    """
+    Dependency: a CancelToken for this request, with the deadline set by
+    RequestIDLoggingMiddleware, or read from DEADLINE_HEADER when the
+    middleware is not mounted (malformed or negative values are ignored).
+        token: deps.CancelToken = Depends(deps.get_cancel_token)
+    """
+    timeout = tracing.remaining()
+    if timeout is None:
+        timeout = tracing.parse_timeout(request.headers.get(DEADLINE_HEADER))
+    return CancelToken(request, timeout)
 
 
 async def run_pensionlib(fn: Callable[..., Any], *args, **kwargs) -> Any:
@@ -34,12 +140,42 @@ async def run_pensionlib(fn: Callable[..., Any], *args, **kwargs) -> Any:
         out = await deps.run_pensionlib(project_dc_account, inp)
 
     This prevents blocking the async event loop for CPU-bound or blocking calls.
+    Queue wait and compute time are recorded as request spans; if the request
+    deadline passed while the call was queued, it raises Cancelled instead of
+    computing a result nobody will read.
     """
     loop = asyncio.get_running_loop()
     call = functools.partial(fn, *args, **kwargs)
+    name = getattr(fn, "__name__", "call")
+    # executor threads do not inherit contextvars: resolve the session here
+    session = profiling.profile_session_ctx.get()
+    timings = tracing.timings_ctx.get()
+    deadline = tracing.deadline_ctx.get()
+    submitted = time.perf_counter()
+
+    def timed_call():
+        started = time.perf_counter()
+        metrics.PENSIONLIB_QUEUE_WAIT.observe(started - submitted, fn=name)
+        if timings is not None:
+            timings.add("queue", started - submitted)
+        if deadline is not None and time.monotonic() >= deadline:
+            raise Cancelled(f"deadline passed before {name} started")
+        try:
+            return call() if session is None else session.run(call)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.PENSIONLIB_COMPUTE.observe(elapsed, fn=name)
+            if timings is not None:
+                timings.add("compute", elapsed)
+
     try:
-        result = await loop.run_in_executor(None, call)
+        # executor threads start with an empty context: run in a copy of this
+        # one so log records keep the request id and route (sampling rules)
+        context = contextvars.copy_context()
+        result = await loop.run_in_executor(None, context.run, timed_call)
         return result
+    except Cancelled:
+        raise  # asked to stop (CancelToken): not a failure
     except Exception:
         logger.exception("run_pensionlib.failed")
         # re-raise so the route can map this to HTTP 500/502 as appropriate
@@ -0,0 +1,180 @@
+# actuarial-fastapi/api/live.py
+"""
+Live scenario preview over a WebSocket: /v1/dc/live
+
+Client -> server, one JSON message per edit: a /dc/balances body plus an
+increasing "seq":
+    {"seq": 7, "current_balance": "10000.00", "annual_salary": "40000.00",
+     "years": 30, "assumptions": {"contribution_rate": "0.10", ...}}
+
+Server -> client, only for the latest edit:
+    {"type": "projection", "seq": 7, "result": <DCResponse>}
+    {"type": "error", "seq": 7, "detail": "..."}
+
+Edits are debounced: a projection starts once the client has paused for
+LIVE_DEBOUNCE_MS (default 150). An edit that arrives while a projection is
+running cancels it, so a burst of keystrokes costs one exact pensionlib
+projection instead of one per keystroke.
+
+Browsers cannot set headers on a WebSocket, and a ?token= query string ends
+up in access logs, so the JWT travels in Sec-WebSocket-Protocol: the client
+offers ["pensionlib.v1", "bearer.<jwt>"] and the server selects
+"pensionlib.v1" (the token is required unless FASTAPI_AUTH_REQUIRED=0).
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pensionlib import engine
+from pensionlib import models as pension_models
+
+from . import deps, schemas
+from .auth_deps import decode_token
+from .routes import FASTAPI_AUTH_REQUIRED
+
+logger = logging.getLogger("pensionlib_api.live")
+
+DEBOUNCE_SECONDS = int(os.environ.get("LIVE_DEBOUNCE_MS", 150)) / 1000.0
+MAX_MESSAGE_BYTES = 16_384
+# 1008: policy violation (RFC 6455), used for missing/invalid tokens
+WS_POLICY_VIOLATION = 1008
+# Sec-WebSocket-Protocol values: the one the server selects, and the prefix of
+# the one carrying the token (never echoed back)
+SUBPROTOCOL = "pensionlib.v1"
+TOKEN_SUBPROTOCOL_PREFIX = "bearer."
+
+router = APIRouter()
+
+
+async def project_scenario(payload: dict, should_stop=None) -> dict:
+    """
+    One projection as a server -> client message (without seq). should_stop
+    is polled by the projection loop in the executor thread.
+    """
+    try:
+        req = schemas.DCRequest.model_validate(payload)
+        inp = pension_models.DCProjectionInput(
+            current_balance=req.current_balance,
+            annual_salary=req.annual_salary,
+            contribution_rate=req.assumptions.contribution_rate,
+            salary_growth=req.assumptions.salary_growth,
+            rate_of_return=req.assumptions.rate_of_return,
+            years=req.years,
+        )
+    except Exception as e:
+        return {"type": "error", "detail": f"Invalid input: {e}"}
+    if req.precision == engine.FAST:
+        result = await deps.run_pensionlib(engine.fast_projection, inp, should_stop)
+    else:
+        out = await deps.run_pensionlib(
+            engine.project_dc, inp, req.precision, should_stop
+        )
+        result = out.model_dump(mode="json")
+    return {"type": "projection", "result": result}
+
+
+class LiveSession:
+    """Debounce edits from one socket and answer only the newest one."""
+
+    def __init__(self, websocket: WebSocket, debounce: float = DEBOUNCE_SECONDS):
+        self.websocket = websocket
+        self.debounce = debounce
+        self.edits = 0
+        self.latest = None  # (edit number, seq, payload) of the newest edit
+        self.edited = asyncio.Event()
+        self.computing: Optional[asyncio.Task] = None
+        self.stop: Optional[deps.CancelToken] = None  # stops self.computing's thread
+
+    async def run(self) -> None:
+        worker = asyncio.create_task(self._answer_latest())
+        try:
+            while True:
+                raw = await self.websocket.receive_text()
+                try:
+                    if len(raw) > MAX_MESSAGE_BYTES:
+                        raise ValueError("message too large")
+                    payload = json.loads(raw)
+                    if not isinstance(payload, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as e:
+                    await self.websocket.send_json(
+                        {"type": "error", "seq": None, "detail": str(e)}
+                    )
+                    continue
+                self.edits += 1
+                self.latest = (self.edits, payload.pop("seq", None), payload)
+                self.edited.set()
+                self._cancel_computing()  # made stale by this edit
+        except WebSocketDisconnect:
+            pass
+        finally:
+            computing = self.computing
+            self._cancel_computing()
+            worker.cancel()
+            await asyncio.gather(
+                worker, *filter(None, [computing]), return_exceptions=True
+            )
+
+    def _cancel_computing(self) -> None:
+        """Cancel the running projection, its executor thread included."""
+        if self.computing is not None:
+            self.stop.cancel("superseded")
+            self.computing.cancel()
+
+    async def _answer_latest(self) -> None:
+        while True:
+            await self.edited.wait()
+            # wait for a pause in the edits
+            while True:
+                self.edited.clear()
+                try:
+                    await asyncio.wait_for(self.edited.wait(), self.debounce)
+                except asyncio.TimeoutError:
+                    break
+            edit, seq, payload = self.latest
+            self.stop = deps.CancelToken()
+            self.computing = asyncio.create_task(
+                project_scenario(payload, self.stop.should_stop)
+            )
+            try:
+                # asyncio.wait does not raise when only the projection is cancelled
+                await asyncio.wait({self.computing})
+            finally:
+                task, self.computing = self.computing, None
+            if task.cancelled() or self.latest[0] != edit:
+                continue  # a newer edit is pending
+            try:
+                message = task.result()
+            except Exception as exc:
+                logger.exception("dc_live.runtime_error")
+                message = {"type": "error", "detail": f"Projection engine error: {exc}"}
+            await self.websocket.send_json({"seq": seq, **message})
+
+
+def subprotocol_token(websocket: WebSocket) -> Optional[str]:
+    """The JWT offered as "bearer.<jwt>" in Sec-WebSocket-Protocol, if any."""
+    for protocol in websocket.scope.get("subprotocols", []):
+        if protocol.startswith(TOKEN_SUBPROTOCOL_PREFIX):
+            return protocol[len(TOKEN_SUBPROTOCOL_PREFIX) :]
+    return None
+
+
+@router.websocket("/dc/live")
+async def dc_live(websocket: WebSocket):
+    token = subprotocol_token(websocket)
+    if token:
+        try:
+            decode_token(token)
+        except HTTPException:
+            await websocket.close(code=WS_POLICY_VIOLATION)
+            return
+    elif FASTAPI_AUTH_REQUIRED:
+        await websocket.close(code=WS_POLICY_VIOLATION)
+        return
+    offered = websocket.scope.get("subprotocols", [])
+    await websocket.accept(subprotocol=SUBPROTOCOL if SUBPROTOCOL in offered else None)
+    await LiveSession(websocket, DEBOUNCE_SECONDS).run()
@@ -1,15 +1,154 @@
 # api/logging_config.py
+"""
+Non-blocking JSON logging for the actuarial-fastapi service.
+
+Request code only enqueues records (QueueHandler); a background QueueListener
+thread formats them as JSON and writes to stderr. Before a record is enqueued,
+RouteSamplingFilter applies per-route level floors and sampling rates, so
+dropped records cost one dict lookup on the event-loop thread.
+
+Environment:
+- LOG_LEVEL: root level (default INFO)
+- LOG_ROUTE_LEVELS: "/v1/dc/project=WARNING,/metrics=ERROR" (path prefix -> min level)
+- LOG_SAMPLE_RATES: "/v1/dc/project=0.05" (path prefix -> fraction of sub-WARNING records kept)
+- LOG_QUEUE_SIZE: max queued records; beyond it records are dropped, not blocked on
+"""
+
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import random
+from typing import Dict, Optional
+
 from pythonjsonlogger import jsonlogger
 
+from .middleware import request_id_ctx, route_ctx
 
-def configure_logging():
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    # JSON formatter
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _parse_mapping(raw: str) -> Dict[str, str]:
+    out = {}
+    for part in (raw or "").split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            if key.strip():
+                out[key.strip()] = value.strip()
+    return out
+
+
+class ContextFilter(logging.Filter):
+    """Stamp request_id / route from the request contextvars onto every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_ctx.get()
+        if getattr(record, "route", None) is None:
+            record.route = route_ctx.get()
+        return True
+
+
+class RouteSamplingFilter(logging.Filter):
+    """
+    Per-route level floor and sampling. Rules are keyed by path prefix; the
+    longest matching prefix wins. WARNING and above are never sampled out.
+    """
+
+    def __init__(
+        self,
+        levels: Optional[Dict[str, int]] = None,
+        rates: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__()
+        self.levels = levels or {}
+        self.rates = rates or {}
+        self._prefixes = sorted(
+            set(self.levels) | set(self.rates), key=len, reverse=True
+        )
+        # route -> (min_level, sample_rate); routes are a small bounded set
+        self._resolved: Dict[str, tuple] = {}
+
+    def _rule(self, route: str) -> tuple:
+        rule = self._resolved.get(route)
+        if rule is None:
+            level, rate = logging.NOTSET, 1.0
+            for prefix in self._prefixes:
+                if route.startswith(prefix):
+                    level = self.levels.get(prefix, level)
+                    rate = self.rates.get(prefix, rate)
+                    break
+            rule = (level, rate)
+            if len(self._resolved) < 1024:
+                self._resolved[route] = rule
+        return rule
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self._prefixes:
+            return True
+        level, rate = self._rule(route_ctx.get())
+        if record.levelno < level:
+            return False
+        if record.levelno < logging.WARNING and rate < 1.0:
+            return random.random() < rate
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def _json_handler() -> logging.Handler:
     handler = logging.StreamHandler()
     formatter = jsonlogger.JsonFormatter(
-        "%(asctime)s %(name)s %(levelname)s %(request_id)s %(message)s"
+        "%(asctime)s %(name)s %(levelname)s %(request_id)s %(route)s %(message)s"
     )
     handler.setFormatter(formatter)
+    return handler
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        # stop() drains what is already queued before returning
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(level: Optional[str] = None):
+    global _listener
+    _stop_listener()
+
+    logger = logging.getLogger()
+    logger.setLevel(level or os.environ.get("LOG_LEVEL", "INFO"))
+
+    levels = {
+        prefix: logging.getLevelNamesMapping()[name.upper()]
+        for prefix, name in _parse_mapping(os.environ.get("LOG_ROUTE_LEVELS")).items()
+    }
+    rates = {
+        prefix: float(rate)
+        for prefix, rate in _parse_mapping(os.environ.get("LOG_SAMPLE_RATES")).items()
+    }
+
+    log_queue: queue.Queue = queue.Queue(int(os.environ.get("LOG_QUEUE_SIZE", 10_000)))
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(RouteSamplingFilter(levels=levels, rates=rates))
+    handler.addFilter(ContextFilter())
     logger.handlers = [handler]
+
+    _listener = logging.handlers.QueueListener(log_queue, _json_handler())
+    _listener.start()
+    return _listener
+
+
+atexit.register(_stop_listener)
@@ -1,17 +1,43 @@
 ﻿# api/main.py
 # Run with: uvicorn api.main:app --reload --port 8001
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+import contextlib
 import datetime
+from typing import Tuple
 
 import os
 import logging
 
-logger = logging.getLogger("uvicorn.error")
-logger.setLevel(logging.INFO)
+from pensionlib import engine
+from pensionlib.cancel import Cancelled
+from pensionlib.models import DCProjectionInput
+
+from . import deps, live, metrics, ratelimit, routes, tracing
+from .logging_config import configure_logging
+from .middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    RequestIDLoggingMiddleware,
+    SimpleRateLimitMiddleware,
+)
+
+configure_logging()
+logger = logging.getLogger("pensionlib_api.main")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # metrics flusher is a no-op unless METRICS_MULTIPROC_DIR is set (multi-worker)
+    metrics.REGISTRY.start_flusher()
+    yield
+    metrics.REGISTRY.stop_flusher()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
+# record a "serialize" span for routes declared on the app (see api/tracing.py)
+app.router.route_class = tracing.TimedRoute
 
 # CORS - allow your Vite dev server + localhost
 origins = [
@@ -25,6 +51,10 @@ env_origins = os.environ.get("FASTAPI_CORS_ORIGINS")
 if env_origins:
     origins = [o.strip() for o in env_origins.split(",") if o.strip()]
 
+# per-client token buckets (api/ratelimit.py); RATE_LIMIT_MAX=0 disables them.
+# Added first so it runs inside CORS and 429s still carry CORS headers.
+if ratelimit.RATE_LIMIT_MAX > 0:
+    app.add_middleware(SimpleRateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -32,15 +62,37 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestIDLoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+
+# the pensionlib API (api/routes.py) and the live preview socket (api/live.py)
+app.include_router(routes.router, prefix="/v1")
+app.include_router(live.router, prefix="/v1")
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus text exposition, merged across workers (see api/metrics.py)."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
 
 
 # optional debug middleware that logs Authorization header (safe masking)
+# only does any work when DEBUG is enabled (LOG_LEVEL=DEBUG)
 @app.middleware("http")
 async def auth_debug_middleware(request: Request, call_next):
+    if not logger.isEnabledFor(logging.DEBUG):
+        return await call_next(request)
     try:
         auth = request.headers.get("authorization")
-        logger.info(
-            f"[AUTH-DBG] {request.method} {request.url.path} Authorization: {'<present>' if auth else '<missing>'}"
+        logger.debug(
+            "[AUTH-DBG] %s %s Authorization: %s",
+            request.method,
+            request.url.path,
+            "<present>" if auth else "<missing>",
         )
         if auth:
             try:
@@ -52,64 +104,75 @@ async def auth_debug_middleware(request: Request, call_next):
                 if not isinstance(token, str)
                 else (token[:8] + "..." + token[-8:] if len(token) > 32 else token)
             )
-            logger.info(f"[AUTH-DBG] token masked: {masked}")
+            logger.debug("[AUTH-DBG] token masked: %s", masked)
     except Exception:
         logger.exception("[AUTH-DBG] logging error")
     resp = await call_next(request)
     return resp
 
 
-# Helper to build a projection from payload
-def build_projection(payload: dict):
-    try:
-        current_balance = float(payload.get("current_balance", 0))
-    except Exception:
-        current_balance = 0.0
-    try:
-        annual_salary = float(payload.get("annual_salary", 0))
-    except Exception:
-        annual_salary = 0.0
-    try:
-        years = int(payload.get("years", 10))
-    except Exception:
-        years = 10
+# Dashboard projection (the shape the frontend's normalizeResponse() expects),
+# computed by the pensionlib engine like every other projection endpoint.
+# Fields the payload leaves out take these defaults.
+DASHBOARD_DEFAULTS = {
+    "current_balance": "0",
+    "annual_salary": "0",
+    "years": 10,
+    "contribution_rate": "0.10",
+    "salary_growth": "0.02",
+    "rate_of_return": "0.05",
+}
 
-    assumptions = payload.get("assumptions", {}) or {}
-    try:
-        contribution_rate = float(assumptions.get("contribution_rate", 0.1))
-    except Exception:
-        contribution_rate = 0.1
-    try:
-        salary_growth = float(assumptions.get("salary_growth", 0.02))
-    except Exception:
-        salary_growth = 0.02
-    try:
-        rate_of_return = float(assumptions.get("rate_of_return", 0.05))
-    except Exception:
-        rate_of_return = 0.05
 
+def dashboard_input(payload: dict) -> Tuple[DCProjectionInput, str]:
+    """
+    Dashboard payload -> (pensionlib input, precision mode).
+    Raises ValueError for malformed values (pydantic's ValidationError is one).
+    """
+    assumptions = payload.get("assumptions") or {}
+
+    def value(source: dict, name: str):
+        raw = source.get(name)
+        return DASHBOARD_DEFAULTS[name] if raw in (None, "") else raw
+
+    precision = payload.get("precision") or engine.EXACT
+    if precision not in engine.MODES:
+        raise ValueError(f"precision must be one of {engine.MODES}")
+    inp = DCProjectionInput(
+        current_balance=value(payload, "current_balance"),
+        annual_salary=value(payload, "annual_salary"),
+        years=value(payload, "years"),
+        contribution_rate=value(assumptions, "contribution_rate"),
+        salary_growth=value(assumptions, "salary_growth"),
+        rate_of_return=value(assumptions, "rate_of_return"),
+    )
+    return inp, precision
+
+
+def build_projection(inp: DCProjectionInput, precision: str = engine.EXACT):
+    """(projection, allocations, transactions); one row per projected year."""
     start_year = datetime.date.today().year
-    balance = round(current_balance, 2)
-    salary = round(annual_salary, 2)
+    previous = round(float(inp.current_balance), 2)
+    if precision == engine.FAST:
+        rows = engine.fast_rows(inp)  # already floats rounded to cents
+    else:
+        rows = [
+            (y, float(s), float(c), float(b)) for y, s, c, b in engine.yearly_rows(inp)
+        ]
 
     projection = []
-    # produce `years + 1` rows (including starting year) — adjust if you prefer exactly `years`
-    for i in range(years + 1):
-        year_label = str(start_year + i)
-        contribution = round(salary * contribution_rate, 2)
-        growth = round(balance * rate_of_return, 2)
-        balance = round(balance + contribution + growth, 2)
+    for year, salary, contribution, balance in rows:
         projection.append(
             {
-                "year": year_label,
+                # year 1 ends in the current calendar year
+                "year": str(start_year + year - 1),
                 "balance": balance,
                 "contribution": contribution,
-                "growth": growth,
+                "growth": round(balance - previous - contribution, 2),
                 "salary": salary,
             }
         )
-        # bump salary
-        salary = round(salary * (1.0 + salary_growth), 2)
+        previous = balance
 
     # simple static allocations
     allocations = [
@@ -135,19 +198,29 @@ def build_projection(payload: dict):
 
 
 @app.post("/v1/dc/project")
-async def dc_project(payload: dict):
+async def dc_project_dashboard(payload: dict):
     """
     Accepts JSON payload like:
     {
       "current_balance":"10000.00",
       "annual_salary":"40000.00",
       "years": 10,
-      "assumptions": { "contribution_rate": "0.10", "salary_growth": "0.02", "rate_of_return": "0.05" }
+      "assumptions": { "contribution_rate": "0.10", "salary_growth": "0.02", "rate_of_return": "0.05" },
+      "precision": "exact"   # optional: "exact" (default) or "fast", see pensionlib.engine
     }
     Returns: { projection: [...], allocations: [...], transactions: [...] }
     """
-    logger.info("dc_project payload: %s", payload)
-    projection, allocations, transactions = build_projection(payload)
+    logger.debug("dc_project payload: %s", payload)
+    try:
+        inp, precision = dashboard_input(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {e}")
+    try:
+        projection, allocations, transactions = await deps.run_pensionlib(
+            build_projection, inp, precision
+        )
+    except Cancelled:
+        raise deps.cancelled_error("/v1/dc/project")
 
     # return in the exact shape the frontend normalizeResponse() expects:
     return JSONResponse(
@@ -157,5 +230,6 @@ async def dc_project(payload: dict):
             "transactions": transactions,
             "ok": True,
             "source": "fastapi",
+            "precision": precision,
         }
     )
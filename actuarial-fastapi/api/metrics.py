@@ -0,0 +1,349 @@
+# actuarial-fastapi/api/metrics.py
+"""
+Minimal in-process metrics with Prometheus text exposition (no external deps).
+
+Provides:
+- Counter / Gauge / Histogram: thread-safe, labelled metric families
+- Registry: snapshot + render; REGISTRY is the process-wide instance
+- the service's metric families (HTTP latency, in-flight, pensionlib queue/compute, batch rows, caches)
+
+Multiple workers: set METRICS_MULTIPROC_DIR to a directory shared by all uvicorn
+workers. Each worker periodically writes its snapshot there (every
+METRICS_FLUSH_SECONDS and on every scrape it serves) and /metrics merges all
+files: counters and histograms are summed across every worker that ever wrote
+one, gauges only across workers that are still alive.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .auth_deps import token_cache
+
+logger = logging.getLogger("pensionlib_api.metrics")
+
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(k), v] for k, v in self._values.items()]
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels) -> None:
+        """Mirror a monotonically increasing total kept elsewhere (see collectors)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        # non-cumulative bucket counts + [sum, count]; cumulated at render time
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[idx] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(k), list(v)] for k, v in self._values.items()]
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "buckets": list(self.buckets),
+            "samples": samples,
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Registry:
+    def __init__(self, multiproc_dir: Optional[str] = None):
+        self.multiproc_dir = multiproc_dir
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        """`fn` runs before every snapshot, e.g. to copy stats kept by other modules."""
+        self._collectors.append(fn)
+
+    def snapshot(self) -> dict:
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                logger.exception("metrics.collector_failed")
+        return {name: m.snapshot() for name, m in self._metrics.items()}
+
+    # ---- multiprocess ----
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f"metrics-{pid}.json")
+
+    def flush(self) -> dict:
+        """Write this worker's snapshot to the shared directory (atomic replace)."""
+        snap = self.snapshot()
+        if self.multiproc_dir:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+            path = self._path(os.getpid())
+            tmp = path + ".tmp"
+            with open(tmp, "w") as fh:
+                json.dump(snap, fh)
+            os.replace(tmp, path)
+        return snap
+
+    def start_flusher(self, interval: float = METRICS_FLUSH_SECONDS) -> None:
+        if not self.multiproc_dir or self._flusher is not None:
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("metrics.flush_failed")
+
+        self._flusher = threading.Thread(
+            target=_loop, name="metrics-flush", daemon=True
+        )
+        self._flusher.start()
+
+    def stop_flusher(self) -> None:
+        self._stop.set()
+        self._flusher = None
+
+    def collect(self) -> dict:
+        """Merged snapshot of every worker (or just this one without a shared dir)."""
+        own = self.flush()
+        if not self.multiproc_dir:
+            return own
+        merged: dict = {}
+        for fname in os.listdir(self.multiproc_dir):
+            if not (fname.startswith("metrics-") and fname.endswith(".json")):
+                continue
+            try:
+                pid = int(fname[len("metrics-") : -len(".json")])
+                with open(os.path.join(self.multiproc_dir, fname)) as fh:
+                    snap = json.load(fh)
+            except (ValueError, OSError):
+                continue
+            alive = pid == os.getpid() or _pid_alive(pid)
+            for name, family in snap.items():
+                if family["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**family, "samples": {}})
+                for labels, value in family["samples"]:
+                    key = tuple(labels)
+                    prev = target["samples"].get(key)
+                    if prev is None:
+                        target["samples"][key] = value
+                    elif isinstance(value, list):
+                        target["samples"][key] = [a + b for a, b in zip(prev, value)]
+                    else:
+                        target["samples"][key] = prev + value
+        for family in merged.values():
+            family["samples"] = [[list(k), v] for k, v in family["samples"].items()]
+        return merged
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, family in sorted(self.collect().items()):
+            names = family["labelnames"]
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for labels, value in family["samples"]:
+                if family["type"] != "histogram":
+                    lines.append(f"{name}{_labels(names, labels)} {_fmt(value)}")
+                    continue
+                bounds = list(family["buckets"]) + [math.inf]
+                cumulative = 0
+                for bound, count in zip(bounds, value):
+                    cumulative += count
+                    le = f'le="{_fmt(bound)}"'
+                    lines.append(
+                        f"{name}_bucket{_labels(names, labels, le)} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{_labels(names, labels)} {_fmt(value[-2])}")
+                lines.append(f"{name}_count{_labels(names, labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(METRICS_MULTIPROC_DIR)
+
+# ---- metric families ----
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template",
+        ["method", "route", "status"],
+    )
+)
+HTTP_IN_FLIGHT = REGISTRY.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served")
+)
+PENSIONLIB_QUEUE_WAIT = REGISTRY.register(
+    Histogram(
+        "pensionlib_queue_wait_seconds",
+        "Time a run_pensionlib call waited for an executor thread",
+        ["fn"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    )
+)
+PENSIONLIB_COMPUTE = REGISTRY.register(
+    Histogram(
+        "pensionlib_compute_seconds",
+        "Time spent executing a run_pensionlib call",
+        ["fn"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    )
+)
+BATCH_ROWS = REGISTRY.register(
+    Counter("batch_rows_total", "Batch CSV rows processed", ["outcome"])
+)
+BATCH_ROWS_PER_SECOND = REGISTRY.register(
+    Histogram(
+        "batch_rows_per_second",
+        "Throughput of each batch request",
+        buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000),
+    )
+)
+CANCELLED_REQUESTS = REGISTRY.register(
+    Counter(
+        "cancelled_requests_total",
+        "Requests stopped early (client disconnect or deadline)",
+        ["route", "reason"],
+    )
+)
+CACHE_HITS = REGISTRY.register(Counter("cache_hits_total", "Cache hits", ["cache"]))
+CACHE_MISSES = REGISTRY.register(
+    Counter("cache_misses_total", "Cache misses", ["cache"])
+)
+CACHE_EVICTIONS = REGISTRY.register(
+    Counter("cache_evictions_total", "Cache evictions (capacity or expiry)", ["cache"])
+)
+
+
+def _collect_jwt_cache():
+    stats = token_cache.stats()
+    CACHE_HITS.set(stats["hits"], cache="jwt")
+    CACHE_MISSES.set(stats["misses"], cache="jwt")
+    CACHE_EVICTIONS.set(stats["evictions"] + stats["expirations"], cache="jwt")
+
+
+REGISTRY.add_collector(_collect_jwt_cache)
+
+
+def observe_batch(ok_rows: int, error_rows: int, started: float) -> None:
+    """Record one finished batch request (`started` from time.perf_counter())."""
+    BATCH_ROWS.inc(ok_rows, outcome="ok")
+    BATCH_ROWS.inc(error_rows, outcome="error")
+    elapsed = time.perf_counter() - started
+    if elapsed > 0 and ok_rows + error_rows:
+        BATCH_ROWS_PER_SECOND.observe((ok_rows + error_rows) / elapsed)
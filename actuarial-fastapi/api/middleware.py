@@ -1,33 +1,47 @@
 ﻿# api/middleware.py
+import logging
+import math
+import os
 import time
 import uuid
-import asyncio
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
-from collections import defaultdict
 from contextvars import ContextVar
 
-# request_id contextvar for logging
+from . import metrics, profiling, ratelimit, tracing
+
+logger = logging.getLogger("pensionlib_api.middleware")
+
+# request_id / route contextvars for logging
 request_id_ctx: ContextVar[str] = ContextVar("request_id", default="unknown")
+route_ctx: ContextVar[str] = ContextVar("route", default="")
 
 MAX_BODY_BYTES = 200_000  # 200 KB (adjust)
-RATE_LIMIT_WINDOW = 60  # seconds
-RATE_LIMIT_MAX = 60  # requests per window per client
-
-# in-memory rate store: ip -> (count, window_start)
-_rate_store = defaultdict(lambda: {"count": 0, "window_start": 0})
-_rate_lock = asyncio.Lock()
 
 
 class RequestIDLoggingMiddleware(BaseHTTPMiddleware):
+    """
+    Adopt the caller's X-Request-ID (or make one), turn X-Request-Timeout into
+    the request deadline, and return the recorded spans as Server-Timing
+    (see api/tracing.py).
+    """
+
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
-        rid = str(uuid.uuid4())
+        started = time.perf_counter()
+        rid = tracing.incoming_request_id(request.headers)
         request_id_ctx.set(rid)
+        route_ctx.set(request.url.path)
         request.state.request_id = rid
+        timeout = tracing.parse_timeout(request.headers.get(tracing.DEADLINE_HEADER))
+        if timeout is not None:
+            tracing.deadline_ctx.set(time.monotonic() + timeout)
+        timings = tracing.Timings()
+        tracing.timings_ctx.set(timings)
         # Basic structured log (start)
-        request.app.logger.info(
+        logger.info(
             "request.start",
             extra={
                 "request_id": rid,
@@ -35,18 +49,95 @@ class RequestIDLoggingMiddleware(BaseHTTPMiddleware):
                 "method": request.method,
             },
         )
+        response = None
         try:
             response = await call_next(request)
         finally:
-            request.app.logger.info(
+            timings.add("app", time.perf_counter() - started)
+            logger.info(
                 "request.end",
                 extra={
                     "request_id": rid,
                     "path": request.url.path,
                     "method": request.method,
                     "status_code": getattr(response, "status_code", None),
+                    "timings_ms": timings.as_dict(),
                 },
             )
+        response.headers[tracing.REQUEST_ID_HEADER] = rid
+        response.headers["Server-Timing"] = timings.header()
+        return response
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Record in-flight requests and latency (time to response start) per route template.
+    Unmatched paths share one "unmatched" label so scanners cannot blow up cardinality.
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+        metrics.HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            metrics.HTTP_IN_FLIGHT.dec()
+            route = request.scope.get("route")
+            metrics.HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Profile authorised or sampled requests (see api/profiling.py).
+    Mount inside RequestIDLoggingMiddleware so captures are named by request id.
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+        forced = profiling.requested_mode(request.headers, request.query_params)
+        if forced is None and not profiling.sampled_for_slow_capture():
+            return await call_next(request)
+
+        session = profiling.ProfileSession(forced or profiling.PROFILE_MODE)
+        ctx_token = profiling.profile_session_ctx.set(session)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            profiling.profile_session_ctx.reset(ctx_token)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        if forced or elapsed_ms >= profiling.PROFILE_SLOW_MS:
+            rid = getattr(request.state, "request_id", None) or uuid.uuid4().hex
+            meta = {
+                "request_id": rid,
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": response.status_code,
+                "elapsed_ms": round(elapsed_ms, 3),
+                "trigger": "on_demand" if forced else "slow_request",
+            }
+            try:
+                base = await run_in_threadpool(
+                    session.save,
+                    profiling.PROFILE_DIR,
+                    profiling.capture_name(rid, request.url.path),
+                    meta,
+                )
+            except Exception:
+                logger.exception("profiling.save_failed")
+                base = None
+            if base:
+                logger.info("profiling.captured", extra=dict(meta, profile=base))
+                if forced:
+                    response.headers["X-Profile-Id"] = os.path.basename(base)
         return response
 
 
@@ -76,15 +167,33 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
 
 
 class SimpleRateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Per-client token-bucket limiter (see api/ratelimit.py).
+    Uses the backend from RATE_LIMIT_BACKEND unless one is passed explicitly:
+        app.add_middleware(SimpleRateLimitMiddleware, backend=ratelimit.get_backend("sqlite"))
+    """
+
+    def __init__(self, app, backend=None):
+        super().__init__(app)
+        self.backend = backend if backend is not None else ratelimit.get_backend()
+
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
         client_ip = request.client.host if request.client else "unknown"
-        now = int(time.time())
-        async with _rate_lock:
-            entry = _rate_store[client_ip]
-            if now - entry["window_start"] >= RATE_LIMIT_WINDOW:
-                entry["window_start"] = now
-                entry["count"] = 0
-            entry["count"] += 1
-            if entry["count"] > RATE_LIMIT_MAX:
-                return JSONResponse({"detail": "Too many requests"}, status_code=429)
+        try:
+            if self.backend.blocking:
+                allowed, retry_after = await run_in_threadpool(
+                    self.backend.take, client_ip
+                )
+            else:
+                allowed, retry_after = self.backend.take(client_ip)
+        except Exception:
+            # fail open: a broken limiter store must not take the API down
+            logger.exception("ratelimit.backend_error")
+            allowed, retry_after = True, 0.0
+        if not allowed:
+            return JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
         return await call_next(request)
@@ -0,0 +1,155 @@
+# actuarial-fastapi/api/profiling.py
+"""
+Opt-in per-request profiling.
+
+A request is profiled when either
+- it is authorised on demand: header `X-Profile: cprofile|sample` (or query
+  `?profile=cprofile|sample`) plus `X-Profile-Token` / `profile_token` matching
+  PROFILE_TOKEN (on-demand profiling is disabled while PROFILE_TOKEN is unset), or
+- slow-request capture is on (PROFILE_SLOW_MS > 0) and the request is picked by
+  PROFILE_SAMPLE_RATE; its profile is kept only if it took >= PROFILE_SLOW_MS.
+
+The CPU-heavy part of a request is its run_pensionlib calls, which execute in
+executor threads, so that is what gets profiled (deps.run_pensionlib wraps each
+call with the active session). Modes:
+- "cprofile": deterministic profile, saved as `<id>.pstats` (pstats / snakeviz)
+- "sample": stack sampler, saved as `<id>.collapsed` (flamegraph.pl / speedscope)
+Each capture also gets a `<id>.json` sidecar with method, path, status and latency.
+"""
+
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger("pensionlib_api.profiling")
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "cprofile")
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", 0))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0.01))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get("PROFILE_SAMPLE_INTERVAL_MS", 2))
+
+MODES = ("cprofile", "sample")
+
+profile_session_ctx: ContextVar[Optional["ProfileSession"]] = ContextVar(
+    "profile_session", default=None
+)
+
+
+class _StackSampler:
+    """Sample one thread's Python stack every `interval` seconds into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float, counts: Counter, lock):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = counts
+        self.lock = lock
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+                )
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                with self.lock:
+                    self.counts[key] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class ProfileSession:
+    """Profiling state for one request; `run()` may be called from several threads."""
+
+    def __init__(self, mode: str = PROFILE_MODE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode!r}")
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._stacks: Counter = Counter()
+
+    def run(self, call: Callable[[], Any]) -> Any:
+        if self.mode == "sample":
+            interval = PROFILE_SAMPLE_INTERVAL_MS / 1000.0
+            with _StackSampler(
+                threading.get_ident(), interval, self._stacks, self._lock
+            ):
+                return call()
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(call)
+        finally:
+            with self._lock:
+                self._profiles.append(profile)
+
+    def save(self, directory: str, name: str, meta: dict) -> Optional[str]:
+        """Write the captured profile; returns the base path or None if nothing ran."""
+        with self._lock:
+            profiles = list(self._profiles)
+            stacks = dict(self._stacks)
+        if not profiles and not stacks:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, name)
+        if self.mode == "sample":
+            with open(base + ".collapsed", "w") as fh:
+                for stack, count in sorted(stacks.items()):
+                    fh.write(f"{stack} {count}\n")
+        else:
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(base + ".pstats")
+        with open(base + ".json", "w") as fh:
+            json.dump(dict(meta, mode=self.mode), fh)
+        return base
+
+
+def requested_mode(headers, query_params) -> Optional[str]:
+    """Mode for an authorised on-demand request, or None."""
+    if not PROFILE_TOKEN:
+        return None
+    mode = headers.get("x-profile") or query_params.get("profile")
+    if not mode:
+        return None
+    token = headers.get("x-profile-token") or query_params.get("profile_token") or ""
+    if not hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode()):
+        return None
+    return mode if mode in MODES else PROFILE_MODE
+
+
+def sampled_for_slow_capture() -> bool:
+    return PROFILE_SLOW_MS > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def capture_name(request_id: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{request_id}"
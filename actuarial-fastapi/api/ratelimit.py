@@ -0,0 +1,199 @@
+# actuarial-fastapi/api/ratelimit.py
+"""
+Token-bucket rate limiting for the actuarial-fastapi service.
+
+Provides:
+- TokenBucket: refill / take arithmetic shared by every backend
+- MemoryBackend: per-process store with sharded locks and TTL eviction
+- SQLiteBackend: local-file store shared by all uvicorn workers on one host
+- get_backend(): build the backend selected by RATE_LIMIT_BACKEND
+
+A bucket that has been idle long enough to refill completely is
+indistinguishable from a brand new one, so both backends evict it.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger("pensionlib_api.ratelimit")
+
+RATE_LIMIT_WINDOW = int(os.environ.get("RATE_LIMIT_WINDOW", 60))  # seconds
+RATE_LIMIT_MAX = int(os.environ.get("RATE_LIMIT_MAX", 60))  # requests per window
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = os.environ.get("RATE_LIMIT_SQLITE_PATH", "ratelimit.sqlite3")
+RATE_LIMIT_SHARDS = int(os.environ.get("RATE_LIMIT_SHARDS", 64))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", 100_000))
+
+
+class TokenBucket:
+    """
+    Bucket parameters: `capacity` tokens, refilled continuously at `rate` tokens/second.
+    The state of one bucket is just (tokens, updated_at) so it can live anywhere.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        if capacity <= 0 or rate <= 0:
+            raise ValueError("capacity and rate must be positive")
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        # time for an empty bucket to refill; idle entries older than this can be dropped
+        self.ttl = self.capacity / self.rate
+
+    def take(
+        self, tokens: Optional[float], updated: float, now: float, cost: float = 1.0
+    ) -> Tuple[bool, float, float]:
+        """
+        Return (allowed, new_tokens, retry_after_seconds) for a bucket last seen at `updated`.
+        `tokens=None` means the key has no state yet (full bucket).
+        """
+        if tokens is None:
+            tokens = self.capacity
+        else:
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+        if tokens >= cost:
+            return True, tokens - cost, 0.0
+        return False, tokens, (cost - tokens) / self.rate
+
+
+class MemoryBackend:
+    """
+    Per-process bucket store.
+
+    Keys are spread over `shards` independent dicts, each with its own lock, so
+    concurrent requests from different clients do not contend. Each shard keeps
+    its dict in least-recently-used order, which makes TTL eviction a cheap scan
+    from the front that stops at the first live entry.
+    """
+
+    blocking = False
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        shards: int = RATE_LIMIT_SHARDS,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+    ):
+        self.bucket = bucket
+        self._shards: List[Tuple[threading.Lock, dict]] = [
+            (threading.Lock(), {}) for _ in range(max(1, shards))
+        ]
+        self._max_per_shard = max(1, max_keys // len(self._shards))
+
+    def take(self, key: str, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.monotonic() if now is None else now
+        lock, store = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            # pop + reinsert keeps the shard ordered by last access
+            entry = store.pop(key, None)
+            if entry is None:
+                allowed, tokens, retry_after = self.bucket.take(None, now, now)
+            else:
+                allowed, tokens, retry_after = self.bucket.take(entry[0], entry[1], now)
+            store[key] = (tokens, now)
+            self._evict(store, now)
+        return allowed, retry_after
+
+    def _evict(self, store: dict, now: float) -> None:
+        cutoff = now - self.bucket.ttl
+        while store:
+            oldest = next(iter(store))
+            if store[oldest][1] >= cutoff and len(store) <= self._max_per_shard:
+                break
+            del store[oldest]
+
+    def __len__(self) -> int:
+        return sum(len(store) for _, store in self._shards)
+
+
+class SQLiteBackend:
+    """
+    Bucket store in a local SQLite file, so every uvicorn worker on the host
+    shares the same limits. Each take is one short IMMEDIATE transaction in WAL
+    mode; idle rows are swept every `sweep_interval` seconds.
+
+    Calls block on file I/O, so the middleware runs them in the threadpool.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        path: str = RATE_LIMIT_SQLITE_PATH,
+        sweep_interval: float = 30.0,
+        busy_timeout_ms: int = 100,
+    ):
+        self.bucket = bucket
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._last_sweep = 0.0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=1.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, now: Optional[float] = None) -> Tuple[bool, float]:
+        # wall clock: monotonic clocks are not comparable across processes
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                allowed, tokens, retry_after = self.bucket.take(None, now, now)
+            else:
+                allowed, tokens, retry_after = self.bucket.take(row[0], row[1], now)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            if now - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = now
+                conn.execute(
+                    "DELETE FROM buckets WHERE updated < ?", (now - self.bucket.ttl,)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+
+def get_backend(name: str = RATE_LIMIT_BACKEND):
+    """
+    Build the rate-limit backend named by `name` ("memory" or "sqlite") using
+    the RATE_LIMIT_* settings: RATE_LIMIT_MAX requests per RATE_LIMIT_WINDOW seconds,
+    with bursts of up to RATE_LIMIT_MAX.
+    """
+    bucket = TokenBucket(
+        capacity=RATE_LIMIT_MAX, rate=RATE_LIMIT_MAX / float(RATE_LIMIT_WINDOW)
+    )
+    if name == "memory":
+        return MemoryBackend(bucket)
+    if name == "sqlite":
+        return SQLiteBackend(bucket)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name!r}")
@@ -7,10 +7,10 @@ from decimal import Decimal, InvalidOperation
 import csv
 from io import TextIOWrapper
 import os
+import time
 
 # pensionlib imports (thin wrappers)
 from pensionlib.calculations import (
-    project_dc_account,
     project_db_accrual,
     annuity_conversion,
     commutation,
@@ -18,17 +18,23 @@ from pensionlib.calculations import (
     early_retirement_adjustment,
     late_retirement_adjustment,
 )
+from pensionlib import engine
 from pensionlib import models as pension_models
+from pensionlib.cancel import Cancelled
+from pensionlib.grid import dc_grid
+from pensionlib.solver import solve_contribution_rate, solve_years
 
 # local deps
 from . import deps
+from . import metrics
 from . import schemas
+from . import tracing
 
 # auth dependency - verify_jwt should raise HTTPException(401) when not valid.
 # We also support a development mode where auth is optional.
 from .auth_deps import verify_jwt  # must exist and raise HTTPException on invalid token
 
-router = APIRouter()
+router = APIRouter(route_class=tracing.TimedRoute)
 logger = logging.getLogger(__name__)
 
 # helper to decide if auth is required (useful for local dev).
@@ -61,23 +67,31 @@ async def maybe_verify_jwt(
     return token_payload
 
 
+# 422 detail when pensionlib's Decimal arithmetic overflows on extreme inputs
+OUT_OF_RANGE = "Inputs out of range: the projection overflows"
+
+
 # -----------------------
 # DC endpoints
 # -----------------------
 @router.post(
-    "/dc/project",
+    "/dc/balances",
     response_model=schemas.DCResponse,
-    summary="Project DC account",
+    summary="Project DC account balances year by year",
     tags=["dc"],
 )
-async def dc_project(
+async def dc_balances(
     req: schemas.DCRequest,
     token_payload: Optional[dict] = Depends(maybe_verify_jwt),
     request_id: str = Depends(deps.get_request_id),
 ):
     """
     Project a Defined Contribution account using pensionlib's DCProjectionInput.
+    precision selects the engine mode (see pensionlib.engine): "fast" amounts
+    are JSON numbers rounded to cents, "exact" amounts are decimal strings.
     Requires a valid JWT unless FASTAPI_AUTH_REQUIRED=0 (dev).
+
+    (/v1/dc/project is api.main's dashboard projection, in the frontend's shape.)
     """
     try:
         inp = pension_models.DCProjectionInput(
@@ -91,29 +105,80 @@ async def dc_project(
         )
     except Exception as e:
         logger.exception(
-            "dc_project.input_validation_failed", extra={"request_id": request_id}
+            "dc_balances.input_validation_failed", extra={"request_id": request_id}
         )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid input: {e}"
         )
 
     logger.info(
-        "dc_project.request", extra={"request_id": request_id, "years": req.years}
+        "dc_balances.request", extra={"request_id": request_id, "years": req.years}
     )
     try:
-        out = await deps.run_pensionlib(project_dc_account, inp)
+        if req.precision == engine.FAST:
+            # plain floats straight to JSON: no models, no Decimal
+            out = JSONResponse(await deps.run_pensionlib(engine.fast_projection, inp))
+        else:
+            out = await deps.run_pensionlib(engine.project_dc, inp, req.precision)
+    except Cancelled:
+        raise deps.cancelled_error("/dc/balances")
     except Exception as exc:
-        logger.exception("dc_project.runtime_error", extra={"request_id": request_id})
+        logger.exception("dc_balances.runtime_error", extra={"request_id": request_id})
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"Projection engine error: {exc}",
         )
 
-    logger.info("dc_project.done", extra={"request_id": request_id})
-    # out is expected to match schemas.DCResponse (pydantic model will validate)
+    logger.info("dc_balances.done", extra={"request_id": request_id})
+    # a DCProjectionOutput (validated as schemas.DCResponse) or, for fast, a response
     return out
 
 
+@router.post(
+    "/dc/grid",
+    response_model=schemas.DCGridResponse,
+    summary="DC final balances over a scenario grid",
+    tags=["dc"],
+)
+async def dc_grid_endpoint(
+    req: schemas.DCGridRequest,
+    token_payload: Optional[dict] = Depends(maybe_verify_jwt),
+    request_id: str = Depends(deps.get_request_id),
+    cancel: deps.CancelToken = Depends(deps.get_cancel_token),
+):
+    """
+    Final balance for every (rate_of_return, contribution_rate, salary_growth)
+    combination, as final_balance[i][j][k] in that axis order. The sweep stops
+    early if the client disconnects or the X-Request-Timeout deadline passes.
+    """
+    try:
+        inp = pension_models.DCGridInput(**req.model_dump())
+    except Exception as e:
+        logger.exception(
+            "dc_grid.input_validation_failed", extra={"request_id": request_id}
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid input: {e}"
+        )
+
+    try:
+        return await cancel.wait(deps.run_pensionlib(dc_grid, inp, cancel.should_stop))
+    except Cancelled:
+        logger.info(
+            "dc_grid.cancelled",
+            extra={"request_id": request_id, "reason": cancel.reason},
+        )
+        raise cancel.error("/dc/grid")
+    except ArithmeticError:  # e.g. Decimal overflow from extreme rates
+        raise HTTPException(status_code=422, detail=OUT_OF_RANGE)
+    except Exception as exc:
+        logger.exception("dc_grid.runtime_error", extra={"request_id": request_id})
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Projection engine error: {exc}",
+        )
+
+
 # -----------------------
 # DB accrual
 # -----------------------
@@ -144,6 +209,8 @@ async def db_accrual(
 
     try:
         out = await deps.run_pensionlib(project_db_accrual, inp)
+    except Cancelled:
+        raise deps.cancelled_error("/db/accrual")
     except Exception as exc:
         logger.exception("db_accrual.runtime_error", extra={"request_id": request_id})
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
@@ -182,6 +249,8 @@ async def annuity_convert(
 
     try:
         out = await deps.run_pensionlib(annuity_conversion, inp)
+    except Cancelled:
+        raise deps.cancelled_error("/annuity/convert")
     except Exception as exc:
         logger.exception(
             "annuity_convert.runtime_error", extra={"request_id": request_id}
@@ -217,6 +286,8 @@ async def commutation_endpoint(
 
     try:
         lump = await deps.run_pensionlib(commutation, annuity_payment, commutation_pct)
+    except Cancelled:
+        raise deps.cancelled_error("/commutation")
     except Exception as exc:
         logger.exception("commutation.runtime_error", extra={"request_id": request_id})
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
@@ -248,6 +319,8 @@ async def withdraw_endpoint(
         new_balance = await deps.run_pensionlib(
             apply_withdrawal, balance, withdrawal_amt
         )
+    except Cancelled:
+        raise deps.cancelled_error("/withdraw")
     except Exception as exc:
         logger.exception("withdraw.runtime_error", extra={"request_id": request_id})
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
@@ -289,6 +362,8 @@ async def early_adjust(
         adjusted = await deps.run_pensionlib(
             early_retirement_adjustment, annual_pension, years_early, pct_per_year
         )
+    except Cancelled:
+        raise deps.cancelled_error("/adjustments/early")
     except Exception as exc:
         logger.exception("early_adjust.runtime_error", extra={"request_id": request_id})
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
@@ -323,6 +398,8 @@ async def late_adjust(
         adjusted = await deps.run_pensionlib(
             late_retirement_adjustment, annual_pension, years_late, pct_per_year
         )
+    except Cancelled:
+        raise deps.cancelled_error("/adjustments/late")
     except Exception as exc:
         logger.exception("late_adjust.runtime_error", extra={"request_id": request_id})
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
@@ -330,19 +407,106 @@ async def late_adjust(
     return {"adjusted_pension": adjusted}
 
 
+# -----------------------
+# Goal-seek solvers
+# -----------------------
+@router.post(
+    "/solve/contribution_rate",
+    response_model=schemas.ContributionRateSolveResponse,
+    summary="Contribution rate needed to reach a target balance",
+    tags=["solve"],
+)
+async def solve_contribution_rate_endpoint(
+    req: schemas.ContributionRateSolveRequest,
+    token_payload: Optional[dict] = Depends(maybe_verify_jwt),
+    request_id: str = Depends(deps.get_request_id),
+):
+    try:
+        inp = pension_models.ContributionRateSolveInput(**req.model_dump())
+    except Exception as e:
+        logger.exception(
+            "solve_contribution_rate.input_validation_failed",
+            extra={"request_id": request_id},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid input: {e}"
+        )
+
+    try:
+        return await deps.run_pensionlib(solve_contribution_rate, inp)
+    except Cancelled:
+        raise deps.cancelled_error("/solve/contribution_rate")
+    except ValueError as exc:  # target unreachable
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ArithmeticError:  # e.g. Decimal overflow from extreme rates
+        raise HTTPException(status_code=422, detail=OUT_OF_RANGE)
+
+
+@router.post(
+    "/solve/years",
+    response_model=schemas.YearsSolveResponse,
+    summary="Years needed to reach a target balance",
+    tags=["solve"],
+)
+async def solve_years_endpoint(
+    req: schemas.YearsSolveRequest,
+    token_payload: Optional[dict] = Depends(maybe_verify_jwt),
+    request_id: str = Depends(deps.get_request_id),
+):
+    try:
+        inp = pension_models.YearsSolveInput(**req.model_dump())
+    except Exception as e:
+        logger.exception(
+            "solve_years.input_validation_failed", extra={"request_id": request_id}
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid input: {e}"
+        )
+
+    try:
+        return await deps.run_pensionlib(solve_years, inp)
+    except Cancelled:
+        raise deps.cancelled_error("/solve/years")
+    except ValueError as exc:  # target not reached within max_years
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ArithmeticError:  # e.g. Decimal overflow from extreme rates
+        raise HTTPException(status_code=422, detail=OUT_OF_RANGE)
+
+
 # -----------------------
 # Batch CSV endpoint
 # -----------------------
+# rows per executor call; cancellation is checked between chunks
+BATCH_CHUNK_ROWS = 200
+
+
+def _project_rows(chunk):
+    """[(row_index, row, inp)] -> [(row_index, row, result or exception)]."""
+    out = []
+    for idx, row, inp in chunk:
+        try:
+            out.append((idx, row, engine.project_dc(inp)))
+        except Exception as exc:
+            out.append((idx, row, exc))
+    return out
+
+
 @router.post("/batch/dc_project", tags=["batch"])
 async def batch_dc_project(
     file: UploadFile = File(...),
     token_payload: Optional[dict] = Depends(maybe_verify_jwt),
     request_id: str = Depends(deps.get_request_id),
+    cancel: deps.CancelToken = Depends(deps.get_cancel_token),
 ):
     """
     Accept CSV upload (multipart/form-data 'file') with columns:
     current_balance, annual_salary, years, contribution_rate, salary_growth, rate_of_return
     Returns list of projection outputs and per-row errors when present.
+
+    Rows are projected in chunks of BATCH_CHUNK_ROWS. Between chunks the
+    request is abandoned (499/504) if the client has disconnected or the
+    X-Request-Timeout deadline has passed, freeing the executor for live
+    requests.
     """
     # guard: ensure uploaded file present
     if file is None:
@@ -352,6 +516,8 @@ async def batch_dc_project(
 
     results: List[Dict[str, Any]] = []
     processed = 0
+    failed = 0
+    started = time.perf_counter()
 
     # Use TextIOWrapper and csv.DictReader; ensure correct encoding
     try:
@@ -366,7 +532,42 @@ async def batch_dc_project(
             status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to read CSV: {e}"
         )
 
-    # iterate rows
+    async def flush(chunk):
+        nonlocal failed
+        if await cancel.check():
+            logger.info(
+                "batch_dc_project.cancelled",
+                extra={
+                    "request_id": request_id,
+                    "reason": cancel.reason,
+                    "rows_done": processed - len(chunk),
+                },
+            )
+            metrics.observe_batch(processed - len(chunk) - failed, failed, started)
+            raise cancel.error("/batch/dc_project")
+        try:
+            projected = await deps.run_pensionlib(_project_rows, chunk)
+        except Cancelled:  # deadline passed while the chunk was queued
+            metrics.observe_batch(processed - len(chunk) - failed, failed, started)
+            raise deps.cancelled_error("/batch/dc_project")
+        for idx, row, out in projected:
+            if isinstance(out, Exception):
+                logger.error(
+                    "batch_dc_project.runtime_error",
+                    extra={"request_id": request_id, "row_index": idx},
+                    exc_info=out,
+                )
+                results.append(
+                    {"row_index": idx, "row": row, "error": f"projection failed: {out}"}
+                )
+                failed += 1
+            else:
+                results.append(
+                    {"row_index": idx, "result": out.model_dump(mode="json")}
+                )
+
+    # iterate rows; invalid rows are reported in place, valid ones queued
+    chunk = []
     for idx, row in enumerate(reader, start=1):
         processed += 1
         # defensive: required fields check
@@ -389,18 +590,16 @@ async def batch_dc_project(
             results.append(
                 {"row_index": idx, "row": row, "error": f"invalid input: {e}"}
             )
+            failed += 1
             continue
 
-        try:
-            out = await deps.run_pensionlib(project_dc_account, inp)
-            results.append({"row_index": idx, "result": out})
-        except Exception as exc:
-            logger.exception(
-                "batch_dc_project.runtime_error",
-                extra={"request_id": request_id, "row_index": idx},
-            )
-            results.append(
-                {"row_index": idx, "row": row, "error": f"projection failed: {exc}"}
-            )
+        chunk.append((idx, row, inp))
+        if len(chunk) >= BATCH_CHUNK_ROWS:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
 
+    results.sort(key=lambda r: r["row_index"])
+    metrics.observe_batch(processed - failed, failed, started)
     return JSONResponse({"count": processed, "results": results})
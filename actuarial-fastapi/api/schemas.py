@@ -1,7 +1,7 @@
 # api/schemas.py
 from pydantic import BaseModel, Field
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 
 class Assumptions(BaseModel):
@@ -23,6 +23,11 @@ class DCRequest(BaseModel):
     annual_salary: Decimal
     assumptions: Assumptions
     years: int = Field(..., ge=0)
+    precision: Literal["exact", "fast"] = Field(
+        "exact",
+        description="exact: Decimal, to the cent (statements); "
+        "fast: float64, amounts as numbers rounded to cents (previews)",
+    )
 
 
 class YearBalance(BaseModel):
@@ -61,3 +66,52 @@ class AnnuityRequest(BaseModel):
 class AnnuityResponse(BaseModel):
     periodic_payment: Decimal
     annuity_factor: Decimal
+
+
+# Goal-seek solvers
+class ContributionRateSolveRequest(BaseModel):
+    current_balance: Decimal
+    annual_salary: Decimal
+    years: int = Field(..., ge=0, le=200)
+    salary_growth: Decimal
+    rate_of_return: Decimal
+    target_balance: Decimal
+    precision: Decimal = Field(
+        Decimal("0.000001"), gt=0, description="Step of the returned rate"
+    )
+
+
+class ContributionRateSolveResponse(BaseModel):
+    contribution_rate: Decimal
+    final_balance: Decimal
+    closed_form_rate: Decimal
+
+
+class YearsSolveRequest(BaseModel):
+    current_balance: Decimal
+    annual_salary: Decimal
+    contribution_rate: Decimal
+    salary_growth: Decimal
+    rate_of_return: Decimal
+    target_balance: Decimal
+    max_years: int = Field(100, ge=0, le=200)
+
+
+class YearsSolveResponse(BaseModel):
+    years: int
+    final_balance: Decimal
+
+
+# Scenario grid
+class DCGridRequest(BaseModel):
+    current_balance: Decimal
+    annual_salary: Decimal
+    years: int = Field(..., ge=0, le=200)
+    rate_of_return: List[Decimal] = Field(..., min_length=1)
+    contribution_rate: List[Decimal] = Field(..., min_length=1)
+    salary_growth: List[Decimal] = Field(..., min_length=1)
+
+
+class DCGridResponse(BaseModel):
+    axes: Dict[str, List[Decimal]]
+    final_balance: List[List[List[Decimal]]]
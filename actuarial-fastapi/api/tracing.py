@@ -0,0 +1,139 @@
+# actuarial-fastapi/api/tracing.py
+"""
+Request id, deadline and timing spans for one request.
+
+Headers (sent by the Django proxy, or any client):
+- X-Request-ID: adopted as this request's id when well formed, so Django and
+  FastAPI logs correlate; otherwise a new id is generated. Echoed back.
+- X-Request-Timeout: seconds the caller is still prepared to wait. Becomes a
+  monotonic deadline for the request (deadline_ctx); run_pensionlib will not
+  start work once it has passed.
+
+Spans are recorded locally (no tracing backend): run_pensionlib adds
+"queue" and "compute", TimedRoute adds "serialize" (endpoint return ->
+response built) and RequestIDLoggingMiddleware adds "app". They are returned
+as a Server-Timing header and logged with request.end.
+"""
+
+import asyncio
+import functools
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+
+REQUEST_ID_HEADER = "X-Request-ID"
+DEADLINE_HEADER = "X-Request-Timeout"
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def incoming_request_id(headers) -> str:
+    """The caller's X-Request-ID if it is safe to log and echo, else a new id."""
+    rid = headers.get(REQUEST_ID_HEADER)
+    if rid and _REQUEST_ID_RE.match(rid):
+        return rid
+    return uuid.uuid4().hex
+
+
+def parse_timeout(raw: Optional[str]) -> Optional[float]:
+    """X-Request-Timeout -> seconds; None when missing, malformed or negative."""
+    if not raw:
+        return None
+    try:
+        timeout = float(raw)
+    except ValueError:
+        return None
+    return timeout if timeout >= 0 else None  # also rejects nan
+
+
+class Timings:
+    """Per-request spans, summed by name. add() may be called from executor threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: Dict[str, List[float]] = {}  # name -> [seconds, count]
+        self.endpoint_done: Optional[float] = None  # perf_counter, see TimedRoute
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            span = self._spans.setdefault(name, [0.0, 0])
+            span[0] += seconds
+            span[1] += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        """name -> milliseconds"""
+        with self._lock:
+            return {name: round(s * 1000.0, 3) for name, (s, _) in self._spans.items()}
+
+    def header(self) -> str:
+        """Server-Timing value, e.g. 'queue;dur=0.2, compute;dur=4.1;desc="3 calls"'."""
+        with self._lock:
+            spans = list(self._spans.items())
+        parts = []
+        for name, (seconds, count) in spans:
+            part = f"{name};dur={seconds * 1000.0:.3f}"
+            if count > 1:
+                part += f';desc="{count} calls"'
+            parts.append(part)
+        return ", ".join(parts)
+
+
+timings_ctx: ContextVar[Optional[Timings]] = ContextVar("timings", default=None)
+# time.monotonic() after which nobody waits for this request's result
+deadline_ctx: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    timings = timings_ctx.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before this request's deadline (None: no deadline)."""
+    deadline = deadline_ctx.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute recording a "serialize" span: from the endpoint returning to the
+    response object being ready (response-model validation, encoding, render).
+    Only async endpoints are timed; sync ones run in a thread and are left as is.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = self._mark_return(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _mark_return(endpoint):
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings = timings_ctx.get()
+                if timings is not None:
+                    timings.endpoint_done = time.perf_counter()
+
+        return timed_endpoint
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            response = await handler(request)
+            timings = timings_ctx.get()
+            if timings is not None and timings.endpoint_done is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_done)
+                timings.endpoint_done = None
+            return response
+
+        return timed_handler
@@ -12,10 +12,24 @@ from .calculations import (
     early_retirement_adjustment,
     late_retirement_adjustment,
 )
-from . import models
+from . import engine, models
+from .cancel import Cancelled
+from .model_points import (
+    Bands,
+    MemberData,
+    compress,
+    estimate_error,
+    project_model_points,
+)
 from .money import Money
+from .grid import dc_grid
+from .solver import solve_contribution_rate, solve_years
+
+# keep in step with setup.py; stored projections record the version they used
+__version__ = "0.1.0"
 
 __all__ = [
+    "__version__",
     "project_dc_account",
     "project_db_accrual",
     "annuity_conversion",
@@ -23,6 +37,16 @@ __all__ = [
     "apply_withdrawal",
     "early_retirement_adjustment",
     "late_retirement_adjustment",
+    "engine",
     "models",
+    "Cancelled",
+    "Bands",
+    "MemberData",
+    "compress",
+    "estimate_error",
+    "project_model_points",
     "Money",
+    "dc_grid",
+    "solve_contribution_rate",
+    "solve_years",
 ]
@@ -0,0 +1,25 @@
+"""
+Cooperative cancellation for long-running pensionlib loops.
+
+Grid sweeps and model-point runs accept `should_stop`, a zero-argument
+callable polled between chunks of work. When it returns True the loop raises
+Cancelled instead of finishing. pensionlib never decides to stop by itself:
+callers (e.g. the API, on client disconnect or an expired deadline) supply
+the check, and it must be safe to call from the thread running the loop.
+"""
+
+from typing import Callable, Optional
+
+StopCheck = Optional[Callable[[], bool]]
+
+# members/points handled between two should_stop() polls
+CHECK_EVERY = 1000
+
+
+class Cancelled(Exception):
+    """Raised by a loop whose should_stop() returned True."""
+
+
+def check(should_stop: StopCheck) -> None:
+    if should_stop is not None and should_stop():
+        raise Cancelled("cancelled by caller")
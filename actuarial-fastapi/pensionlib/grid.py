@@ -0,0 +1,60 @@
+"""
+Scenario grid sweep: DC final balances over the Cartesian grid
+rate_of_return x contribution_rate x salary_growth, in one call.
+
+Every cell equals project_dc_account's final_balance to the cent (the same
+Decimal operations, in the same order). Work is shared along the grid's
+prefixes instead of projecting each cell from scratch:
+
+- the salary path depends only on salary_growth, so it is built once per
+  growth rate;
+- the yearly contributions depend on (salary_growth, contribution_rate), so
+  they are built once per pair and reused for every rate of return;
+- only the balance recursion runs per cell.
+
+`should_stop` (see pensionlib.cancel) is polled once per
+(salary_growth, contribution_rate) pair.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from .cancel import StopCheck, check
+from .models import DCGridInput, DCGridOutput
+from .money import DEFAULT_CONTEXT, QUANT
+
+AXES = ("rate_of_return", "contribution_rate", "salary_growth")
+
+
+def salary_path(annual_salary, salary_growth: Decimal, years: int):
+    """Salary for years 1..years, rounded as project_dc_account does."""
+    salary = DEFAULT_CONTEXT.create_decimal(str(annual_salary))
+    factor = Decimal(1) + salary_growth
+    path = []
+    for _ in range(years):
+        path.append(salary)
+        salary = (salary * factor).quantize(QUANT)
+    return path
+
+
+def dc_grid(inp: DCGridInput, should_stop: StopCheck = None) -> DCGridOutput:
+    opening = DEFAULT_CONTEXT.create_decimal(str(inp.current_balance))
+    growths = [Decimal(1) + r for r in inp.rate_of_return]
+    # cells[i][j][k]: rate_of_return[i], contribution_rate[j], salary_growth[k]
+    cells = [
+        [[None] * len(inp.salary_growth) for _ in inp.contribution_rate]
+        for _ in inp.rate_of_return
+    ]
+    for k, salary_growth in enumerate(inp.salary_growth):
+        salaries = salary_path(inp.annual_salary, salary_growth, inp.years)
+        for j, contribution_rate in enumerate(inp.contribution_rate):
+            check(should_stop)
+            contributions = [salary * contribution_rate for salary in salaries]
+            for i, growth in enumerate(growths):
+                balance = opening
+                for contribution in contributions:
+                    balance = (balance + contribution).quantize(QUANT)
+                    balance = (balance * growth).quantize(QUANT)
+                cells[i][j][k] = balance.quantize(QUANT, rounding=ROUND_HALF_UP)
+    return DCGridOutput(
+        axes={axis: getattr(inp, axis) for axis in AXES}, final_balance=cells
+    )
@@ -0,0 +1,264 @@
+"""
+Model-point compression for scheme-level DC projections.
+
+Members are bucketed by configurable bands (age, salary, balance, horizon).
+Each bucket becomes one weighted model point carrying the bucket's mean
+inputs. Only the points are projected; scheme totals are point results times
+their weights.
+
+For a fixed horizon and rates a DC projection is linear in balance and
+salary, so with a 1-year horizon band the means reproduce bucket totals up
+to cent rounding. Wider horizon (or age) bands trade accuracy for fewer
+points. estimate_error() measures the actual error against exact
+per-member projections.
+
+Each function takes an optional `should_stop` (see pensionlib.cancel),
+polled every CHECK_EVERY members or points.
+"""
+
+import random
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .calculations import project_dc_account
+from .cancel import CHECK_EVERY, StopCheck, check
+from .models import DCProjectionInput
+
+
+class MemberData(NamedTuple):
+    current_balance: Decimal
+    annual_salary: Decimal
+    age: int
+    years: int  # horizon: years to retirement
+
+
+@dataclass(frozen=True)
+class Bands:
+    """Band widths per dimension; None puts every member in one band."""
+
+    age: Optional[int] = None
+    salary: Optional[Decimal] = Decimal("25000")
+    balance: Optional[Decimal] = Decimal("50000")
+    horizon: Optional[int] = 1
+
+    def key_function(self) -> Callable[[MemberData], Tuple[int, int, int, int]]:
+        """member -> band indices (age, salary, balance, horizon)."""
+        age, salary, balance, horizon = (
+            float(width) if width else 0.0
+            for width in (self.age, self.salary, self.balance, self.horizon)
+        )
+
+        def key(member):
+            return (
+                int(member.age // age) if age else 0,
+                int(float(member.annual_salary) // salary) if salary else 0,
+                int(float(member.current_balance) // balance) if balance else 0,
+                int(member.years // horizon) if horizon else 0,
+            )
+
+        return key
+
+
+@dataclass(frozen=True)
+class ModelPoint:
+    key: Tuple[int, int, int, int]
+    weight: int  # members represented
+    current_balance: Decimal  # bucket means
+    annual_salary: Decimal
+    age: Decimal
+    years: int
+
+
+@dataclass(frozen=True)
+class ModelPointProjection:
+    points: List[ModelPoint]
+    final_balances: List[Decimal]  # per member of each point, same order
+    members: int
+    total_final_balance: Decimal
+
+
+@dataclass(frozen=True)
+class ErrorEstimate:
+    sampled_points: int
+    sampled_members: int
+    exact_total: Decimal  # exact projections of the sampled members
+    model_total: Decimal  # the same members as model points
+    relative_error: Decimal  # (model - exact) / exact over the sample
+    max_point_relative_error: Decimal
+
+
+def compress(
+    members: Iterable[MemberData],
+    bands: Bands = Bands(),
+    should_stop: StopCheck = None,
+) -> List[ModelPoint]:
+    """Bucket members by `bands` into weighted model points (one pass)."""
+    sums: Dict[tuple, list] = {}
+    key_of = bands.key_function()
+    for n, member in enumerate(members):
+        if not n % CHECK_EVERY:
+            check(should_stop)
+        key = key_of(member)
+        acc = sums.get(key)
+        if acc is None:
+            sums[key] = [
+                1,
+                Decimal(member.current_balance),
+                Decimal(member.annual_salary),
+                member.age,
+                member.years,
+            ]
+        else:
+            acc[0] += 1
+            acc[1] += member.current_balance
+            acc[2] += member.annual_salary
+            acc[3] += member.age
+            acc[4] += member.years
+    points = []
+    for key in sorted(sums):
+        weight, balance, salary, age, years = sums[key]
+        points.append(
+            ModelPoint(
+                key=key,
+                weight=weight,
+                current_balance=balance / weight,
+                annual_salary=salary / weight,
+                age=Decimal(age) / weight,
+                # half-up: the mean horizon of the bucket
+                years=int(Decimal(years) / weight + Decimal("0.5")),
+            )
+        )
+    return points
+
+
+def _project(balance, salary, years, contribution_rate, salary_growth, rate_of_return):
+    return project_dc_account(
+        DCProjectionInput(
+            current_balance=balance,
+            annual_salary=salary,
+            years=years,
+            contribution_rate=contribution_rate,
+            salary_growth=salary_growth,
+            rate_of_return=rate_of_return,
+        )
+    ).final_balance
+
+
+def project_model_points(
+    points: Sequence[ModelPoint],
+    contribution_rate: Decimal,
+    salary_growth: Decimal,
+    rate_of_return: Decimal,
+    should_stop: StopCheck = None,
+) -> ModelPointProjection:
+    """Project each point once and scale by its weight."""
+    finals = []
+    for n, p in enumerate(points):
+        if not n % CHECK_EVERY:
+            check(should_stop)
+        finals.append(
+            _project(
+                p.current_balance,
+                p.annual_salary,
+                p.years,
+                contribution_rate,
+                salary_growth,
+                rate_of_return,
+            )
+        )
+    return ModelPointProjection(
+        points=list(points),
+        final_balances=finals,
+        members=sum(p.weight for p in points),
+        total_final_balance=sum(
+            (f * p.weight for p, f in zip(points, finals)), Decimal("0.00")
+        ),
+    )
+
+
+def estimate_error(
+    members: Iterable[MemberData],
+    projection: ModelPointProjection,
+    bands: Bands,
+    contribution_rate: Decimal,
+    salary_growth: Decimal,
+    rate_of_return: Decimal,
+    sample_members: Optional[int] = 2000,
+    seed: int = 0,
+    should_stop: StopCheck = None,
+) -> ErrorEstimate:
+    """
+    Compare model points with exact per-member projections.
+
+    Whole points are sampled at random while they fit in `sample_members`
+    members; if no point is that small, the smallest point is used. Every
+    member of a sampled point is projected exactly, so each sampled point is
+    compared like-for-like with its weight times its point result.
+    sample_members=None compares against the full run. `members` must yield
+    the same members that were compressed.
+    """
+    by_key = {
+        p.key: (p, f) for p, f in zip(projection.points, projection.final_balances)
+    }
+    keys = list(by_key)
+    if sample_members is not None:
+        random.Random(seed).shuffle(keys)
+        chosen, covered = [], 0
+        for key in keys:
+            weight = by_key[key][0].weight
+            if covered + weight <= sample_members:
+                chosen.append(key)
+                covered += weight
+        if not chosen and keys:
+            chosen = [min(keys, key=lambda k: by_key[k][0].weight)]
+        keys = chosen
+    exact = dict.fromkeys(keys, Decimal("0.00"))
+    key_of = bands.key_function()
+    for n, member in enumerate(members):
+        if not n % CHECK_EVERY:
+            check(should_stop)
+        key = key_of(member)
+        if key in exact:
+            exact[key] += _project(
+                member.current_balance,
+                member.annual_salary,
+                member.years,
+                contribution_rate,
+                salary_growth,
+                rate_of_return,
+            )
+
+    exact_total = model_total = Decimal("0.00")
+    max_point_error = Decimal(0)
+    sampled_members = 0
+    for key, point_exact in exact.items():
+        point, final = by_key[key]
+        point_model = final * point.weight
+        exact_total += point_exact
+        model_total += point_model
+        sampled_members += point.weight
+        if point_exact:
+            max_point_error = max(
+                max_point_error, abs(point_model - point_exact) / abs(point_exact)
+            )
+    relative = (
+        (model_total - exact_total) / abs(exact_total) if exact_total else Decimal(0)
+    )
+    return ErrorEstimate(
+        sampled_points=len(exact),
+        sampled_members=sampled_members,
+        exact_total=exact_total,
+        model_total=model_total,
+        relative_error=relative,
+        max_point_relative_error=max_point_error,
+    )
@@ -1,6 +1,6 @@
-﻿from pydantic import BaseModel, Field, field_validator
+﻿from pydantic import BaseModel, Field, field_validator, model_validator
 from decimal import Decimal
-from typing import List
+from typing import Dict, List
 
 
 class DCProjectionInput(BaseModel):
@@ -67,3 +67,95 @@ class AnnuityInput(BaseModel):
 class AnnuityOutput(BaseModel):
     periodic_payment: Decimal
     annuity_factor: Decimal
+
+
+# Goal-seek solver (pensionlib.solver)
+class ContributionRateSolveInput(BaseModel):
+    current_balance: Decimal
+    annual_salary: Decimal
+    years: int = Field(..., ge=0)
+    salary_growth: Decimal
+    rate_of_return: Decimal
+    target_balance: Decimal
+    precision: Decimal = Decimal("0.000001")  # step of the returned rate
+
+    @field_validator("salary_growth", "rate_of_return", "precision", mode="before")
+    def _to_decimal_solve(cls, v):
+        return Decimal(str(v))
+
+    @field_validator("precision")
+    def _check_precision(cls, v):
+        if v <= 0:
+            raise ValueError("precision must be positive")
+        return v
+
+
+class ContributionRateSolveOutput(BaseModel):
+    contribution_rate: Decimal  # smallest multiple of precision reaching the target
+    final_balance: Decimal  # exact projection at that rate
+    closed_form_rate: Decimal  # unrounded growing-annuity estimate
+
+
+class YearsSolveInput(BaseModel):
+    current_balance: Decimal
+    annual_salary: Decimal
+    contribution_rate: Decimal
+    salary_growth: Decimal
+    rate_of_return: Decimal
+    target_balance: Decimal
+    max_years: int = Field(100, ge=0)
+
+    @field_validator(
+        "contribution_rate", "salary_growth", "rate_of_return", mode="before"
+    )
+    def _to_decimal_solve_years(cls, v):
+        return Decimal(str(v))
+
+
+class YearsSolveOutput(BaseModel):
+    years: int
+    final_balance: Decimal
+
+
+# Scenario grid sweep (pensionlib.grid)
+MAX_GRID_CELLS = 10_000
+
+
+class DCGridInput(BaseModel):
+    current_balance: Decimal
+    annual_salary: Decimal
+    years: int = Field(..., ge=0)
+    rate_of_return: List[Decimal] = Field(..., min_length=1)
+    contribution_rate: List[Decimal] = Field(..., min_length=1)
+    salary_growth: List[Decimal] = Field(..., min_length=1)
+
+    @field_validator(
+        "rate_of_return", "contribution_rate", "salary_growth", mode="before"
+    )
+    def _to_decimal_list(cls, v):
+        return [Decimal(str(x)) for x in v]
+
+    @field_validator("contribution_rate")
+    def _check_contributions(cls, v):
+        if any(x < 0 or x > 1 for x in v):
+            raise ValueError("contribution_rate must be between 0 and 1 (decimal)")
+        return v
+
+    @model_validator(mode="after")
+    def _check_size(self):
+        cells = (
+            len(self.rate_of_return)
+            * len(self.contribution_rate)
+            * len(self.salary_growth)
+        )
+        if cells > MAX_GRID_CELLS:
+            raise ValueError(f"grid has {cells} cells; at most {MAX_GRID_CELLS}")
+        return self
+
+
+class DCGridOutput(BaseModel):
+    # axis name -> values, in the order of final_balance's dimensions
+    axes: Dict[str, List[Decimal]]
+    # final_balance[i][j][k] for rate_of_return[i], contribution_rate[j],
+    # salary_growth[k]
+    final_balance: List[List[List[Decimal]]]
@@ -6,4 +6,6 @@ setup(
     description="Deterministic pension actuarial engine (pensionlib)",
     packages=find_packages(),
     install_requires=["pydantic>=2.0"],
+    # vectorized FAST precision mode in pensionlib.engine; pure Python without it
+    extras_require={"fast": ["numpy>=1.24"]},
 )
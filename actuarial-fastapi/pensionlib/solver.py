@@ -0,0 +1,140 @@
+"""
+Goal-seek solvers for DC projections: the contribution rate, or the number
+of years, needed to reach a target final balance.
+
+project_dc_account grows the balance as
+
+    B_y = (B_{y-1} + c * S_y) * (1 + r),    S_y = S_0 * (1 + g)^(y-1)
+
+so, ignoring cent rounding, the balance after n years is B_0*(1+r)^n + c*S_0*A
+with the growing-annuity factor
+
+    A = (1+r) * ((1+r)^n - (1+g)^n) / (r - g)     (n * (1+r)^n when r == g)
+
+solve_contribution_rate() takes c from that closed form, rounded up to
+`precision`, as the first guess of a bisection over the multiples of
+`precision` in [0, 1], checked against the exact rounded projection. The
+rounded projection never decreases as the rate rises (for a non-negative
+salary and return above -100%), so the bisection finds the smallest rate
+that reaches the target however far cent rounding moved it from the
+estimate; a good estimate settles it in two evaluations. solve_years() is a
+single exact forward pass that stops at the first year reaching the target.
+"""
+
+from decimal import ROUND_CEILING, ROUND_HALF_UP, Decimal
+
+from .engine import exact_final_balance
+from .models import (
+    ContributionRateSolveInput,
+    ContributionRateSolveOutput,
+    YearsSolveInput,
+    YearsSolveOutput,
+)
+from .money import DEFAULT_CONTEXT, QUANT
+
+MAX_CONTRIBUTION_RATE = Decimal(1)
+
+
+def annuity_factor(years: int, salary_growth: Decimal, rate: Decimal) -> Decimal:
+    """A: balance at year `years` per unit of first-year contribution."""
+    growth = Decimal(1) + rate
+    if rate == salary_growth:
+        return years * growth**years
+    return (
+        growth
+        * (growth**years - (Decimal(1) + salary_growth) ** years)
+        / (rate - salary_growth)
+    )
+
+
+def solve_contribution_rate(
+    inp: ContributionRateSolveInput,
+) -> ContributionRateSolveOutput:
+    """
+    Smallest contribution rate (a multiple of inp.precision) whose projection
+    reaches inp.target_balance. ValueError if no rate <= 1 does.
+    """
+    balance, salary, years = inp.current_balance, inp.annual_salary, inp.years
+    g, r, target, step = (
+        inp.salary_growth,
+        inp.rate_of_return,
+        inp.target_balance,
+        inp.precision,
+    )
+
+    top = int((MAX_CONTRIBUTION_RATE / step).to_integral_value(ROUND_CEILING))
+    balances = {}
+
+    def grid_rate(k):  # the k-th multiple of step, capped at the maximum
+        return min(k * step, MAX_CONTRIBUTION_RATE)
+
+    def reaches(k):
+        if k not in balances:
+            balances[k] = exact_final_balance(
+                balance, salary, grid_rate(k), g, r, years
+            )
+        return balances[k] >= target
+
+    factor = annuity_factor(years, g, r) * salary
+    shortfall = target - balance * (Decimal(1) + r) ** years
+    if factor > 0:
+        estimate = shortfall / factor
+    else:  # no salary or no years: contributions cannot move the balance
+        estimate = Decimal(0) if shortfall <= 0 else MAX_CONTRIBUTION_RATE + step
+
+    # bisect grid indices: grid_rate(hi) reaches the target (once checked),
+    # grid_rate(lo) does not (lo == -1 stands for "below zero")
+    lo, hi = -1, top
+    guess = (estimate / step).to_integral_value(ROUND_CEILING)
+    guess = int(min(max(guess, 0), top))
+    if reaches(guess):
+        hi = guess
+        if guess > 0 and not reaches(guess - 1):
+            lo = guess - 1
+    else:
+        lo = guess
+        if guess < top and reaches(guess + 1):
+            hi = guess + 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if reaches(mid):
+            hi = mid
+        else:
+            lo = mid
+    if not reaches(hi):  # only when even the top rate falls short
+        raise ValueError(
+            f"target {target} is not reachable in {years} years "
+            f"with a contribution rate of at most {MAX_CONTRIBUTION_RATE}"
+        )
+
+    return ContributionRateSolveOutput(
+        contribution_rate=grid_rate(hi),
+        final_balance=balances[hi],
+        closed_form_rate=estimate,
+    )
+
+
+def solve_years(inp: YearsSolveInput) -> YearsSolveOutput:
+    """
+    Fewest whole years after which the projection reaches inp.target_balance.
+    ValueError if it takes more than inp.max_years.
+    """
+    balance = DEFAULT_CONTEXT.create_decimal(str(inp.current_balance))
+    salary = DEFAULT_CONTEXT.create_decimal(str(inp.annual_salary))
+    growth = Decimal(1) + inp.rate_of_return
+    salary_factor = Decimal(1) + inp.salary_growth
+    c, target = inp.contribution_rate, inp.target_balance
+    years = 0
+    # same steps as exact_final_balance, checking the target after each year
+    while balance.quantize(QUANT, rounding=ROUND_HALF_UP) < target:
+        if years >= inp.max_years:
+            raise ValueError(
+                f"target {target} is not reached within {inp.max_years} years"
+            )
+        balance = (balance + salary * c).quantize(QUANT)
+        balance = (balance * growth).quantize(QUANT)
+        salary = (salary * salary_factor).quantize(QUANT)
+        years += 1
+    return YearsSolveOutput(
+        years=years, final_balance=balance.quantize(QUANT, rounding=ROUND_HALF_UP)
+    )
@@ -1,6 +1,8 @@
 ﻿import pytest
+from fastapi.testclient import TestClient
 from httpx import AsyncClient
 from api.main import app
+from api.routes import maybe_verify_jwt
 
 # place pytest_plugins AFTER imports to satisfy ruff/flake rules
 pytest_plugins = ["pytest_asyncio"]
@@ -10,3 +12,11 @@ pytest_plugins = ["pytest_asyncio"]
 async def async_client():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
+
+
+@pytest.fixture
+def main_client():
+    """api.main's app as served (middleware, /v1 prefix), with JWT checks stubbed."""
+    app.dependency_overrides[maybe_verify_jwt] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.pop(maybe_verify_jwt, None)
@@ -0,0 +1,85 @@
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from api import auth_deps
+from api.auth_deps import ALGORITHM, JWT_SIGNING_KEY, VerifiedTokenCache
+
+
+def _token(exp_in: float = 60, **claims) -> str:
+    payload = {"user_id": 1, "exp": int(time.time() + exp_in), **claims}
+    return jwt.encode(payload, JWT_SIGNING_KEY, algorithm=ALGORITHM)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """A fresh token_cache, and the list of tokens jwt.decode was called for."""
+    monkeypatch.setattr(auth_deps, "token_cache", VerifiedTokenCache(maxsize=8))
+    calls = []
+    real = jwt.decode
+
+    def decode(token, *args, **kwargs):
+        calls.append(token)
+        return real(token, *args, **kwargs)
+
+    monkeypatch.setattr(auth_deps.jwt, "decode", decode)
+    return calls
+
+
+def test_cache_hit_skips_the_decode(decodes):
+    token = _token()
+    first = auth_deps.decode_token(token)
+    assert auth_deps.decode_token(token) == first
+    assert decodes == [token]
+
+
+def test_expired_token_is_verified_again(decodes):
+    token = _token(exp_in=-1)
+    # as if it had been cached while still valid
+    auth_deps.token_cache.put(
+        token, jwt.decode(token, options={"verify_signature": False})
+    )
+    decodes.clear()
+    with pytest.raises(HTTPException) as exc:
+        auth_deps.decode_token(token)
+    assert exc.value.status_code == 401
+    assert decodes == [token]
+    assert auth_deps.token_cache.stats()["expirations"] == 1
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = VerifiedTokenCache(maxsize=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}  # "b" is now the oldest
+    cache.put("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1} and cache.get("c") == {"n": 3}
+
+
+def test_maxsize_zero_disables_the_cache():
+    cache = VerifiedTokenCache(maxsize=0)
+    cache.put("a", {"n": 1})
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_stats_count_lookups():
+    cache = VerifiedTokenCache(maxsize=1)
+    cache.put("a", {"exp": 100})
+    cache.get("a", now=50)  # hit
+    cache.get("x", now=50)  # miss
+    cache.put("b", {})  # evicts "a"
+    cache.put("c", {"exp": 100})  # evicts "b"
+    cache.get("c", now=200)  # expired: a miss too
+    assert cache.stats() == {
+        "size": 0,
+        "maxsize": 1,
+        "hits": 1,
+        "misses": 2,
+        "evictions": 2,
+        "expirations": 1,
+        "hit_rate": 1 / 3,
+    }
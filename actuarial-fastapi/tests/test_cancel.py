@@ -0,0 +1,136 @@
+import asyncio
+import time
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import deps, routes
+from pensionlib.cancel import Cancelled, check
+from pensionlib.grid import dc_grid
+from pensionlib.model_points import MemberData, compress, project_model_points
+from pensionlib.models import DCGridInput
+
+GRID = DCGridInput(
+    current_balance="10000.00",
+    annual_salary="40000.00",
+    years=10,
+    rate_of_return=["0.03", "0.05"],
+    contribution_rate=["0.05", "0.10"],
+    salary_growth=["0.00", "0.02"],
+)
+
+
+def test_grid_stops_between_chunks():
+    polls = []
+
+    def should_stop():
+        polls.append(1)
+        return len(polls) > 2
+
+    with pytest.raises(Cancelled):
+        dc_grid(GRID, should_stop)
+    assert len(polls) == 3
+    # never asked to stop: same result as without a check
+    assert dc_grid(GRID, lambda: False) == dc_grid(GRID)
+
+
+def test_model_points_stop_when_asked():
+    members = [MemberData(Decimal("1000"), Decimal("30000"), 40, 25) for _ in range(10)]
+    with pytest.raises(Cancelled):
+        compress(members, should_stop=lambda: True)
+    points = compress(members)
+    with pytest.raises(Cancelled):
+        project_model_points(
+            points,
+            Decimal("0.1"),
+            Decimal("0.02"),
+            Decimal("0.05"),
+            should_stop=lambda: True,
+        )
+
+
+def _batch_client():
+    app = FastAPI()
+    app.include_router(routes.router)
+    app.dependency_overrides[routes.maybe_verify_jwt] = lambda: None
+    return TestClient(app)
+
+
+CSV = (
+    "current_balance,annual_salary,years,contribution_rate,salary_growth,rate_of_return\n"
+    + "1000,30000,20,0.1,0.02,0.05\n" * 5
+    + "oops,30000,20,0.1,0.02,0.05\n"
+)
+
+
+def test_batch_expired_deadline_returns_504():
+    client = _batch_client()
+    resp = client.post(
+        "/batch/dc_project",
+        files={"file": ("rows.csv", CSV, "text/csv")},
+        headers={deps.DEADLINE_HEADER: "0"},
+    )
+    assert resp.status_code == 504
+
+
+def test_batch_within_deadline_keeps_row_order(monkeypatch):
+    monkeypatch.setattr(routes, "BATCH_CHUNK_ROWS", 2)
+    client = _batch_client()
+    resp = client.post(
+        "/batch/dc_project",
+        files={"file": ("rows.csv", CSV, "text/csv")},
+        headers={deps.DEADLINE_HEADER: "60"},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 6
+    assert [r["row_index"] for r in body["results"]] == [1, 2, 3, 4, 5, 6]
+    assert "error" in body["results"][5]
+
+
+class _GoneRequest:
+    """A request whose client has already disconnected."""
+
+    async def is_disconnected(self):
+        return True
+
+
+def test_wait_polls_disconnect_and_stops_the_executor_loop():
+    token = deps.CancelToken(_GoneRequest())
+
+    def work(should_stop):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            check(should_stop)
+            time.sleep(0.001)
+        return "finished"
+
+    async def run():
+        return await token.wait(deps.run_pensionlib(work, token.should_stop), 0.01)
+
+    with pytest.raises(Cancelled):
+        asyncio.run(run())
+    assert token.reason == "disconnected"
+
+
+RATES = [f"{i / 100:.2f}" for i in range(1, 20)]
+
+
+def test_grid_deadline_under_main_middleware_stack(main_client):
+    # main's BaseHTTPMiddleware stack: disconnect polling must not hang the sweep
+    body = {
+        "current_balance": "1000.00",
+        "annual_salary": "30000.00",
+        "years": 200,
+        "rate_of_return": RATES,
+        "contribution_rate": RATES,
+        "salary_growth": RATES[:10],
+    }
+    started = time.monotonic()
+    resp = main_client.post(
+        "/v1/dc/grid", json=body, headers={deps.DEADLINE_HEADER: "0.05"}
+    )
+    assert resp.status_code == 504
+    assert time.monotonic() - started < 0.5  # stopped mid-sweep
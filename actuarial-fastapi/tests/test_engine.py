@@ -0,0 +1,124 @@
+"""
+Parity between the engine's precision modes and the reference
+project_dc_account: EXACT must match it to the cent, FAST must stay within
+fast_error_bound().
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from pensionlib import engine
+from pensionlib.cancel import Cancelled
+from pensionlib.calculations import project_dc_account
+from pensionlib.models import DCProjectionInput, DCProjectionOutput
+
+
+def _random_inputs(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        DCProjectionInput(
+            # sub-cent digits exercise the opening-value rounding
+            current_balance=f"{rng.uniform(0, 1_000_000):.3f}",
+            annual_salary=f"{rng.uniform(0, 300_000):.3f}",
+            contribution_rate=f"{rng.uniform(0, 0.3):.4f}",
+            salary_growth=f"{rng.uniform(-0.02, 0.08):.4f}",
+            rate_of_return=f"{rng.uniform(-0.05, 0.12):.4f}",
+            years=rng.randint(0, 70),
+        )
+        for _ in range(count)
+    ]
+
+
+INPUTS = _random_inputs(300)
+
+
+def test_exact_matches_reference_to_the_cent():
+    for inp in INPUTS:
+        assert engine.project_dc(inp, engine.EXACT) == project_dc_account(inp)
+
+
+def test_exact_final_balances_match_reference():
+    expected = [project_dc_account(inp).final_balance for inp in INPUTS]
+    assert engine.final_balances(INPUTS, engine.EXACT) == expected
+
+
+def test_fast_within_bound():
+    for inp in INPUTS:
+        exact = project_dc_account(inp)
+        fast = engine.project_dc(inp, engine.FAST)
+        assert abs(fast.final_balance - exact.final_balance) <= engine.fast_error_bound(
+            inp
+        )
+        assert len(fast.annual_balances) == len(exact.annual_balances)
+
+
+def test_fast_bound_is_tight_for_typical_inputs():
+    inp = DCProjectionInput(
+        current_balance="10000.00",
+        annual_salary="40000.00",
+        contribution_rate="0.10",
+        salary_growth="0.02",
+        rate_of_return="0.05",
+        years=40,
+    )
+    assert engine.fast_error_bound(inp) < Decimal("5.00")
+
+
+def test_vectorized_fast_matches_python_loop(monkeypatch):
+    vectorized = engine.final_balances(INPUTS, engine.FAST)
+    monkeypatch.setattr(engine, "np", None)
+    assert engine.final_balances(INPUTS, engine.FAST) == vectorized
+
+
+def test_fast_projection_matches_project_dc():
+    for inp in INPUTS:
+        data = engine.fast_projection(inp)
+        assert len(data["annual_balances"]) == inp.years
+        expected = DCProjectionOutput.model_validate(data)
+        assert engine.project_dc(inp, engine.FAST) == expected
+
+
+def test_fast_projection_numpy_matches_python_loop(monkeypatch):
+    vectorized = [engine.fast_projection(inp)["final_balance"] for inp in INPUTS]
+    monkeypatch.setattr(engine, "np", None)
+    python = [engine.fast_projection(inp)["final_balance"] for inp in INPUTS]
+    assert python == vectorized
+
+
+def test_fast_rows_stop_when_asked():
+    with pytest.raises(Cancelled):
+        engine.fast_projection(INPUTS[0].model_copy(update={"years": 5}), lambda: True)
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        engine.project_dc(INPUTS[0], "approximate")
+
+
+def test_served_precision_modes(main_client):
+    body = {
+        "current_balance": "10000.00",
+        "annual_salary": "40000.00",
+        "years": 40,
+        "assumptions": {
+            "contribution_rate": "0.10",
+            "salary_growth": "0.02",
+            "rate_of_return": "0.05",
+        },
+    }
+    exact = main_client.post("/v1/dc/balances", json=body).json()
+    fast = main_client.post("/v1/dc/balances", json={**body, "precision": "fast"})
+    assert isinstance(exact["final_balance"], str)
+    assert isinstance(fast.json()["final_balance"], float)
+    gap = abs(
+        Decimal(repr(fast.json()["final_balance"])) - Decimal(exact["final_balance"])
+    )
+    assert gap <= Decimal("5.00")
+
+
+def test_dashboard_projection_has_one_handler(main_client):
+    paths = [getattr(r, "path", None) for r in main_client.app.routes]
+    assert paths.count("/v1/dc/project") == 1
+    assert main_client.post("/v1/dc/project", json={"years": 3}).json()["ok"]
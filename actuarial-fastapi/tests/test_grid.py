@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from pensionlib.calculations import project_dc_account
+from pensionlib.grid import dc_grid
+from pensionlib.models import DCGridInput, DCProjectionInput
+
+
+def test_grid_cells_match_individual_projections():
+    inp = DCGridInput(
+        current_balance="10000.00",
+        annual_salary="40000.00",
+        years=25,
+        rate_of_return=["0.03", "0.05"],
+        contribution_rate=["0.05", "0.10", "0.15"],
+        salary_growth=["0.00", "0.025"],
+    )
+    out = dc_grid(inp)
+    assert list(out.axes) == ["rate_of_return", "contribution_rate", "salary_growth"]
+    for i, r in enumerate(inp.rate_of_return):
+        for j, c in enumerate(inp.contribution_rate):
+            for k, g in enumerate(inp.salary_growth):
+                expected = project_dc_account(
+                    DCProjectionInput(
+                        current_balance=Decimal("10000.00"),
+                        annual_salary=Decimal("40000.00"),
+                        contribution_rate=c,
+                        salary_growth=g,
+                        rate_of_return=r,
+                        years=25,
+                    )
+                ).final_balance
+                assert out.final_balance[i][j][k] == expected
+
+
+GRID_BODY = {
+    "current_balance": "10000.00",
+    "annual_salary": "40000.00",
+    "years": 20,
+    "rate_of_return": ["0.03", "0.05"],
+    "contribution_rate": ["0.10"],
+    "salary_growth": ["0.02"],
+}
+
+
+def test_grid_endpoint_is_served(main_client):
+    resp = main_client.post("/v1/dc/grid", json=GRID_BODY)
+    assert resp.status_code == 200
+    assert len(resp.json()["final_balance"]) == 2
+
+
+def test_grid_endpoint_rejects_out_of_range_inputs(main_client):
+    resp = main_client.post("/v1/dc/grid", json={**GRID_BODY, "years": 2000})
+    assert resp.status_code == 422
+    resp = main_client.post(
+        "/v1/dc/grid", json={**GRID_BODY, "years": 200, "rate_of_return": ["1000"]}
+    )
+    assert resp.status_code == 422
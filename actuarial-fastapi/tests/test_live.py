@@ -0,0 +1,103 @@
+import threading
+import time
+
+import jwt
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from api import live
+from api.auth_deps import ALGORITHM, JWT_SIGNING_KEY
+from pensionlib import engine
+from pensionlib.cancel import Cancelled
+
+EDIT = {
+    "current_balance": "1000.00",
+    "annual_salary": "30000.00",
+    "years": 5,
+    "assumptions": {
+        "contribution_rate": "0.10",
+        "salary_growth": "0.02",
+        "rate_of_return": "0.05",
+    },
+}
+SLOW_YEARS = 99  # years value the stub below blocks on until told to stop
+
+
+def _protocols():
+    token = jwt.encode(
+        {"user_id": 0, "token_type": "access", "exp": int(time.time()) + 60},
+        JWT_SIGNING_KEY,
+        algorithm=ALGORITHM,
+    )
+    return [live.SUBPROTOCOL, live.TOKEN_SUBPROTOCOL_PREFIX + token]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(live, "DEBOUNCE_SECONDS", 0.05)
+    app = FastAPI()
+    app.include_router(live.router, prefix="/v1")
+    return TestClient(app)
+
+
+@pytest.fixture
+def slow_projection(monkeypatch):
+    """engine.project_dc, except SLOW_YEARS runs until should_stop() says so."""
+    started, stopped = threading.Event(), threading.Event()
+    real = engine.project_dc
+
+    def project_dc(inp, mode=engine.EXACT, should_stop=None):
+        if inp.years != SLOW_YEARS:
+            return real(inp, mode, should_stop)
+        started.set()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if should_stop is not None and should_stop():
+                stopped.set()
+                raise Cancelled("stopped")
+            time.sleep(0.005)
+        raise AssertionError("projection was never asked to stop")
+
+    monkeypatch.setattr(engine, "project_dc", project_dc)
+    return started, stopped
+
+
+def test_token_is_taken_from_the_subprotocol(client):
+    with client.websocket_connect("/v1/dc/live", subprotocols=_protocols()) as ws:
+        assert ws.accepted_subprotocol == live.SUBPROTOCOL
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/v1/dc/live", subprotocols=[live.SUBPROTOCOL]):
+            pass
+    assert exc.value.code == live.WS_POLICY_VIOLATION
+
+
+def test_burst_of_edits_gets_one_answer(client):
+    with client.websocket_connect("/v1/dc/live", subprotocols=_protocols()) as ws:
+        for seq, years in ((1, 10), (2, 20), (3, 30)):
+            ws.send_json({**EDIT, "seq": seq, "years": years})
+        msg = ws.receive_json()
+        assert msg["seq"] == 3 and msg["type"] == "projection"
+        assert len(msg["result"]["annual_balances"]) == 30
+        # had edits 1 and 2 been answered, their messages would come first
+        ws.send_json({**EDIT, "seq": 4})
+        assert ws.receive_json()["seq"] == 4
+
+
+def test_new_edit_stops_the_running_projection(client, slow_projection):
+    started, stopped = slow_projection
+    with client.websocket_connect("/v1/dc/live", subprotocols=_protocols()) as ws:
+        ws.send_json({**EDIT, "seq": 1, "years": SLOW_YEARS})
+        assert started.wait(2)
+        ws.send_json({**EDIT, "seq": 2})
+        assert ws.receive_json()["seq"] == 2
+        assert stopped.wait(2)  # the executor thread, not just the task
+
+
+def test_disconnect_stops_the_running_projection(client, slow_projection):
+    started, stopped = slow_projection
+    with client.websocket_connect("/v1/dc/live", subprotocols=_protocols()) as ws:
+        ws.send_json({**EDIT, "seq": 1, "years": SLOW_YEARS})
+        assert started.wait(2)
+    assert stopped.wait(2)
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import queue
+
+import pytest
+
+from api import deps, logging_config
+from api.logging_config import ContextFilter, DroppingQueueHandler, RouteSamplingFilter
+from api.middleware import request_id_ctx, route_ctx
+
+
+def _record(level=logging.INFO):
+    return logging.makeLogRecord(
+        {"name": "test", "levelno": level, "levelname": logging.getLevelName(level)}
+    )
+
+
+@pytest.fixture
+def on_route():
+    """Set route_ctx as the request middleware would, reset afterwards."""
+    tokens = []
+
+    def enter(route):
+        tokens.append(route_ctx.set(route))
+
+    yield enter
+    for token in reversed(tokens):
+        route_ctx.reset(token)
+
+
+def test_longest_prefix_wins(on_route):
+    sampler = RouteSamplingFilter(levels={"/v1": logging.INFO, "/v1/dc": logging.ERROR})
+    on_route("/v1/dc/project")
+    assert not sampler.filter(_record(logging.WARNING))
+    on_route("/v1/solve/years")
+    assert sampler.filter(_record(logging.INFO))
+
+
+def test_level_floor_applies_only_to_its_routes(on_route):
+    sampler = RouteSamplingFilter(levels={"/metrics": logging.WARNING})
+    on_route("/metrics")
+    assert not sampler.filter(_record(logging.INFO))
+    assert sampler.filter(_record(logging.WARNING))
+    on_route("/v1/dc/grid")
+    assert sampler.filter(_record(logging.DEBUG))
+
+
+def test_sampling_keeps_the_configured_fraction(on_route, monkeypatch):
+    draws = iter([0.2, 0.7, 0.99])
+    monkeypatch.setattr(logging_config.random, "random", lambda: next(draws))
+    sampler = RouteSamplingFilter(rates={"/v1/dc/project": 0.5})
+    on_route("/v1/dc/project")
+    assert sampler.filter(_record())  # 0.2 < 0.5
+    assert not sampler.filter(_record())  # 0.7
+    assert sampler.filter(_record(logging.WARNING))  # never sampled out
+    assert next(draws) == 0.99  # ...so no draw was spent on it
+
+
+def test_full_queue_drops_and_counts(monkeypatch):
+    monkeypatch.setattr(DroppingQueueHandler, "dropped", 0)
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.handle(_record())
+    assert handler.queue.qsize() == 1
+    assert DroppingQueueHandler.dropped == 2
+
+
+def test_executor_records_keep_the_request_context():
+    seen = []
+
+    def work():
+        record = _record()
+        ContextFilter().filter(record)
+        seen.append((record.request_id, record.route))
+
+    async def request():  # asyncio.run() gives it its own context
+        request_id_ctx.set("rid-1")
+        route_ctx.set("/v1/dc/grid")
+        await deps.run_pensionlib(work)
+
+    asyncio.run(request())
+    assert seen == [("rid-1", "/v1/dc/grid")]
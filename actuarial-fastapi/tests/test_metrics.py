@@ -0,0 +1,71 @@
+import json
+import os
+
+from api import metrics
+from api.metrics import Counter, Gauge, Histogram, Registry
+
+
+def _lines(registry):
+    return registry.render().splitlines()
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = Registry()
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency", ["route"], buckets=(1.0, 0.1))
+    )
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, route="/x")
+    assert _lines(registry) == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/x",le="0.1"} 1',
+        'latency_seconds_bucket{route="/x",le="1"} 2',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 3',
+        'latency_seconds_sum{route="/x"} 5.55',
+        'latency_seconds_count{route="/x"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.register(Counter("hits_total", "Hits", ["path"])).inc(path='a"b\\c\nd')
+    assert 'hits_total{path="a\\"b\\\\c\\nd"} 1' in _lines(registry)
+
+
+def test_workers_are_merged_from_the_shared_dir(tmp_path, monkeypatch):
+    def worker(rows, busy, latency):
+        registry = Registry()
+        registry.register(Counter("rows_total", "Rows")).inc(rows)
+        registry.register(Gauge("busy", "Busy")).set(busy)
+        registry.register(
+            Histogram("latency_seconds", "Latency", buckets=(1.0,))
+        ).observe(latency)
+        return registry
+
+    # two other workers left snapshots: pid 1001 is alive, pid 1002 exited
+    for pid, registry in ((1001, worker(2, 10, 0.5)), (1002, worker(3, 20, 5))):
+        (tmp_path / f"metrics-{pid}.json").write_text(json.dumps(registry.snapshot()))
+    monkeypatch.setattr(metrics, "_pid_alive", lambda pid: pid == 1001)
+
+    own = worker(1, 5, 0.5)
+    own.multiproc_dir = str(tmp_path)
+    lines = _lines(own)
+    assert "rows_total 6" in lines  # counters from every worker
+    assert "busy 15" in lines  # gauges from live workers only
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+    assert (tmp_path / f"metrics-{os.getpid()}.json").exists()
+
+
+def test_metrics_endpoint_reports_served_requests(main_client):
+    assert main_client.post("/v1/dc/project", json={"years": 3}).status_code == 200
+    resp = main_client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    count = (
+        "http_request_duration_seconds_count"
+        '{method="POST",route="/v1/dc/project",status="200"} '
+    )
+    assert any(line.startswith(count) for line in resp.text.splitlines())
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from pensionlib.model_points import (
+    Bands,
+    MemberData,
+    compress,
+    estimate_error,
+    project_model_points,
+)
+
+RATES = (Decimal("0.10"), Decimal("0.02"), Decimal("0.05"))
+
+
+def _members(n=600):
+    return [
+        MemberData(
+            current_balance=Decimal(i * 97 % 80_000),
+            annual_salary=Decimal(20_000 + i * 131 % 60_000),
+            age=25 + i % 40,
+            years=40 - i % 40,
+        )
+        for i in range(n)
+    ]
+
+
+def test_points_preserve_weights_and_totals():
+    members = _members()
+    points = compress(members)
+    assert sum(p.weight for p in points) == len(members)
+    total_balance = sum(p.current_balance * p.weight for p in points)
+    assert abs(total_balance - sum(m.current_balance for m in members)) < Decimal(
+        "0.0001"
+    )
+
+
+def test_error_against_full_run():
+    members = _members()
+    bands = Bands()
+    projection = project_model_points(compress(members, bands), *RATES)
+    full = estimate_error(members, projection, bands, *RATES, sample_members=None)
+    assert full.sampled_members == len(members)
+    assert full.model_total == projection.total_final_balance
+    # 1-year horizon bands: only cent rounding separates points from members
+    assert abs(full.relative_error) < Decimal("1e-6")
+
+    coarse = Bands(salary=None, balance=None, horizon=10)
+    projection = project_model_points(compress(members, coarse), *RATES)
+    estimate = estimate_error(members, projection, coarse, *RATES, sample_members=None)
+    assert abs(estimate.relative_error) > abs(full.relative_error)
+    assert estimate.max_point_relative_error >= abs(estimate.relative_error)
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import deps, profiling
+from api.middleware import ProfilingMiddleware
+
+TOKEN = "profile-secret"
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "profiles"
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", TOKEN)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(directory))
+    monkeypatch.setattr(profiling, "PROFILE_SLOW_MS", 0.0)
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_INTERVAL_MS", 1.0)
+    return directory
+
+
+@pytest.fixture
+def client(profile_dir):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    def work():
+        time.sleep(0.05)  # long enough for the stack sampler to see it
+        return sum(range(1000))
+
+    @app.get("/work")
+    async def work_endpoint():
+        return {"total": await deps.run_pensionlib(work)}
+
+    return TestClient(app)
+
+
+def test_requested_mode_needs_the_token(profile_dir, monkeypatch):
+    compared = []
+    real = profiling.hmac.compare_digest
+
+    def compare_digest(a, b):
+        compared.append((a, b))
+        return real(a, b)
+
+    monkeypatch.setattr(profiling.hmac, "compare_digest", compare_digest)
+    assert profiling.requested_mode({"x-profile": "sample"}, {}) is None
+    assert (
+        profiling.requested_mode(
+            {"x-profile": "sample", "x-profile-token": "guess"}, {}
+        )
+        is None
+    )
+    assert (
+        profiling.requested_mode({"x-profile": "sample", "x-profile-token": TOKEN}, {})
+        == "sample"
+    )
+    assert (
+        profiling.requested_mode({}, {"profile": "cprofile", "profile_token": TOKEN})
+        == "cprofile"
+    )
+    assert (b"guess", TOKEN.encode()) in compared
+
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")  # on-demand disabled
+    assert (
+        profiling.requested_mode({"x-profile": "sample", "x-profile-token": ""}, {})
+        is None
+    )
+
+
+@pytest.mark.parametrize(
+    "mode, suffix", [("cprofile", ".pstats"), ("sample", ".collapsed")]
+)
+def test_profiled_request_writes_a_capture(client, profile_dir, mode, suffix):
+    resp = client.get("/work", headers={"X-Profile": mode, "X-Profile-Token": TOKEN})
+    assert resp.status_code == 200
+    capture = resp.headers["x-profile-id"]
+    assert {p.name for p in profile_dir.iterdir()} == {
+        capture + ".json",
+        capture + suffix,
+    }
+    assert (profile_dir / (capture + suffix)).stat().st_size > 0
+
+
+def test_unprofiled_request_writes_nothing(client, profile_dir):
+    resp = client.get("/work", headers={"X-Profile": "cprofile"})  # no token
+    assert resp.status_code == 200
+    assert "x-profile-id" not in resp.headers
+    assert not profile_dir.exists()
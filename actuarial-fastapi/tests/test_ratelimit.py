@@ -0,0 +1,82 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import main
+from api.middleware import SimpleRateLimitMiddleware
+from api.ratelimit import MemoryBackend, SQLiteBackend, TokenBucket
+
+
+def test_bucket_refills_at_rate_up_to_capacity():
+    bucket = TokenBucket(capacity=2, rate=0.5)
+    allowed, tokens, _ = bucket.take(None, 0.0, 0.0)
+    assert allowed and tokens == 1.0
+    allowed, tokens, _ = bucket.take(tokens, 0.0, 0.0)
+    assert allowed and tokens == 0.0
+    allowed, tokens, retry_after = bucket.take(tokens, 0.0, 1.0)
+    assert not allowed and tokens == 0.5 and retry_after == 1.0
+    # a long idle period refills to capacity, no further
+    allowed, tokens, _ = bucket.take(tokens, 1.0, 100.0)
+    assert allowed and tokens == 1.0
+
+
+def test_bucket_rejects_non_positive_parameters():
+    with pytest.raises(ValueError):
+        TokenBucket(capacity=0, rate=1)
+
+
+def test_memory_backend_limits_each_key():
+    backend = MemoryBackend(TokenBucket(capacity=2, rate=1), shards=4)
+    assert backend.take("a", now=0.0) == (True, 0.0)
+    assert backend.take("a", now=0.0) == (True, 0.0)
+    assert backend.take("a", now=0.0) == (False, 1.0)
+    assert backend.take("b", now=0.0)[0]  # other clients are unaffected
+    assert backend.take("a", now=1.0)[0]
+
+
+def test_memory_backend_evicts_idle_and_excess_keys():
+    backend = MemoryBackend(TokenBucket(capacity=2, rate=1), shards=1, max_keys=3)
+    for key in "abc":
+        backend.take(key, now=0.0)
+    backend.take("d", now=0.5)  # over max_keys: the least recently used goes
+    assert len(backend) == 3
+    backend.take("e", now=10.0)  # everything else has refilled (ttl = 2s)
+    assert len(backend) == 1
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "ratelimit.sqlite3")
+    bucket = TokenBucket(capacity=2, rate=1)
+    first, second = SQLiteBackend(bucket, path=path), SQLiteBackend(bucket, path=path)
+    assert first.take("a", now=100.0)[0]
+    assert second.take("a", now=100.0)[0]
+    assert first.take("a", now=100.0) == (False, 1.0)
+    assert len(second) == 1
+
+
+def test_sqlite_backend_sweeps_idle_rows(tmp_path):
+    backend = SQLiteBackend(
+        TokenBucket(capacity=2, rate=1),
+        path=str(tmp_path / "ratelimit.sqlite3"),
+        sweep_interval=0,
+    )
+    backend.take("a", now=100.0)
+    backend.take("b", now=110.0)
+    assert len(backend) == 1
+
+
+def test_middleware_returns_429_with_retry_after():
+    app = FastAPI()
+    app.add_middleware(
+        SimpleRateLimitMiddleware, backend=MemoryBackend(TokenBucket(1, 0.1))
+    )
+    app.get("/ping")(lambda: {"ok": True})
+    client = TestClient(app)
+    assert client.get("/ping").status_code == 200
+    resp = client.get("/ping")
+    assert resp.status_code == 429
+    assert resp.headers["retry-after"] == "10"
+
+
+def test_main_app_is_rate_limited():
+    assert SimpleRateLimitMiddleware in [m.cls for m in main.app.user_middleware]
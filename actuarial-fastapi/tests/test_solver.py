@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+import pytest
+
+from pensionlib.calculations import project_dc_account
+from pensionlib.models import (
+    ContributionRateSolveInput,
+    DCProjectionInput,
+    YearsSolveInput,
+)
+from pensionlib.solver import solve_contribution_rate, solve_years
+
+BASE = {
+    "current_balance": Decimal("10000.00"),
+    "annual_salary": Decimal("40000.00"),
+    "salary_growth": Decimal("0.02"),
+    "rate_of_return": Decimal("0.05"),
+}
+TARGET = Decimal("1000000.00")
+
+
+def _final(contribution_rate, years):
+    return project_dc_account(
+        DCProjectionInput(**BASE, contribution_rate=contribution_rate, years=years)
+    ).final_balance
+
+
+def test_contribution_rate_is_smallest_that_reaches_target():
+    out = solve_contribution_rate(
+        ContributionRateSolveInput(**BASE, years=40, target_balance=TARGET)
+    )
+    assert out.final_balance == _final(out.contribution_rate, 40) >= TARGET
+    assert _final(out.contribution_rate - Decimal("0.000001"), 40) < TARGET
+
+
+def test_small_salary_far_from_closed_form_is_still_solved():
+    # cent rounding on a 1.00 salary moves the answer thousands of steps
+    # away from the closed-form estimate
+    base = {**BASE, "current_balance": Decimal(0), "annual_salary": Decimal("1.00")}
+    out = solve_contribution_rate(
+        ContributionRateSolveInput(**base, years=40, target_balance=Decimal(50))
+    )
+
+    def final(rate):
+        return project_dc_account(
+            DCProjectionInput(**base, contribution_rate=rate, years=40)
+        ).final_balance
+
+    assert out.final_balance == final(out.contribution_rate) >= 50
+    assert final(out.contribution_rate - Decimal("0.000001")) < 50
+    assert out.contribution_rate - out.closed_form_rate > Decimal("0.00005")
+
+
+def test_equal_growth_and_return_uses_limit_form():
+    base = {**BASE, "salary_growth": BASE["rate_of_return"]}
+    out = solve_contribution_rate(
+        ContributionRateSolveInput(**base, years=30, target_balance=TARGET)
+    )
+    assert abs(out.closed_form_rate - out.contribution_rate) < Decimal("0.0001")
+
+
+def test_years_is_fewest_that_reach_target():
+    out = solve_years(
+        YearsSolveInput(**BASE, contribution_rate="0.10", target_balance=TARGET)
+    )
+    assert (
+        _final(Decimal("0.10"), out.years)
+        >= TARGET
+        > _final(Decimal("0.10"), out.years - 1)
+    )
+
+
+def test_unreachable_target_raises():
+    with pytest.raises(ValueError):
+        solve_contribution_rate(
+            ContributionRateSolveInput(**BASE, years=1, target_balance=TARGET)
+        )
+
+
+SOLVE_BODY = {
+    "current_balance": "10000.00",
+    "annual_salary": "40000.00",
+    "salary_growth": "0.02",
+    "rate_of_return": "0.05",
+    "target_balance": "1000000.00",
+}
+
+
+def test_solve_endpoint_is_served(main_client):
+    resp = main_client.post(
+        "/v1/solve/contribution_rate", json={**SOLVE_BODY, "years": 40}
+    )
+    assert resp.status_code == 200
+    assert "compute" in resp.headers["server-timing"]  # ran in the threadpool
+
+
+def test_solve_endpoint_rejects_out_of_range_inputs(main_client):
+    resp = main_client.post(
+        "/v1/solve/contribution_rate", json={**SOLVE_BODY, "years": 2000}
+    )
+    assert resp.status_code == 422
+    # within the year cap, but the Decimal balance overflows
+    resp = main_client.post(
+        "/v1/solve/contribution_rate",
+        json={**SOLVE_BODY, "years": 200, "rate_of_return": "1000"},
+    )
+    assert resp.status_code == 422
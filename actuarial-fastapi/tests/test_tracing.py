@@ -0,0 +1,47 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import routes
+from api.middleware import RequestIDLoggingMiddleware
+
+BODY = {
+    "current_balance": "1000.00",
+    "annual_salary": "30000.00",
+    "years": 20,
+    "assumptions": {
+        "contribution_rate": "0.10",
+        "salary_growth": "0.02",
+        "rate_of_return": "0.05",
+    },
+}
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(RequestIDLoggingMiddleware)
+    app.include_router(routes.router)
+    app.dependency_overrides[routes.maybe_verify_jwt] = lambda: None
+    return TestClient(app)
+
+
+def test_request_id_is_adopted_and_spans_returned():
+    resp = _client().post(
+        "/dc/balances",
+        json=BODY,
+        headers={"X-Request-ID": "trace-1", "X-Request-Timeout": "30"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["x-request-id"] == "trace-1"
+    spans = [part.split(";")[0] for part in resp.headers["server-timing"].split(", ")]
+    assert spans == ["queue", "compute", "serialize", "app"]
+
+
+def test_malformed_request_id_is_replaced():
+    resp = _client().post("/dc/balances", json=BODY, headers={"X-Request-ID": "a b"})
+    assert resp.headers["x-request-id"] != "a b"
+
+
+def test_expired_deadline_skips_compute():
+    resp = _client().post("/dc/balances", json=BODY, headers={"X-Request-Timeout": "0"})
+    assert resp.status_code == 504
+    assert "compute" not in resp.headers["server-timing"]
@@ -7,6 +7,7 @@ from .models import (
     PensionAccount,
     Transaction,
     AssumptionSet,
+    AssumptionVersion,
 )
 
 
@@ -27,3 +28,4 @@ admin.site.register(Member)
 admin.site.register(PensionAccount)
 admin.site.register(Transaction)
 admin.site.register(AssumptionSet)
+admin.site.register(AssumptionVersion)
@@ -0,0 +1,112 @@
+# backend-django/api/assumptions.py
+"""
+Typed, versioned actuarial assumptions.
+
+AssumptionSet.assumptions stays a JSON blob for the API. Every change to it
+bumps AssumptionSet.version and writes an immutable AssumptionVersion
+snapshot, so (set id, version) always names the same values.
+
+compile_assumptions() validates a blob into a frozen Decimal dataclass.
+`compiled` caches those per process by (id, version). Versions never change,
+so the cache needs no invalidation, and a batch over thousands of members
+parses each set once.
+"""
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+DEFAULT_RETIREMENT_AGE = 65
+
+# accepted range (inclusive) of each rate
+RATE_BOUNDS = {
+    "contribution_rate": (Decimal("0"), Decimal("1")),
+    "salary_growth": (Decimal("-1"), Decimal("1")),
+    "rate_of_return": (Decimal("-1"), Decimal("1")),
+}
+RETIREMENT_AGE_BOUNDS = (1, 120)
+
+
+@dataclass(frozen=True)
+class Assumptions:
+    contribution_rate: Decimal
+    salary_growth: Decimal
+    rate_of_return: Decimal
+    retirement_age: int = DEFAULT_RETIREMENT_AGE
+
+
+def _rate(raw, key) -> Decimal:
+    if key not in raw:
+        raise ValueError(f"missing {key}")
+    value = raw[key]
+    if isinstance(value, bool):
+        raise ValueError(f"invalid {key}: {value!r}")
+    try:
+        rate = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"invalid {key}: {value!r}")
+    low, high = RATE_BOUNDS[key]
+    if not rate.is_finite() or not low <= rate <= high:
+        raise ValueError(f"{key} must be between {low} and {high}, got {value!r}")
+    return rate
+
+
+def compile_assumptions(raw) -> Assumptions:
+    """Validate an AssumptionSet.assumptions blob; ValueError if unusable."""
+    if not isinstance(raw, dict):
+        raise ValueError("assumptions must be an object")
+    rates = {key: _rate(raw, key) for key in RATE_BOUNDS}
+    age = raw.get("retirement_age", DEFAULT_RETIREMENT_AGE)
+    if isinstance(age, bool) or not isinstance(age, (int, str)):
+        raise ValueError(f"invalid retirement_age: {age!r}")
+    try:
+        retirement_age = int(age)
+    except ValueError:
+        raise ValueError(f"invalid retirement_age: {age!r}")
+    low, high = RETIREMENT_AGE_BOUNDS
+    if not low <= retirement_age <= high:
+        raise ValueError(f"retirement_age must be between {low} and {high}")
+    return Assumptions(retirement_age=retirement_age, **rates)
+
+
+class CompiledAssumptionCache:
+    """Compiled Assumptions keyed by (set id, version), bounded by `maxsize`."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, set_id, version, raw=None) -> Assumptions:
+        """
+        Compiled assumptions of version `version` of set `set_id`. `raw` is
+        that version's blob if the caller already has it; otherwise it is
+        read from AssumptionVersion. Raises ValueError if it does not compile
+        and AssumptionVersion.DoesNotExist for an unknown version.
+        """
+        key = (set_id, version)
+        with self._lock:
+            compiled = self._entries.get(key)
+        if compiled is not None:
+            return compiled
+        if raw is None:
+            # imported here: models imports this module
+            from .models import AssumptionVersion
+
+            raw = AssumptionVersion.objects.values_list("assumptions", flat=True).get(
+                assumption_set_id=set_id, version=version
+            )
+        compiled = compile_assumptions(raw)
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                # dicts keep insertion order: drop the oldest entry
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = compiled
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+compiled = CompiledAssumptionCache()
@@ -0,0 +1,151 @@
+# backend-django/api/authentication.py
+"""
+JWT authentication that avoids a CustomUser query per request.
+
+JWT_AUTH_MODE (settings / env):
+- "claims": build request.user from the claims added at token issue time
+  (see ClaimsTokenObtainPairSerializer); tokens issued without them fall back
+  to a short-lived per-process cache of DB lookups.
+- "db": stock SimpleJWT behaviour, one query per request.
+
+Trade-off of "claims": role changes only take effect when the user's current
+access token expires (JWT_ACCESS_MINUTES). Deactivation is not left to the
+token: is_active is looked up per user and cached for JWT_USER_CACHE_SECONDS
+(dropped as soon as the user is saved in this process), so a deactivated user
+is refused within that time.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# claims copied from the user into every token (and back into request.user)
+USER_CLAIMS = (
+    "username",
+    "email",
+    "is_company_user",
+    "is_talent_verify",
+    "is_staff",
+    "is_superuser",
+)
+
+
+class UserCache:
+    """
+    Tiny TTL cache of user objects keyed by user id, bounded by `maxsize`.
+    Ids are compared as strings: tokens carry them as str, signals as int.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[user_id]
+                return None
+            return user
+
+    def set(self, user_id, user) -> None:
+        if self.ttl <= 0:
+            return
+        user_id = str(user_id)
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                # dicts keep insertion order: drop the oldest entry
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+
+    def invalidate(self, user_id) -> None:
+        user_id = str(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(ttl=getattr(settings, "JWT_USER_CACHE_SECONDS", 30))
+# user id -> is_active, for users authenticated from claims
+active_cache = UserCache(ttl=getattr(settings, "JWT_USER_CACHE_SECONDS", 30))
+
+
+def is_user_active(user_id) -> bool:
+    """is_active for `user_id` (False if it no longer exists), via active_cache."""
+    active = active_cache.get(user_id)
+    if active is None:
+        active = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id}, is_active=True)
+            .exists()
+        )
+        active_cache.set(user_id, active)
+    return active
+
+
+def _refuse_save(*args, **kwargs):
+    raise RuntimeError(
+        "User built from token claims is read-only; load it from the database to save"
+    )
+
+
+def user_from_claims(validated_token):
+    """
+    Return an unsaved CustomUser populated from token claims, or None when the
+    token predates the claims. The instance carries the real primary key, so it
+    can be assigned to foreign keys (created_by etc.), but cannot be saved.
+    Callers check is_user_active() first: claims say nothing about deactivation.
+    """
+    if any(claim not in validated_token for claim in USER_CLAIMS):
+        return None
+    User = get_user_model()
+    user = User(
+        **{api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM]},
+        **{claim: validated_token[claim] for claim in USER_CLAIMS},
+        is_active=True,
+    )
+    user._state.adding = False
+    user.save = _refuse_save
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_from_claims(validated_token)
+        if user is not None:
+            if not is_user_active(user_id):
+                raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+            return user
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+
+def get_jwt_authentication() -> JWTAuthentication:
+    """Authenticator matching settings.JWT_AUTH_MODE, for views that validate manually."""
+    if getattr(settings, "JWT_AUTH_MODE", "claims") == "claims":
+        return ClaimsJWTAuthentication()
+    return JWTAuthentication()
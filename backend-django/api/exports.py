@@ -0,0 +1,72 @@
+# backend-django/api/exports.py
+"""
+Streaming CSV / NDJSON exports.
+
+Rows come from `values_list(...).iterator(chunk_size=...)` (a server-side
+cursor on Postgres), are encoded one at a time and streamed in ~64 KB chunks
+through a StreamingHttpResponse, so memory stays flat regardless of export
+size and no model or serializer instances are built.
+"""
+
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object whose write() hands back what csv.writer produced."""
+
+    def write(self, value):
+        return value
+
+
+def column_names(fields):
+    # "account__account_number" -> "account_number"
+    return [field.rsplit("__", 1)[-1] for field in fields]
+
+
+def iter_csv(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(column_names(fields))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows, fields):
+    names = column_names(fields)
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + "\n"
+
+
+def _buffered(lines, size=64 * 1024):
+    """Join encoded lines into ~`size` chunks: one socket write per chunk, not per row."""
+    buf, buffered = [], 0
+    for line in lines:
+        buf.append(line)
+        buffered += len(line)
+        if buffered >= size:
+            yield "".join(buf)
+            buf, buffered = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def export_response(queryset, fields, output, filename):
+    """Stream `queryset` (ordered by pk) as `output` ("csv" or "ndjson")."""
+    rows = (
+        queryset.order_by("pk")
+        .values_list(*fields)
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    body = iter_csv(rows, fields) if output == "csv" else iter_ndjson(rows, fields)
+    response = StreamingHttpResponse(_buffered(body), content_type=FORMATS[output])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+    return response
@@ -0,0 +1,189 @@
+# backend-django/api/imports.py
+"""
+Bulk transaction import from CSV.
+
+Columns (header row required):
+    account_number, amount, transaction_type[, date][, source]
+
+The file is parsed as a stream and handled CHUNK rows at a time. Each chunk
+is validated, account numbers are resolved with a single query, and the good
+rows are inserted with bulk_create (or COPY on Postgres) and applied to the
+ledger in bulk. Bad rows are skipped and reported by line number.
+
+A whole file is imported in one DB transaction, together with its
+ImportBatch row. The batch's sha256 is unique, so importing the same bytes
+again returns the existing batch instead of duplicating the transactions.
+"""
+
+import csv
+import hashlib
+import io
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import ledger
+from .models import ImportBatch, PensionAccount, Transaction
+
+REQUIRED_COLUMNS = ("account_number", "amount", "transaction_type")
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+TRANSACTION_TYPES = {value for value, _ in Transaction.TRAN_TYPE}
+_amount_field = Transaction._meta.get_field("amount")
+MAX_AMOUNT = Decimal(10) ** (_amount_field.max_digits - _amount_field.decimal_places)
+CENT = Decimal("0.01")
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be imported (bad header, encoding...)."""
+
+
+def file_sha256(fileobj) -> str:
+    digest = hashlib.sha256()
+    for block in iter(lambda: fileobj.read(1 << 20), b""):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def _parse_when(raw, now):
+    raw = (raw or "").strip()
+    if not raw:
+        return now
+    when = parse_datetime(raw)
+    if when is None:
+        day = parse_date(raw)
+        if day is None:
+            raise ValueError(f"invalid date {raw!r}")
+        when = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when)
+    return when
+
+
+def _parse_row(row, now):
+    """Return (account_number, transaction_type, amount, date, source)."""
+    transaction_type = (row.get("transaction_type") or "").strip().lower()
+    if transaction_type not in TRANSACTION_TYPES:
+        raise ValueError(f"invalid transaction_type {row.get('transaction_type')!r}")
+    try:
+        amount = Decimal((row.get("amount") or "").strip())
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {row.get('amount')!r}")
+    if not amount.is_finite() or amount != amount.quantize(CENT):
+        raise ValueError(f"invalid amount {row.get('amount')!r}")
+    if abs(amount) >= MAX_AMOUNT:
+        raise ValueError(f"amount {amount} out of range")
+    account_number = (row.get("account_number") or "").strip()
+    if not account_number:
+        raise ValueError("missing account_number")
+    source = (row.get("source") or "").strip()[:255] or None
+    return (
+        account_number,
+        transaction_type,
+        amount,
+        _parse_when(row.get("date"), now),
+        source,
+    )
+
+
+def _import_chunk(chunk, batch, use_copy, report):
+    """Validate and insert one chunk of (line, row); returns rows imported."""
+    now = timezone.now()
+    parsed = []
+    for line, row in chunk:
+        try:
+            parsed.append((line, _parse_row(row, now)))
+        except ValueError as exc:
+            report(line, str(exc))
+
+    numbers = {values[0] for _, values in parsed}
+    account_ids = dict(
+        PensionAccount.objects.filter(account_number__in=numbers).values_list(
+            "account_number", "pk"
+        )
+    )
+    default_source = f"import:{batch.pk}"
+    rows = []
+    for line, (number, transaction_type, amount, when, source) in parsed:
+        account_id = account_ids.get(number)
+        if account_id is None:
+            report(line, f"unknown account_number {number!r}")
+            continue
+        rows.append(
+            (account_id, transaction_type, amount, when, source or default_source)
+        )
+    return ledger.insert_transactions(
+        rows, use_copy=use_copy, created_by_id=batch.created_by_id
+    )
+
+
+def import_transactions(
+    fileobj, filename="", user=None, chunk_size=CHUNK_SIZE, use_copy=False
+):
+    """
+    Import a CSV from a binary file object. Returns (batch, created); created
+    is False when the same file was already imported.
+    """
+    if use_copy and connection.vendor != "postgresql":
+        raise ImportFileError("COPY import requires a PostgreSQL database")
+    sha256 = file_sha256(fileobj)
+    existing = ImportBatch.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        return existing, False
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        header = [name.strip() for name in reader.fieldnames or []]
+        missing = [col for col in REQUIRED_COLUMNS if col not in header]
+        if missing:
+            raise ImportFileError(f"missing column(s): {', '.join(missing)}")
+        reader.fieldnames = header
+
+        try:
+            with transaction.atomic():
+                batch = ImportBatch.objects.create(
+                    sha256=sha256,
+                    filename=filename[:255],
+                    created_by_id=getattr(user, "pk", None),
+                )
+
+                def report(line, error):
+                    batch.error_rows += 1
+                    if len(batch.errors) < MAX_REPORTED_ERRORS:
+                        batch.errors.append({"line": line, "error": error})
+
+                chunk = []
+                for row in reader:
+                    chunk.append((reader.line_num, row))
+                    if len(chunk) >= chunk_size:
+                        batch.imported_rows += _import_chunk(
+                            chunk, batch, use_copy, report
+                        )
+                        batch.total_rows += len(chunk)
+                        chunk = []
+                if chunk:
+                    batch.imported_rows += _import_chunk(chunk, batch, use_copy, report)
+                    batch.total_rows += len(chunk)
+
+                batch.errors.sort(key=lambda err: err["line"])
+                batch.finished_at = timezone.now()
+                batch.save()
+        except IntegrityError:
+            # the same file was imported concurrently and committed first
+            existing = ImportBatch.objects.filter(sha256=sha256).first()
+            if existing is None:
+                raise
+            return existing, False
+    except UnicodeDecodeError as exc:
+        raise ImportFileError(f"file is not UTF-8: {exc}")
+    except csv.Error as exc:
+        raise ImportFileError(f"malformed CSV: {exc}")
+    finally:
+        text.detach()
+    return batch, True
@@ -0,0 +1,273 @@
+# backend-django/api/ledger.py
+"""
+Incrementally maintained account ledger.
+
+Every Transaction write adjusts, in the same DB transaction,
+- PensionAccount.balance (= opening_balance + net of all transactions), and
+- the account's AccountMonthlyRollup row for the transaction's month,
+with in-SQL increments, so concurrent writers never lose updates and reading
+a balance or a month's totals is a single-row lookup instead of a ledger scan.
+
+Single-row writes go through the signal handlers in api.signals; bulk paths
+(seeding, CSV import) call apply_bulk() since bulk_create sends no signals.
+QuerySet.update() on Transaction bypasses both; don't use it for amounts,
+types, dates or accounts.
+`manage.py reconcile_ledger` checks everything against a full recompute.
+"""
+
+import csv
+import io
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DateField, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import AccountMonthlyRollup, PensionAccount, Transaction
+from .summaries import invalidate_for_accounts
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+
+# rollup column each transaction type accumulates into
+TYPE_COLUMNS = {
+    "contribution": "contributions",
+    "payout": "payouts",
+    "adjustment": "adjustments",
+}
+
+
+def month_of(when) -> date:
+    """First day of `when`'s month in the current time zone (as TruncMonth)."""
+    if timezone.is_aware(when):
+        when = timezone.localtime(when)
+    return when.date().replace(day=1)
+
+
+ROLLUP_FIELDS = ("contributions", "payouts", "adjustments", "net", "transaction_count")
+
+
+class _Delta:
+    """Rollup increments; payouts debit the balance, everything else credits it."""
+
+    __slots__ = ("contributions", "payouts", "adjustments", "count")
+
+    def __init__(self):
+        self.contributions = self.payouts = self.adjustments = ZERO
+        self.count = 0
+
+    def add(self, transaction_type, amount, sign=1):
+        column = TYPE_COLUMNS.get(transaction_type, "adjustments")
+        setattr(self, column, getattr(self, column) + sign * Decimal(amount))
+        self.count += sign
+
+    @property
+    def net(self):
+        return self.contributions - self.payouts + self.adjustments
+
+    def as_fields(self):
+        return {
+            "contributions": self.contributions,
+            "payouts": self.payouts,
+            "adjustments": self.adjustments,
+            "net": self.net,
+            "transaction_count": self.count,
+        }
+
+
+def _increment(deltas, create=True) -> None:
+    """
+    Add `deltas` ({(account_id, month): _Delta}) to balances and rollups with
+    in-SQL increments (col = col + %s), so concurrent writers never lose
+    updates and nothing has to be read first. Rollups are upserted with
+    INSERT ... ON CONFLICT DO UPDATE (SQLite >= 3.24 and Postgres), or only
+    updated when `create` is False. Rows are written in account order so
+    concurrent imports lock accounts in the same order.
+    """
+    qn = connection.ops.quote_name
+    accounts = qn(PensionAccount._meta.db_table)
+    rollups = qn(AccountMonthlyRollup._meta.db_table)
+    columns = [qn(field) for field in ROLLUP_FIELDS]
+
+    nets = defaultdict(Decimal)
+    for (account_id, _), delta in deltas.items():
+        nets[account_id] += delta.net
+    ordered = sorted(deltas.items())
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {accounts} SET {qn('balance')} = {qn('balance')} + %s "
+            f"WHERE {qn('id')} = %s",
+            [(net, account_id) for account_id, net in sorted(nets.items())],
+        )
+        values = [
+            (*delta.as_fields().values(), account_id, month)
+            for (account_id, month), delta in ordered
+        ]
+        if create:
+            cursor.executemany(
+                f"INSERT INTO {rollups} ({', '.join(columns)}, "
+                f"{qn('account_id')}, {qn('month')}) "
+                f"VALUES ({', '.join(['%s'] * (len(columns) + 2))}) "
+                f"ON CONFLICT ({qn('account_id')}, {qn('month')}) DO UPDATE SET "
+                + ", ".join(f"{c} = {rollups}.{c} + EXCLUDED.{c}" for c in columns),
+                values,
+            )
+        else:
+            cursor.executemany(
+                f"UPDATE {rollups} SET "
+                + ", ".join(f"{c} = {c} + %s" for c in columns)
+                + f" WHERE {qn('account_id')} = %s AND {qn('month')} = %s",
+                values,
+            )
+
+
+def record(tx) -> None:
+    """Apply a newly saved (or updated-to) transaction."""
+    delta = _Delta()
+    delta.add(tx.transaction_type, tx.amount)
+    _increment({(tx.account_id, month_of(tx.date)): delta})
+
+
+def reverse(account_id, transaction_type, amount, when) -> None:
+    """Undo a transaction's effect (on delete, or before applying an update)."""
+    delta = _Delta()
+    delta.add(transaction_type, amount, sign=-1)
+    # never create: the rollup may already be gone in a cascade delete
+    _increment({(account_id, month_of(when)): delta}, create=False)
+
+
+def apply_bulk(rows) -> None:
+    """
+    Apply transactions inserted with bulk_create; `rows` yields
+    (account_id, transaction_type, amount, date). Deltas are combined per
+    account-month first, so a chunk costs one statement per affected
+    account and account-month. Call inside the atomic block that inserted
+    the rows.
+    """
+    deltas = defaultdict(_Delta)
+    for account_id, transaction_type, amount, when in rows:
+        deltas[(account_id, month_of(when))].add(transaction_type, amount)
+    if deltas:
+        invalidate_for_accounts({account_id for account_id, _ in deltas})
+        _increment(deltas)
+
+
+def insert_transactions(
+    rows, batch_size=5000, use_copy=False, created_by_id=None
+) -> int:
+    """
+    Bulk-insert `rows` of (account_id, transaction_type, amount, date, source)
+    and apply them to the ledger. use_copy=True streams them through
+    COPY FROM STDIN (Postgres/psycopg2 only). Call inside transaction.atomic().
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    if use_copy:
+        buf = io.StringIO()
+        out = csv.writer(buf)
+        for account_id, transaction_type, amount, when, source in rows:
+            out.writerow(
+                (
+                    account_id,
+                    amount,
+                    transaction_type,
+                    when.isoformat(),
+                    source,
+                    created_by_id,
+                )
+            )
+        buf.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {Transaction._meta.db_table} "
+                "(account_id, amount, transaction_type, date, source, created_by_id) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buf,
+            )
+    else:
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    account_id=account_id,
+                    transaction_type=transaction_type,
+                    amount=amount,
+                    date=when,
+                    source=source,
+                    created_by_id=created_by_id,
+                )
+                for account_id, transaction_type, amount, when, source in rows
+            ),
+            batch_size=batch_size,
+        )
+    # bulk inserts send no signals: maintain balances and rollups here
+    apply_bulk(row[:4] for row in rows)
+    return len(rows)
+
+
+def recompute(account_ids):
+    """
+    Full recompute from the Transaction table for `account_ids`.
+
+    Returns ({account_id: balance}, {(account_id, month): fields dict}).
+    """
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    def total(condition):
+        return Coalesce(
+            Sum("amount", filter=condition), Value(ZERO), output_field=money
+        )
+
+    rows = (
+        Transaction.objects.filter(account_id__in=account_ids)
+        .annotate(month=TruncMonth("date", output_field=DateField()))
+        .values("account_id", "month")
+        .annotate(
+            contributions=total(Q(transaction_type="contribution")),
+            payouts=total(Q(transaction_type="payout")),
+            # unknown types count as adjustments, as in _Delta.add
+            adjustments=total(~Q(transaction_type__in=["contribution", "payout"])),
+            transaction_count=Count("id"),
+        )
+        .order_by()
+    )
+    rollups = {}
+    balances = dict(
+        PensionAccount.objects.filter(pk__in=account_ids).values_list(
+            "pk", "opening_balance"
+        )
+    )
+    for row in rows:
+        # SQLite sums decimals as floats: round back to cents
+        fields = {
+            "contributions": row["contributions"].quantize(CENT),
+            "payouts": row["payouts"].quantize(CENT),
+            "adjustments": row["adjustments"].quantize(CENT),
+            "transaction_count": row["transaction_count"],
+        }
+        fields["net"] = (
+            fields["contributions"] - fields["payouts"] + fields["adjustments"]
+        )
+        rollups[(row["account_id"], row["month"])] = fields
+        balances[row["account_id"]] += fields["net"]
+    return balances, rollups
+
+
+def rebuild(account_ids) -> None:
+    """Replace balances and rollups for `account_ids` with a full recompute."""
+    balances, rollups = recompute(account_ids)
+    with transaction.atomic():
+        invalidate_for_accounts(account_ids)
+        AccountMonthlyRollup.objects.filter(account_id__in=account_ids).delete()
+        AccountMonthlyRollup.objects.bulk_create(
+            AccountMonthlyRollup(account_id=account_id, month=month, **fields)
+            for (account_id, month), fields in rollups.items()
+        )
+        accounts = [
+            PensionAccount(pk=pk, balance=balance) for pk, balance in balances.items()
+        ]
+        PensionAccount.objects.bulk_update(accounts, ["balance"])
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.imports import CHUNK_SIZE, ImportFileError, import_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import transactions from a CSV (account_number, amount, "
+        "transaction_type[, date][, source]). Re-importing the same file is a no-op."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="insert with COPY FROM STDIN (Postgres only)",
+        )
+        parser.add_argument("--user", help="username recorded as created_by")
+        parser.add_argument(
+            "--show-errors", type=int, default=20, help="row errors to print"
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"Unknown user {options['user']!r}")
+
+        try:
+            with open(options["path"], "rb") as fh:
+                batch, created = import_transactions(
+                    fh,
+                    filename=options["path"],
+                    user=user,
+                    chunk_size=options["chunk_size"],
+                    use_copy=options["copy"],
+                )
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        if not created:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Already imported as batch {batch.pk} on {batch.created_at:%Y-%m-%d %H:%M}"
+                )
+            )
+            return
+        for err in batch.errors[: options["show_errors"]]:
+            self.stdout.write(f"line {err['line']}: {err['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Batch {batch.pk}: imported {batch.imported_rows} of "
+                f"{batch.total_rows} rows ({batch.error_rows} errors)"
+            )
+        )
@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api import projection_worker, projections
+from api.models import ProjectionRun
+
+
+class Command(BaseCommand):
+    help = (
+        "Project every active account with its company's latest assumption set, "
+        "in parallel worker processes, and store the results in ProjectionResult. "
+        "Accounts whose inputs are unchanged since their stored result are skipped "
+        "(--all recomputes them). Progress is checkpointed per chunk; --resume "
+        "continues an interrupted run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="only this company's accounts")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="worker processes (0 = project in this process)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="continue the latest unfinished run instead of starting a new one",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="recompute every account, even if its inputs are unchanged",
+        )
+
+    def handle(self, *args, **options):
+        pensionlib = projection_worker.load_pensionlib(settings.PENSIONLIB_PATH)
+        version = getattr(pensionlib, "__version__", "")
+        run = self._get_run(options, version)
+        accounts = projections.active_accounts(run.company_id).order_by("pk")
+        total = accounts.filter(pk__gt=run.last_account_id).count()
+        self.stdout.write(
+            f"Run {run.pk}: {total} accounts to check"
+            + (
+                f" (resuming after account {run.last_account_id})"
+                if options["resume"]
+                else ""
+            )
+        )
+
+        assumptions = projections.company_assumptions()
+        today = date.today()
+        workers = options["workers"]
+        pool = None
+        if workers > 0:
+            pool = multiprocessing.Pool(
+                workers,
+                initializer=projection_worker.init_worker,
+                initargs=(settings.PENSIONLIB_PATH,),
+            )
+        else:
+            projection_worker.init_worker(settings.PENSIONLIB_PATH)
+
+        started = time.monotonic()
+        done = 0
+        pending = None
+        try:
+            for rows in self._chunks(
+                accounts, run.last_account_id, options["chunk_size"]
+            ):
+                items, meta, skipped, unchanged = projections.build_items(
+                    rows, assumptions, today, version, force=options["all"]
+                )
+                if pool is not None:
+                    # workers compute this chunk while the previous one is written
+                    size = max(1, len(items) // (workers * 4))
+                    pieces = [items[i : i + size] for i in range(0, len(items), size)]
+                    job = pool.map_async(projection_worker.project_many, pieces)
+                else:
+                    job = _Done([projection_worker.project_many(items)])
+                if pending is not None:
+                    done += self._write(run, *pending)
+                    self._progress(done, total, started)
+                pending = (job, items, meta, skipped, unchanged, rows[-1][0], len(rows))
+            if pending is not None:
+                done += self._write(run, *pending)
+                self._progress(done, total, started)
+        except BaseException:
+            run.status = "failed"
+            run.save(update_fields=["status"])
+            raise
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        run.status = "completed"
+        run.finished_at = timezone.now()
+        run.save(update_fields=["status", "finished_at"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Run {run.pk} complete: {run.projected} projected, "
+                f"{run.unchanged} unchanged, {run.skipped} skipped, {run.failed} failed"
+            )
+        )
+
+    def _get_run(self, options, version):
+        if not options["resume"]:
+            return ProjectionRun.objects.create(
+                company_id=options["company"], pensionlib_version=version
+            )
+        run = (
+            ProjectionRun.objects.exclude(status="completed")
+            .filter(company_id=options["company"])
+            .order_by("-pk")
+            .first()
+        )
+        if run is None:
+            raise CommandError("No unfinished run to resume")
+        run.status = "running"
+        run.save(update_fields=["status"])
+        return run
+
+    @staticmethod
+    def _chunks(accounts, after, size):
+        """Keyset-paginate accounts by pk: each chunk is one indexed range scan."""
+        while True:
+            rows = list(
+                accounts.filter(pk__gt=after).values_list(*projections.ACCOUNT_COLUMNS)[
+                    :size
+                ]
+            )
+            if not rows:
+                return
+            after = rows[-1][0]
+            yield rows
+
+    @staticmethod
+    def _write(run, job, items, meta, skipped, unchanged, last_id, n_rows):
+        results = [r for piece in job.get() for r in piece]
+        failed = sum(1 for _, _, error in results if error is not None)
+        with transaction.atomic():
+            projected = projections.save_results(run, items, meta, results)
+            # checkpoint: results and progress commit together
+            run.last_account_id = last_id
+            run.projected += projected
+            run.skipped += skipped
+            run.failed += failed
+            run.unchanged += unchanged
+            run.save(
+                update_fields=[
+                    "last_account_id",
+                    "projected",
+                    "skipped",
+                    "failed",
+                    "unchanged",
+                ]
+            )
+        return n_rows
+
+    def _progress(self, done, total, started):
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0.0
+        eta = (total - done) / rate if rate else 0.0
+        self.stdout.write(f"  {done}/{total} accounts  {rate:,.0f}/s  eta {eta:,.0f}s")
+
+
+class _Done:
+    """map_async-like wrapper for results computed in-process."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
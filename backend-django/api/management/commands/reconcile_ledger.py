@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import ledger
+from api.models import AccountMonthlyRollup, PensionAccount
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify account balances and monthly rollups against a full recompute "
+        "from the Transaction table (optionally repairing them with --fix)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--account", type=int, action="append", help="limit to account id(s)"
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--fix", action="store_true", help="rebuild mismatching accounts"
+        )
+        parser.add_argument(
+            "--show", type=int, default=20, help="mismatches to print (default 20)"
+        )
+
+    def handle(self, *args, **options):
+        accounts = PensionAccount.objects.order_by("pk")
+        if options["account"]:
+            accounts = accounts.filter(pk__in=options["account"])
+
+        self._show = options["show"]
+        checked = 0
+        bad = []
+        last_id = 0
+        while True:
+            chunk = dict(
+                accounts.filter(pk__gt=last_id).values_list("pk", "balance")[
+                    : options["chunk_size"]
+                ]
+            )
+            if not chunk:
+                break
+            last_id = max(chunk)
+            checked += len(chunk)
+            bad.extend(self._check(chunk))
+
+        if bad and options["fix"]:
+            for i in range(0, len(bad), options["chunk_size"]):
+                ledger.rebuild(bad[i : i + options["chunk_size"]])
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {len(bad)} of {checked} accounts")
+            )
+        elif bad:
+            raise CommandError(
+                f"{len(bad)} of {checked} accounts do not reconcile; "
+                "re-run with --fix to rebuild them"
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(f"All {checked} accounts reconcile"))
+
+    def _report(self, message):
+        if self._show > 0:
+            self._show -= 1
+            self.stdout.write(message)
+
+    def _check(self, balances):
+        """Return the ids in `balances` ({id: stored balance}) that mismatch."""
+        expected_balances, expected_rollups = ledger.recompute(list(balances))
+        stored_rollups = {
+            (row["account_id"], row["month"]): {f: row[f] for f in ledger.ROLLUP_FIELDS}
+            for row in AccountMonthlyRollup.objects.filter(
+                account_id__in=list(balances)
+            ).values("account_id", "month", *ledger.ROLLUP_FIELDS)
+        }
+        # months whose transactions were all deleted leave all-zero rollups
+        empty = dict.fromkeys(ledger.ROLLUP_FIELDS, 0)
+
+        bad = set()
+        for pk, balance in balances.items():
+            if balance != expected_balances[pk]:
+                bad.add(pk)
+                self._report(
+                    f"account {pk}: balance {balance}, expected {expected_balances[pk]}"
+                )
+        for key in expected_rollups.keys() | stored_rollups.keys():
+            stored = stored_rollups.get(key, empty)
+            expected = expected_rollups.get(key, empty)
+            if any(stored[f] != expected[f] for f in ledger.ROLLUP_FIELDS):
+                bad.add(key[0])
+                self._report(
+                    f"account {key[0]} {key[1]:%Y-%m}: rollup {stored}, "
+                    f"expected {expected}"
+                )
+        return sorted(bad)
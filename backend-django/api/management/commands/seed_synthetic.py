@@ -1,53 +1,221 @@
-﻿from django.core.management.base import BaseCommand
-from faker import Faker
+﻿import csv
 import random
-from api.models import Company, Member, PensionAccount, Transaction, AssumptionSet
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from faker import Faker
+
+from api import ledger
+from api.models import AssumptionSet, Company, Member, PensionAccount
+
+# columns expected by the FastAPI /batch/dc_project endpoint
+PROJECTION_CSV_COLUMNS = (
+    "current_balance",
+    "annual_salary",
+    "years",
+    "contribution_rate",
+    "salary_growth",
+    "rate_of_return",
+)
+RETIREMENT_AGE = 65
+# dates of birth and transaction dates are drawn relative to this day, so a
+# seed yields the same rows whenever it is run (override with --as-of)
+DEFAULT_AS_OF = date(2025, 1, 1)
 
 
 class Command(BaseCommand):
     help = (
-        "Seed synthetic data for staging (companies, members, accounts, transactions)"
+        "Seed synthetic data for staging/benchmarks (companies, members, accounts, "
+        "transactions). Deterministic per --seed and --as-of; rows are bulk-inserted in batches "
+        "(or COPY'd on Postgres with --copy)."
     )
 
     def add_arguments(self, parser):
         parser.add_argument("--companies", type=int, default=5)
         parser.add_argument("--members-per-company", type=int, default=50)
+        parser.add_argument(
+            "--transactions-per-account",
+            default="1-5",
+            help="fixed count or inclusive range, e.g. 12 or 1-5",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--as-of",
+            type=date.fromisoformat,
+            default=DEFAULT_AS_OF,
+            help=f"reference date YYYY-MM-DD for ages and transaction dates "
+            f"(default {DEFAULT_AS_OF.isoformat()})",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="load transactions with COPY FROM STDIN (Postgres only)",
+        )
+        parser.add_argument(
+            "--projection-csv",
+            help="also write one /batch/dc_project row per seeded account to this path",
+        )
 
     def handle(self, *args, **options):
-        fake = Faker()
-        User = get_user_model()
-        admin_user = User.objects.filter(is_superuser=True).first()
-        for _ in range(options["companies"]):
-            comp = Company.objects.create(
-                name=fake.company(),
-                registration_number=fake.bothify(text="??######"),
-                address=fake.address(),
-                created_by=admin_user,
-            )
-            AssumptionSet.objects.create(
-                company=comp, name="Default", assumptions={"rate_of_return": "0.05"}
+        seed = options["seed"]
+        batch_size = options["batch_size"]
+        tx_min, tx_max = self._parse_range(options["transactions_per_account"])
+        use_copy = options["copy"]
+        if use_copy and connection.vendor != "postgresql":
+            raise CommandError("--copy requires a PostgreSQL database")
+
+        prefix = f"SYN{seed}-"
+        if PensionAccount.objects.filter(account_number__startswith=prefix).exists():
+            raise CommandError(
+                f"Accounts for --seed {seed} already exist; use a different seed"
             )
-            for i in range(options["members-per-company"]):
-                m = Member.objects.create(
-                    company=comp,
-                    first_name=fake.first_name(),
-                    last_name=fake.last_name(),
-                    date_of_birth=fake.date_of_birth(minimum_age=22, maximum_age=65),
-                    national_id=fake.bothify(text="ID########"),
-                )
-                acc = PensionAccount.objects.create(
-                    member=m,
-                    account_number=fake.bothify(text="ACCT########"),
-                    balance=round(random.uniform(0, 50000), 2),
+
+        rng = random.Random(seed)
+        fake = Faker()
+        fake.seed_instance(seed)
+        # Faker is too slow per row at millions of rows: draw from seeded pools instead
+        first_names = [fake.first_name() for _ in range(500)]
+        last_names = [fake.last_name() for _ in range(1000)]
+        admin_user = get_user_model().objects.filter(is_superuser=True).first()
+        today = options["as_of"]
+        now = datetime.combine(today, time.min, tzinfo=timezone.utc)
+
+        csv_fh = writer = None
+        if options["projection_csv"]:
+            csv_fh = open(options["projection_csv"], "w", newline="")
+            writer = csv.writer(csv_fh)
+            writer.writerow(PROJECTION_CSV_COLUMNS)
+
+        totals = {"members": 0, "accounts": 0, "transactions": 0}
+        try:
+            for c in range(options["companies"]):
+                with transaction.atomic():
+                    comp = Company.objects.create(
+                        name=fake.company(),
+                        registration_number=fake.bothify(text="??######"),
+                        address=fake.address(),
+                        created_by=admin_user,
+                    )
+                    assumptions = {
+                        "rate_of_return": str(rng.choice(["0.04", "0.05", "0.06"])),
+                        "salary_growth": str(rng.choice(["0.02", "0.025", "0.03"])),
+                        "contribution_rate": str(rng.choice(["0.08", "0.10", "0.12"])),
+                    }
+                    AssumptionSet.objects.create(
+                        company=comp, name="Default", assumptions=assumptions
+                    )
+
+                remaining = options["members_per_company"]
+                member_no = 0
+                while remaining > 0:
+                    n = min(batch_size, remaining)
+                    remaining -= n
+                    with transaction.atomic():
+                        members = Member.objects.bulk_create(
+                            [
+                                Member(
+                                    company=comp,
+                                    first_name=rng.choice(first_names),
+                                    last_name=rng.choice(last_names),
+                                    date_of_birth=today
+                                    - timedelta(days=rng.randint(22 * 365, 64 * 365)),
+                                    national_id=f"ID{rng.randrange(10**10):010d}",
+                                    annual_salary=Decimal(
+                                        rng.randint(1_500_000, 15_000_000)
+                                    )
+                                    / 100,
+                                )
+                                for _ in range(n)
+                            ],
+                            batch_size=batch_size,
+                        )
+                        openings = [
+                            Decimal(rng.randint(0, 5_000_000)) / 100 for _ in members
+                        ]
+                        accounts = PensionAccount.objects.bulk_create(
+                            [
+                                PensionAccount(
+                                    member=m,
+                                    account_number=f"{prefix}{c:05d}-{member_no + i:09d}",
+                                    opening_balance=opening,
+                                    balance=opening,
+                                )
+                                for i, (m, opening) in enumerate(zip(members, openings))
+                            ],
+                            batch_size=batch_size,
+                        )
+                        member_no += n
+                        totals["transactions"] += self._insert_transactions(
+                            accounts, rng, now, tx_min, tx_max, batch_size, use_copy
+                        )
+                    totals["members"] += n
+                    totals["accounts"] += n
+
+                    if writer is not None:
+                        balances = dict(
+                            PensionAccount.objects.filter(
+                                pk__in=[acc.pk for acc in accounts]
+                            ).values_list("pk", "balance")
+                        )
+                        for m, acc in zip(members, accounts):
+                            age = (today - m.date_of_birth).days // 365
+                            writer.writerow(
+                                (
+                                    balances[acc.pk],
+                                    m.annual_salary,
+                                    max(0, RETIREMENT_AGE - age),
+                                    assumptions["contribution_rate"],
+                                    assumptions["salary_growth"],
+                                    assumptions["rate_of_return"],
+                                )
+                            )
+                self.stdout.write(
+                    f"company {c + 1}/{options['companies']}: "
+                    f"{totals['members']} members, {totals['transactions']} transactions"
                 )
-                for t in range(random.randint(1, 5)):
-                    Transaction.objects.create(
-                        account=acc,
-                        amount=round(random.uniform(10, 5000), 2),
-                        transaction_type=random.choice(
-                            ["contribution", "payout", "adjustment"]
-                        ),
-                        source="seed",
+        finally:
+            if csv_fh is not None:
+                csv_fh.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Seed complete: {members} members, {accounts} accounts, "
+                "{transactions} transactions".format(**totals)
+            )
+        )
+
+    @staticmethod
+    def _parse_range(raw):
+        try:
+            lo, _, hi = str(raw).partition("-")
+            lo, hi = int(lo), int(hi or lo)
+        except ValueError:
+            raise CommandError(f"Invalid --transactions-per-account: {raw!r}")
+        if lo < 0 or hi < lo:
+            raise CommandError(f"Invalid --transactions-per-account: {raw!r}")
+        return lo, hi
+
+    def _insert_transactions(
+        self, accounts, rng, now, tx_min, tx_max, batch_size, use_copy
+    ):
+        types = ["contribution", "payout", "adjustment"]
+        rows = []
+        for acc in accounts:
+            for _ in range(rng.randint(tx_min, tx_max)):
+                amount = Decimal(rng.randint(1_000, 500_000)) / 100
+                rows.append(
+                    (
+                        acc.pk,
+                        rng.choice(types),
+                        amount,
+                        now - timedelta(seconds=rng.randrange(2 * 365 * 86400)),
+                        "seed",
                     )
-        self.stdout.write(self.style.SUCCESS("Seed complete"))
+                )
+        return ledger.insert_transactions(
+            rows, batch_size=batch_size, use_copy=use_copy
+        )
@@ -1,5 +1,49 @@
+import logging
+import time
+
 from django.http import HttpResponse
 
+from . import tracing
+
+logger = logging.getLogger("pensionlib_api")
+
+
+class RequestContextMiddleware:
+    """
+    Request id, deadline and Server-Timing spans for every request
+    (see api/tracing.py). Listed first so "app" covers the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request.request_id = tracing.incoming_request_id(request)
+        timeout = tracing.parse_timeout(request.headers.get(tracing.DEADLINE_HEADER))
+        request.deadline = None if timeout is None else time.monotonic() + timeout
+        request.timings = []
+        request.upstream_timings = []
+
+        response = self.get_response(request)
+
+        tracing.record(request, "app", time.perf_counter() - started)
+        timing = tracing.server_timing(request.timings)
+        if request.upstream_timings:
+            timing = ", ".join([timing] + request.upstream_timings)
+        response[tracing.REQUEST_ID_HEADER] = request.request_id
+        response["Server-Timing"] = timing
+        if request.upstream_timings:
+            logger.info(
+                "request %s %s -> %s [%s] %s",
+                request.method,
+                request.path,
+                response.status_code,
+                request.request_id,
+                timing,
+            )
+        return response
+
 
 class OptionsPassthroughMiddleware:
     """
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_auto_20251129_1321"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="member",
+            index=models.Index(
+                fields=["company", "last_name"], name="member_company_last_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="member",
+            index=models.Index(fields=["national_id"], name="member_national_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["account", "date"], name="txn_account_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["transaction_type", "date"], name="txn_type_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncMonth
+
+CHUNK = 2000
+
+
+def backfill_ledger(apps, schema_editor):
+    """
+    Treat each existing stored balance as the opening balance (transactions
+    never updated it), then build rollups and balance = opening + net.
+    """
+    PensionAccount = apps.get_model("api", "PensionAccount")
+    Transaction = apps.get_model("api", "Transaction")
+    Rollup = apps.get_model("api", "AccountMonthlyRollup")
+
+    last_id = 0
+    while True:
+        accounts = list(
+            PensionAccount.objects.filter(pk__gt=last_id).order_by("pk")[:CHUNK]
+        )
+        if not accounts:
+            break
+        last_id = accounts[-1].pk
+        by_id = {acc.pk: acc for acc in accounts}
+        for acc in accounts:
+            acc.opening_balance = acc.balance
+
+        rows = (
+            Transaction.objects.filter(account_id__in=by_id)
+            .annotate(month=TruncMonth("date", output_field=DateField()))
+            .values("account_id", "month")
+            .annotate(
+                contributions=Sum("amount", filter=Q(transaction_type="contribution")),
+                payouts=Sum("amount", filter=Q(transaction_type="payout")),
+                adjustments=Sum(
+                    "amount",
+                    filter=~Q(transaction_type__in=["contribution", "payout"]),
+                ),
+                transaction_count=Count("id"),
+            )
+            .order_by()
+        )
+        rollups = []
+        for row in rows:
+            contributions = row["contributions"] or 0
+            payouts = row["payouts"] or 0
+            adjustments = row["adjustments"] or 0
+            net = contributions - payouts + adjustments
+            by_id[row["account_id"]].balance += net
+            rollups.append(
+                Rollup(
+                    account_id=row["account_id"],
+                    month=row["month"],
+                    contributions=contributions,
+                    payouts=payouts,
+                    adjustments=adjustments,
+                    net=net,
+                    transaction_count=row["transaction_count"],
+                )
+            )
+        Rollup.objects.bulk_create(rollups)
+        PensionAccount.objects.bulk_update(accounts, ["opening_balance", "balance"])
+
+
+def reset_balances(apps, schema_editor):
+    PensionAccount = apps.get_model("api", "PensionAccount")
+    PensionAccount.objects.update(balance=models.F("opening_balance"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_ledger_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pensionaccount",
+            name="opening_balance",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.CreateModel(
+            name="AccountMonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                (
+                    "contributions",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "payouts",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "adjustments",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "net",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("transaction_count", models.PositiveIntegerField(default=0)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to="api.pensionaccount",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("account", "month"), name="rollup_account_month_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, reset_balances),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_import_batch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="member",
+            name="annual_salary",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=14, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="ProjectionRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="running",
+                        max_length=20,
+                    ),
+                ),
+                ("pensionlib_version", models.CharField(blank=True, max_length=32)),
+                ("last_account_id", models.BigIntegerField(default=0)),
+                ("projected", models.PositiveIntegerField(default=0)),
+                ("skipped", models.PositiveIntegerField(default=0)),
+                ("failed", models.PositiveIntegerField(default=0)),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "company",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="api.company",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ProjectionResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "current_balance",
+                    models.DecimalField(decimal_places=2, max_digits=14),
+                ),
+                ("annual_salary", models.DecimalField(decimal_places=2, max_digits=14)),
+                (
+                    "contribution_rate",
+                    models.DecimalField(decimal_places=6, max_digits=8),
+                ),
+                ("salary_growth", models.DecimalField(decimal_places=6, max_digits=8)),
+                ("rate_of_return", models.DecimalField(decimal_places=6, max_digits=8)),
+                ("years", models.PositiveIntegerField()),
+                ("final_balance", models.DecimalField(decimal_places=2, max_digits=18)),
+                ("projected_at", models.DateTimeField()),
+                (
+                    "account",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="projection",
+                        to="api.pensionaccount",
+                    ),
+                ),
+                (
+                    "assumption_set",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="api.assumptionset",
+                    ),
+                ),
+                (
+                    "run",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="api.projectionrun",
+                    ),
+                ),
+            ],
+        ),
+    ]
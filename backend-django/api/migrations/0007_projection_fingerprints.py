@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_portfolio_projection"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projectionresult",
+            name="input_fingerprint",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="projectionresult",
+            name="is_dirty",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="projectionrun",
+            name="unchanged",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
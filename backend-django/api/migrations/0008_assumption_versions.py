@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_existing(apps, schema_editor):
+    """Existing sets become version 1, stored as-is (even if they don't validate)."""
+    AssumptionSet = apps.get_model("api", "AssumptionSet")
+    AssumptionVersion = apps.get_model("api", "AssumptionVersion")
+    AssumptionSet.objects.update(version=1)
+    AssumptionVersion.objects.bulk_create(
+        AssumptionVersion(assumption_set_id=pk, version=1, assumptions=raw)
+        for pk, raw in AssumptionSet.objects.values_list("pk", "assumptions").iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_projection_fingerprints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assumptionset",
+            name="version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="AssumptionVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField()),
+                ("assumptions", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "assumption_set",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="versions",
+                        to="api.assumptionset",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("assumption_set", "version"),
+                        name="assumption_version_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(snapshot_existing, migrations.RunPython.noop),
+    ]
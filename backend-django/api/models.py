@@ -1,9 +1,13 @@
 ﻿from django.db import models
+from django.db import transaction as db_transaction
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 
+from .assumptions import compile_assumptions
+
 
 class CustomUser(AbstractUser):
     is_company_user = models.BooleanField(default=False)
@@ -38,8 +42,20 @@ class Member(models.Model):
     last_name = models.CharField(max_length=120)
     date_of_birth = models.DateField(null=True, blank=True)
     national_id = models.CharField(max_length=128, blank=True, null=True)
+    annual_salary = models.DecimalField(
+        max_digits=14, decimal_places=2, null=True, blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # per-company member listing, sorted by surname
+            models.Index(
+                fields=["company", "last_name"], name="member_company_last_name_idx"
+            ),
+            models.Index(fields=["national_id"], name="member_national_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -54,15 +70,30 @@ class PensionAccount(models.Model):
         Member, on_delete=models.CASCADE, related_name="accounts"
     )
     account_number = models.CharField(max_length=64, unique=True)
+    # balance = opening_balance + net of all transactions, maintained by
+    # api.ledger on every transaction write; never set it directly
     balance = models.DecimalField(
         max_digits=14, decimal_places=2, default=0, validators=[MinValueValidator(0)]
     )
+    opening_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="active")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.account_number} ({self.member})"
 
+    def save(self, *args, **kwargs):
+        # the ledger moves balance with SQL increments, so this instance may
+        # hold a stale value: only the insert writes it, updates leave it out
+        if not self._state.adding and not kwargs.get("force_insert"):
+            fields = kwargs.get("update_fields")
+            if fields is None:
+                fields = [
+                    f.name for f in self._meta.concrete_fields if not f.primary_key
+                ]
+            kwargs["update_fields"] = [f for f in fields if f != "balance"]
+        super().save(*args, **kwargs)
+
 
 class Transaction(models.Model):
     TRAN_TYPE = (
@@ -85,9 +116,51 @@ class Transaction(models.Model):
         related_name="transactions_created",
     )
 
+    class Meta:
+        indexes = [
+            # per-account ledger history ordered by date
+            models.Index(fields=["account", "date"], name="txn_account_date_idx"),
+            # type-filtered reporting over a date range
+            models.Index(fields=["transaction_type", "date"], name="txn_type_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.transaction_type} {self.amount} for {self.account}"
 
+    # the ledger signal handlers run inside these blocks, so the row and the
+    # balance/rollup update commit (or roll back) together
+    def save(self, *args, **kwargs):
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+class AccountMonthlyRollup(models.Model):
+    """Per-account, per-month transaction totals maintained by api.ledger."""
+
+    account = models.ForeignKey(
+        PensionAccount, on_delete=models.CASCADE, related_name="monthly_rollups"
+    )
+    month = models.DateField()  # first day of the month
+    contributions = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payouts = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    adjustments = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "month"], name="rollup_account_month_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} {self.month:%Y-%m}: {self.net}"
+
 
 class AssumptionSet(models.Model):
     company = models.ForeignKey(
@@ -109,6 +182,155 @@ class AssumptionSet(models.Model):
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL
     )
+    # bumped, with a new AssumptionVersion, whenever `assumptions` changes
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.name} ({self.company})"
+
+    def clean(self):
+        try:
+            compile_assumptions(self.assumptions)
+        except ValueError as exc:
+            raise ValidationError({"assumptions": str(exc)})
+
+    def save(self, *args, **kwargs):
+        compile_assumptions(self.assumptions)  # never version unusable values
+        with db_transaction.atomic():
+            current = None
+            if self.pk is not None:
+                # lock the row so concurrent edits get consecutive versions
+                self.version = (
+                    AssumptionSet.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("version", flat=True)
+                    .first()
+                    or 0
+                )
+                current = (
+                    AssumptionVersion.objects.filter(
+                        assumption_set_id=self.pk, version=self.version
+                    )
+                    .values_list("assumptions", flat=True)
+                    .first()
+                )
+            self._version_changed = current is None or current != self.assumptions
+            if self._version_changed:
+                self.version += 1
+                if kwargs.get("update_fields") is not None:
+                    kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+            super().save(*args, **kwargs)
+            if self._version_changed:
+                AssumptionVersion.objects.create(
+                    assumption_set=self,
+                    version=self.version,
+                    assumptions=self.assumptions,
+                )
+
+
+class AssumptionVersion(models.Model):
+    """Immutable snapshot of an AssumptionSet's values (see api.assumptions)."""
+
+    assumption_set = models.ForeignKey(
+        AssumptionSet, on_delete=models.CASCADE, related_name="versions"
+    )
+    version = models.PositiveIntegerField()
+    assumptions = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["assumption_set", "version"], name="assumption_version_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.assumption_set_id} v{self.version}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("assumption versions are immutable")
+        super().save(*args, **kwargs)
+
+
+class ImportBatch(models.Model):
+    """
+    One committed bulk transaction import. It is written in the same DB
+    transaction as the rows, so its file hash makes re-uploads no-ops.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    filename = models.CharField(max_length=255, blank=True)
+    total_rows = models.PositiveIntegerField(default=0)
+    imported_rows = models.PositiveIntegerField(default=0)
+    error_rows = models.PositiveIntegerField(default=0)
+    # first imports.MAX_REPORTED_ERRORS problems: [{"line": n, "error": "..."}]
+    errors = models.JSONField(default=list, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="import_batches",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename or self.sha256[:12]}: {self.imported_rows} rows"
+
+
+class ProjectionRun(models.Model):
+    """One portfolio projection run; last_account_id is its resume checkpoint."""
+
+    STATUS_CHOICES = (
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+    company = models.ForeignKey(
+        Company, null=True, blank=True, on_delete=models.CASCADE
+    )  # None = all companies
+    pensionlib_version = models.CharField(max_length=32, blank=True)
+    last_account_id = models.BigIntegerField(default=0)
+    projected = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    unchanged = models.PositiveIntegerField(default=0)  # inputs as last projected
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"run {self.pk} ({self.status})"
+
+
+class ProjectionResult(models.Model):
+    """Latest DC projection of an account, with the inputs it was made from."""
+
+    account = models.OneToOneField(
+        PensionAccount, on_delete=models.CASCADE, related_name="projection"
+    )
+    run = models.ForeignKey(
+        ProjectionRun, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    assumption_set = models.ForeignKey(
+        AssumptionSet, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    current_balance = models.DecimalField(max_digits=14, decimal_places=2)
+    annual_salary = models.DecimalField(max_digits=14, decimal_places=2)
+    contribution_rate = models.DecimalField(max_digits=8, decimal_places=6)
+    salary_growth = models.DecimalField(max_digits=8, decimal_places=6)
+    rate_of_return = models.DecimalField(max_digits=8, decimal_places=6)
+    years = models.PositiveIntegerField()
+    final_balance = models.DecimalField(max_digits=18, decimal_places=2)
+    projected_at = models.DateTimeField()
+    # hash of every input above plus the pensionlib version; a run skips the
+    # account while it still matches (see api.projections.fingerprint)
+    input_fingerprint = models.CharField(max_length=64, blank=True)
+    # set by signal handlers when a member, account or assumption set changes
+    is_dirty = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.account_id}: {self.final_balance} in {self.years}y"
@@ -0,0 +1,25 @@
+# backend-django/api/pagination.py
+"""
+Cursor (keyset) pagination for the list endpoints.
+
+Unlike page-number pagination there is no COUNT(*) and no OFFSET scan, so the
+cost of fetching a page does not grow with the table or with how deep the
+client has paged. Clients follow the `next` / `previous` links.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Newest first by primary key; the default for every ViewSet."""
+
+    ordering = "-id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class TransactionCursorPagination(IdCursorPagination):
+    """Ledger history, newest first (served by the (account, date) index)."""
+
+    ordering = ("-date", "-id")
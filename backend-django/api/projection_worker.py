@@ -0,0 +1,62 @@
+# backend-django/api/projection_worker.py
+"""
+Worker-process side of the portfolio projection (see project_portfolio).
+
+Deliberately free of Django imports: pool workers only need pensionlib, which
+lives in the actuarial-fastapi tree and is put on sys.path by init_worker()
+when it is not installed.
+"""
+
+import sys
+
+_project = None
+
+
+def load_pensionlib(path=None):
+    """Import pensionlib, adding `path` (the actuarial-fastapi dir) if needed."""
+    try:
+        import pensionlib
+    except ImportError:
+        if not path:
+            raise
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+        import pensionlib
+    return pensionlib
+
+
+def init_worker(path=None):
+    global _project
+    pensionlib = load_pensionlib(path)
+    DCProjectionInput = pensionlib.models.DCProjectionInput
+
+    def project(balance, salary, years, contribution_rate, salary_growth, rate):
+        out = pensionlib.project_dc_account(
+            DCProjectionInput(
+                current_balance=balance,
+                annual_salary=salary,
+                years=years,
+                contribution_rate=contribution_rate,
+                salary_growth=salary_growth,
+                rate_of_return=rate,
+            )
+        )
+        return out.final_balance
+
+    _project = project
+
+
+def project_many(items):
+    """
+    items: [(account_id, balance, salary, years, contribution_rate,
+    salary_growth, rate_of_return)] -> [(account_id, final_balance, error)].
+    """
+    if _project is None:
+        init_worker()
+    results = []
+    for account_id, *inputs in items:
+        try:
+            results.append((account_id, _project(*inputs), None))
+        except Exception as exc:  # one bad account must not sink the chunk
+            results.append((account_id, None, f"{type(exc).__name__}: {exc}"))
+    return results
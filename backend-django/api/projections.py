@@ -0,0 +1,164 @@
+# backend-django/api/projections.py
+"""
+Portfolio projection helpers: turning accounts + members + the company's
+assumption set into pensionlib DC projection inputs, and persisting results.
+The CPU work happens in api.projection_worker (see project_portfolio).
+
+Results are reused until an input changes. Each ProjectionResult stores a
+fingerprint of its inputs (balance, salary, years to retirement, rates,
+assumption set and pensionlib version); a run recomputes an account only
+when the fingerprint differs or the result was marked dirty by the signal
+handlers in api.signals. Bulk ledger writes send no signals, but a changed
+balance still changes the fingerprint.
+"""
+
+import hashlib
+
+from django.utils import timezone
+
+from .assumptions import compiled
+from .models import AssumptionSet, PensionAccount, ProjectionResult
+
+# account columns read per row, in item order
+ACCOUNT_COLUMNS = (
+    "pk",
+    "balance",
+    "member__annual_salary",
+    "member__date_of_birth",
+    "member__company_id",
+    "projection__input_fingerprint",
+    "projection__is_dirty",
+)
+RESULT_FIELDS = (
+    "run",
+    "assumption_set",
+    "current_balance",
+    "annual_salary",
+    "contribution_rate",
+    "salary_growth",
+    "rate_of_return",
+    "years",
+    "final_balance",
+    "projected_at",
+    "input_fingerprint",
+    "is_dirty",
+)
+
+
+def company_assumptions():
+    """
+    {company_id: (assumption_set_id, Assumptions or None)} using each
+    company's latest AssumptionSet; key None holds the latest company-less
+    default. Compiled values come from the per-process (id, version) cache.
+    """
+    latest = {}
+    for set_id, company_id, version, raw in AssumptionSet.objects.order_by(
+        "pk"
+    ).values_list("pk", "company_id", "version", "assumptions"):
+        latest[company_id] = (set_id, version, raw)
+    result = {}
+    for company_id, (set_id, version, raw) in latest.items():
+        try:
+            result[company_id] = (set_id, compiled.get(set_id, version, raw))
+        except ValueError:
+            result[company_id] = (set_id, None)
+    return result
+
+
+def age_on(dob, today) -> int:
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+
+def active_accounts(company_id=None):
+    qs = PensionAccount.objects.filter(status="active")
+    if company_id is not None:
+        qs = qs.filter(member__company_id=company_id)
+    return qs
+
+
+def fingerprint(item, set_id, version) -> str:
+    """Hash of a worker item's inputs (everything but the account id)."""
+    raw = "|".join(str(value) for value in (*item[1:], set_id, version))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def mark_dirty(*args, **filters):
+    """Flag matching ProjectionResults for recomputation on the next run."""
+    ProjectionResult.objects.filter(*args, is_dirty=False, **filters).update(
+        is_dirty=True
+    )
+
+
+def build_items(rows, assumptions, today, version, force=False):
+    """
+    Turn ACCOUNT_COLUMNS rows into worker items for the accounts that need
+    (re)projecting.
+
+    Returns (items, meta, skipped, unchanged): meta maps account_id to
+    (assumption_set_id, fingerprint); skipped counts rows that lack a salary,
+    date of birth or usable assumptions; unchanged counts clean results whose
+    fingerprint still matches (always 0 with force=True).
+    """
+    items, meta, skipped, unchanged = [], {}, 0, 0
+    for account_id, balance, salary, dob, company_id, stored, dirty in rows:
+        set_id, compiled_set = assumptions.get(company_id) or assumptions.get(
+            None, (None, None)
+        )
+        if compiled_set is None or salary is None or dob is None:
+            skipped += 1
+            continue
+        years = max(0, compiled_set.retirement_age - age_on(dob, today))
+        item = (
+            account_id,
+            balance,
+            salary,
+            years,
+            compiled_set.contribution_rate,
+            compiled_set.salary_growth,
+            compiled_set.rate_of_return,
+        )
+        digest = fingerprint(item, set_id, version)
+        if not force and not dirty and digest == stored:
+            unchanged += 1
+            continue
+        items.append(item)
+        meta[account_id] = (set_id, digest)
+    return items, meta, skipped, unchanged
+
+
+def save_results(run, items, meta, results):
+    """Upsert ProjectionResult rows for successful worker results."""
+    inputs = {item[0]: item for item in items}
+    now = timezone.now()
+    objs = []
+    for account_id, final_balance, error in results:
+        if error is not None:
+            continue
+        _, balance, salary, years, contribution_rate, salary_growth, rate = inputs[
+            account_id
+        ]
+        set_id, digest = meta[account_id]
+        objs.append(
+            ProjectionResult(
+                account_id=account_id,
+                run=run,
+                assumption_set_id=set_id,
+                current_balance=balance,
+                annual_salary=salary,
+                contribution_rate=contribution_rate,
+                salary_growth=salary_growth,
+                rate_of_return=rate,
+                years=years,
+                final_balance=final_balance,
+                projected_at=now,
+                input_fingerprint=digest,
+                is_dirty=False,
+            )
+        )
+    ProjectionResult.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=["account"],
+        update_fields=list(RESULT_FIELDS),
+    )
+    return len(objs)
@@ -1,10 +1,15 @@
 ﻿from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from .assumptions import compile_assumptions
+from .authentication import USER_CLAIMS
 from .models import (
     Company,
     Member,
     PensionAccount,
     Transaction,
     AssumptionSet,
+    AssumptionVersion,
     CustomUser,
 )
 
@@ -25,6 +30,22 @@ class PensionAccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = PensionAccount
         fields = "__all__"
+        # balance is maintained by api.ledger from the transactions
+        read_only_fields = ("balance",)
+
+    def create(self, validated_data):
+        validated_data["balance"] = validated_data.get("opening_balance", 0)
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        # the opening balance is fixed once transactions may exist; post an
+        # adjustment transaction to correct it
+        validated_data.pop("opening_balance", None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # only the submitted columns: a full save could race a ledger write
+        instance.save(update_fields=list(validated_data))
+        return instance
 
 
 class TransactionSerializer(serializers.ModelSerializer):
@@ -38,6 +59,30 @@ class AssumptionSetSerializer(serializers.ModelSerializer):
         model = AssumptionSet
         fields = "__all__"
 
+    def validate_assumptions(self, value):
+        try:
+            compile_assumptions(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+
+
+class AssumptionVersionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AssumptionVersion
+        fields = ("version", "assumptions", "created_at")
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Embed profile/role claims so requests can be authenticated without a DB query."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim, None)
+        return token
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
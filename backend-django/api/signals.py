@@ -0,0 +1,129 @@
+# backend-django/api/signals.py
+"""
+Model signal handlers (connected in ApiConfig.ready).
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import ledger, projections, summaries
+from .authentication import active_cache, user_cache
+from .models import AssumptionSet, Member, PensionAccount, Transaction
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    active_cache.invalidate(instance.pk)
+
+
+# ---- ledger ----
+@receiver(pre_save, sender=Transaction)
+def remember_ledger_state(sender, instance, raw=False, **kwargs):
+    instance._ledger_old = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._ledger_old = (
+        Transaction.objects.filter(pk=instance.pk)
+        .values_list("account_id", "transaction_type", "amount", "date")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Transaction)
+def apply_transaction_to_ledger(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata: fixtures carry their own balances
+        return
+    old = getattr(instance, "_ledger_old", None)
+    if old is not None:
+        ledger.reverse(*old)
+    ledger.record(instance)
+
+
+def _cascaded(origin, model) -> bool:
+    """True when a delete of some other model (e.g. a company) reached this row."""
+    return origin is not None and getattr(origin, "model", type(origin)) is not model
+
+
+@receiver(post_delete, sender=Transaction)
+def remove_transaction_from_ledger(sender, instance, origin=None, **kwargs):
+    # deleting an account/member/company cascades here; its ledger goes with it
+    if _cascaded(origin, Transaction):
+        return
+    ledger.reverse(
+        instance.account_id, instance.transaction_type, instance.amount, instance.date
+    )
+
+
+# ---- company summary cache ----
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def invalidate_summary_for_transaction(sender, instance, origin=None, **kwargs):
+    if _cascaded(origin, Transaction):
+        return
+    account_ids = {instance.account_id}
+    old = getattr(instance, "_ledger_old", None)
+    if old is not None:  # moved from another account
+        account_ids.add(old[0])
+    summaries.invalidate_for_accounts(account_ids)
+
+
+@receiver(post_save, sender=PensionAccount)
+@receiver(post_delete, sender=PensionAccount)
+def invalidate_summary_for_account(sender, instance, origin=None, **kwargs):
+    if _cascaded(origin, PensionAccount):
+        return
+    summaries.invalidate_company_summary(
+        Member.objects.filter(pk=instance.member_id)
+        .values_list("company_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_summary_for_member(sender, instance, **kwargs):
+    summaries.invalidate_company_summary(instance.company_id)
+
+
+# ---- stored projections ----
+# Stored fingerprints catch every input change on the next run anyway; the
+# dirty flag also records why a result is stale and forces its recompute.
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def mark_projection_dirty_for_transaction(sender, instance, origin=None, **kwargs):
+    if _cascaded(origin, Transaction):
+        return
+    account_ids = {instance.account_id}
+    old = getattr(instance, "_ledger_old", None)
+    if old is not None:
+        account_ids.add(old[0])
+    projections.mark_dirty(account_id__in=account_ids)
+
+
+@receiver(post_save, sender=PensionAccount)
+def mark_projection_dirty_for_account(sender, instance, created=False, **kwargs):
+    if not created:
+        projections.mark_dirty(account_id=instance.pk)
+
+
+@receiver(post_save, sender=Member)
+def mark_projection_dirty_for_member(sender, instance, created=False, **kwargs):
+    if not created:
+        projections.mark_dirty(account__member_id=instance.pk)
+
+
+@receiver(post_save, sender=AssumptionSet)
+@receiver(post_delete, sender=AssumptionSet)
+def mark_projection_dirty_for_assumptions(sender, instance, origin=None, **kwargs):
+    if _cascaded(origin, AssumptionSet):
+        return
+    if not getattr(instance, "_version_changed", True):  # e.g. only renamed
+        return
+    if instance.company_id is None:
+        # the default set: results made from it (or from a since-deleted set)
+        projections.mark_dirty(assumption_set__company__isnull=True)
+    else:
+        projections.mark_dirty(account__member__company_id=instance.company_id)
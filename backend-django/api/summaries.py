@@ -0,0 +1,102 @@
+# backend-django/api/summaries.py
+"""
+Company-level dashboard aggregates, served from the Django cache.
+
+Figures come from PensionAccount.balance and AccountMonthlyRollup (both kept
+current by api.ledger), so building a summary costs O(accounts + months),
+never a ledger scan. Entries are dropped on commit by the signal handlers in
+api.signals whenever a Member, PensionAccount or Transaction of the company
+changes, and expire after COMPANY_SUMMARY_CACHE_SECONDS regardless: with the
+per-process locmem backend another worker's write is only seen after expiry,
+so multi-worker deployments should use the file (or a shared) backend.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import AccountMonthlyRollup, Company, Member, PensionAccount
+
+SUMMARY_MONTHS = 24
+
+
+def _key(company_id) -> str:
+    return f"company-summary:{company_id}"
+
+
+def build_company_summary(company: Company) -> dict:
+    accounts = PensionAccount.objects.filter(member__company=company).aggregate(
+        account_count=Count("id"),
+        active_account_count=Count("id", filter=Q(status="active")),
+        aum=Sum("balance"),
+    )
+    rollups = AccountMonthlyRollup.objects.filter(account__member__company=company)
+    totals = rollups.aggregate(
+        contributions=Sum("contributions"),
+        payouts=Sum("payouts"),
+        transaction_count=Sum("transaction_count"),
+    )
+    monthly = (
+        rollups.values("month")
+        .annotate(
+            contributions=Sum("contributions"),
+            payouts=Sum("payouts"),
+            net=Sum("net"),
+            transaction_count=Sum("transaction_count"),
+        )
+        .order_by("-month")[:SUMMARY_MONTHS]
+    )
+
+    def money(value):
+        return f"{value or 0:.2f}"
+
+    return {
+        "company": company.pk,
+        "name": company.name,
+        "member_count": Member.objects.filter(company=company).count(),
+        "account_count": accounts["account_count"],
+        "active_account_count": accounts["active_account_count"],
+        "aum": money(accounts["aum"]),
+        "total_contributions": money(totals["contributions"]),
+        "total_payouts": money(totals["payouts"]),
+        "transaction_count": totals["transaction_count"] or 0,
+        "monthly": [
+            {
+                "month": row["month"].strftime("%Y-%m"),
+                "contributions": money(row["contributions"]),
+                "payouts": money(row["payouts"]),
+                "net": money(row["net"]),
+                "transaction_count": row["transaction_count"],
+            }
+            for row in reversed(monthly)
+        ],
+        "generated_at": timezone.now().isoformat(),
+    }
+
+
+def get_company_summary(company: Company) -> dict:
+    key = _key(company.pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_company_summary(company)
+        cache.set(key, summary, settings.COMPANY_SUMMARY_CACHE_SECONDS)
+    return summary
+
+
+def invalidate_company_summary(*company_ids) -> None:
+    """Drop cached summaries once the current DB transaction commits."""
+    keys = [_key(pk) for pk in company_ids if pk is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_for_accounts(account_ids) -> None:
+    invalidate_company_summary(
+        *set(
+            PensionAccount.objects.filter(pk__in=account_ids).values_list(
+                "member__company_id", flat=True
+            )
+        )
+    )
@@ -1 +1,435 @@
-﻿# Create your tests here.
+﻿import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+import httpx
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import (
+    AccountMonthlyRollup,
+    AssumptionSet,
+    AssumptionVersion,
+    Company,
+    CustomUser,
+    Member,
+    PensionAccount,
+    ProjectionResult,
+    Transaction,
+)
+from . import ledger
+from .assumptions import compiled
+from .authentication import (
+    ClaimsJWTAuthentication,
+    active_cache,
+    get_jwt_authentication,
+    user_cache,
+)
+from .imports import import_transactions
+from .serializers import ClaimsTokenObtainPairSerializer, PensionAccountSerializer
+from .summaries import get_company_summary
+
+
+class LedgerIndexTests(TestCase):
+    """The hot list/lookup queries must be answerable from the 0003 indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name="Acme")
+        members = Member.objects.bulk_create(
+            Member(
+                company=cls.company,
+                first_name="M",
+                last_name=f"Last{i:03d}",
+                national_id=f"ID{i:06d}",
+            )
+            for i in range(50)
+        )
+        accounts = PensionAccount.objects.bulk_create(
+            PensionAccount(member=m, account_number=f"ACC{m.pk:06d}") for m in members
+        )
+        cls.account = accounts[0]
+        now = timezone.now()
+        Transaction.objects.bulk_create(
+            Transaction(
+                account=acc,
+                amount=10,
+                transaction_type=("contribution", "payout")[i % 2],
+                date=now - timedelta(days=i),
+            )
+            for acc in accounts
+            for i in range(5)
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == "postgresql":
+            # tiny test tables make a seq scan cheapest; force the planner to
+            # show whether an index path exists at all
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"{index_name} not used:\n{plan}")
+
+    def test_account_history_by_date(self):
+        qs = Transaction.objects.filter(account=self.account).order_by("-date")
+        self.assertUsesIndex(qs, "txn_account_date_idx")
+
+    def test_transactions_by_type_and_period(self):
+        since = timezone.now() - timedelta(days=2)
+        qs = Transaction.objects.filter(
+            transaction_type="contribution", date__gte=since
+        )
+        self.assertUsesIndex(qs, "txn_type_date_idx")
+
+    def test_company_member_listing(self):
+        qs = Member.objects.filter(company=self.company).order_by("last_name")
+        self.assertUsesIndex(qs, "member_company_last_name_idx")
+
+    def test_national_id_lookup(self):
+        qs = Member.objects.filter(national_id="ID000007")
+        self.assertUsesIndex(qs, "member_national_id_idx")
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        member = Member.objects.create(
+            company=Company.objects.create(name="Acme"), first_name="A", last_name="B"
+        )
+        self.account = PensionAccount.objects.create(
+            member=member, account_number="L1", opening_balance=50, balance=50
+        )
+
+    def balance(self):
+        self.account.refresh_from_db()
+        return self.account.balance
+
+    def test_writes_maintain_balance_and_rollups(self):
+        tx = Transaction.objects.create(
+            account=self.account,
+            amount=Decimal("100.00"),
+            transaction_type="contribution",
+        )
+        self.assertEqual(self.balance(), Decimal("150.00"))
+
+        tx.transaction_type = "payout"
+        tx.date = tx.date - timedelta(days=62)
+        tx.save()
+        self.assertEqual(self.balance(), Decimal("-50.00"))
+        rollups = AccountMonthlyRollup.objects.filter(account=self.account)
+        self.assertEqual(
+            sorted(rollups.values_list("net", "transaction_count")),
+            [(Decimal("-100.00"), 1), (Decimal("0.00"), 0)],
+        )
+
+        tx.delete()
+        self.assertEqual(self.balance(), Decimal("50.00"))
+        call_command("reconcile_ledger", stdout=io.StringIO())
+
+    def test_saving_a_stale_account_keeps_the_ledger_balance(self):
+        stale = PensionAccount.objects.get(pk=self.account.pk)
+        Transaction.objects.create(
+            account=self.account,
+            amount=Decimal("10.00"),
+            transaction_type="contribution",
+        )
+        stale.status = "suspended"
+        stale.save()
+        self.assertEqual(self.balance(), Decimal("60.00"))
+        self.assertEqual(self.account.status, "suspended")
+
+        serializer = PensionAccountSerializer(
+            stale, data={"status": "active"}, partial=True
+        )
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertEqual(self.balance(), Decimal("60.00"))
+        self.assertEqual(self.account.status, "active")
+
+    def test_reconcile_detects_and_fixes_drift(self):
+        Transaction.objects.create(
+            account=self.account,
+            amount=Decimal("10.00"),
+            transaction_type="contribution",
+        )
+        PensionAccount.objects.filter(pk=self.account.pk).update(balance=0)
+        with self.assertRaises(CommandError):
+            call_command("reconcile_ledger", stdout=io.StringIO())
+        call_command("reconcile_ledger", "--fix", stdout=io.StringIO())
+        self.assertEqual(self.balance(), Decimal("60.00"))
+
+
+class CompanySummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_summary_is_cached_and_invalidated_on_write(self):
+        company = Company.objects.create(name="Acme")
+        member = Member.objects.create(company=company, first_name="A", last_name="B")
+        account = PensionAccount.objects.create(member=member, account_number="S1")
+
+        first = get_company_summary(company)
+        self.assertEqual(first["aum"], "0.00")
+        with self.assertNumQueries(0):
+            self.assertEqual(get_company_summary(company), first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                account=account,
+                amount=Decimal("25.00"),
+                transaction_type="contribution",
+            )
+        summary = get_company_summary(company)
+        self.assertEqual(summary["aum"], "25.00")
+        self.assertEqual(summary["monthly"][-1]["contributions"], "25.00")
+
+
+class TransactionImportTests(TestCase):
+    CSV = (
+        b"account_number,amount,transaction_type,date\n"
+        b"IMP1,100.00,contribution,2024-01-31\n"
+        b"IMP1,40.00,payout,2024-02-01T10:00:00Z\n"
+        b"NOPE,1.00,contribution,\n"
+        b"IMP1,abc,contribution,\n"
+    )
+
+    def setUp(self):
+        member = Member.objects.create(
+            company=Company.objects.create(name="Acme"), first_name="A", last_name="B"
+        )
+        self.account = PensionAccount.objects.create(
+            member=member, account_number="IMP1"
+        )
+
+    def test_import_reports_row_errors_and_is_idempotent(self):
+        batch, created = import_transactions(io.BytesIO(self.CSV), "jan.csv")
+        self.assertTrue(created)
+        self.assertEqual(
+            (batch.total_rows, batch.imported_rows, batch.error_rows), (4, 2, 2)
+        )
+        self.assertEqual([err["line"] for err in batch.errors], [4, 5])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("60.00"))
+        self.assertEqual(
+            AccountMonthlyRollup.objects.filter(account=self.account).count(), 2
+        )
+
+        again, created = import_transactions(io.BytesIO(self.CSV), "jan-copy.csv")
+        self.assertFalse(created)
+        self.assertEqual(again.pk, batch.pk)
+        self.assertEqual(Transaction.objects.filter(account=self.account).count(), 2)
+
+
+class IncrementalProjectionTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name="Acme")
+        AssumptionSet.objects.create(
+            company=company,
+            name="Base",
+            assumptions={
+                "contribution_rate": "0.05",
+                "salary_growth": "0.02",
+                "rate_of_return": "0.04",
+            },
+        )
+        self.member = Member.objects.create(
+            company=company,
+            first_name="A",
+            last_name="B",
+            date_of_birth="1980-06-01",
+            annual_salary=Decimal("40000.00"),
+        )
+        self.account = PensionAccount.objects.create(
+            member=self.member, account_number="P1", opening_balance=1000
+        )
+
+    def run_projection(self):
+        out = io.StringIO()
+        call_command("project_portfolio", "--workers", "0", stdout=out)
+        return out.getvalue().splitlines()[-1]
+
+    def test_only_changed_accounts_are_recomputed(self):
+        self.assertIn("1 projected, 0 unchanged", self.run_projection())
+        self.assertIn("0 projected, 1 unchanged", self.run_projection())
+
+        self.member.annual_salary = Decimal("45000.00")
+        self.member.save()
+        result = ProjectionResult.objects.get(account=self.account)
+        self.assertTrue(result.is_dirty)
+        self.assertIn("1 projected, 0 unchanged", self.run_projection())
+        result.refresh_from_db()
+        self.assertFalse(result.is_dirty)
+        self.assertEqual(result.annual_salary, Decimal("45000.00"))
+
+        # bulk ledger writes send no signals; the fingerprint still changes
+        ledger.insert_transactions(
+            [(self.account.pk, "contribution", Decimal("5.00"), timezone.now(), "t")]
+        )
+        self.assertIn("1 projected, 0 unchanged", self.run_projection())
+
+
+class AssumptionVersionTests(TestCase):
+    def setUp(self):
+        compiled.clear()
+        self.values = {
+            "contribution_rate": "0.05",
+            "salary_growth": "0.02",
+            "rate_of_return": "0.04",
+        }
+        self.aset = AssumptionSet.objects.create(name="Base", assumptions=self.values)
+
+    def test_changes_create_immutable_versions(self):
+        self.assertEqual(self.aset.version, 1)
+        self.aset.name = "Renamed"
+        self.aset.save()
+        self.assertEqual(self.aset.version, 1)
+
+        self.aset.assumptions = {**self.values, "rate_of_return": "0.06"}
+        self.aset.save()
+        self.assertEqual(self.aset.version, 2)
+        first = AssumptionVersion.objects.get(assumption_set=self.aset, version=1)
+        self.assertEqual(first.assumptions, self.values)
+        with self.assertRaises(ValueError):
+            first.save()
+
+        with self.assertRaises(ValueError):
+            self.aset.assumptions = {**self.values, "contribution_rate": "1.5"}
+            self.aset.save()
+
+    def test_compiled_once_per_version(self):
+        values = compiled.get(self.aset.pk, 1)
+        self.assertEqual(values.rate_of_return, Decimal("0.04"))
+        self.assertEqual(values.retirement_age, 65)
+        with self.assertNumQueries(0):
+            self.assertIs(compiled.get(self.aset.pk, 1), values)
+
+
+class RequestTracingTests(TestCase):
+    """Request id and deadline are forwarded to FastAPI; spans come back."""
+
+    def _proxy(self, **headers):
+        sent = {}
+
+        def handler(request):
+            sent.update(request.headers)
+            return httpx.Response(
+                200,
+                json={"final_balance": "1.00"},
+                headers={"Server-Timing": "queue;dur=0.100, compute;dur=2.000"},
+            )
+
+        transport = httpx.MockTransport(handler)
+        real_client = httpx.Client
+        with mock.patch(
+            "api.views.httpx.Client",
+            lambda **kw: real_client(transport=transport, **kw),
+        ):
+            response = self.client.post(
+                "/api/v1/proxy/dc/project/",
+                data={"years": 1},
+                content_type="application/json",
+                **headers,
+            )
+        return response, sent
+
+    def test_request_id_and_budget_are_forwarded(self):
+        response, sent = self._proxy(
+            HTTP_X_REQUEST_ID="trace-1", HTTP_X_REQUEST_TIMEOUT="5"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Request-ID"], "trace-1")
+        self.assertEqual(sent["x-request-id"], "trace-1")
+        self.assertLessEqual(float(sent["x-request-timeout"]), 5.0)
+        timing = response["Server-Timing"]
+        for name in ("proxy;dur=", "app;dur=", "fastapi-compute;dur=2.000"):
+            self.assertIn(name, timing)
+
+    def test_expired_deadline_is_not_proxied(self):
+        response, sent = self._proxy(HTTP_X_REQUEST_TIMEOUT="0")
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(sent, {})
+        self.assertTrue(response["X-Request-ID"])
+
+
+class JWTAuthenticationTests(TestCase):
+    """Users come from token claims, but deactivation is still honoured."""
+
+    def setUp(self):
+        user_cache.clear()
+        active_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username="ana", email="ana@example.com", password="x", is_company_user=True
+        )
+
+    def _me(self, token):
+        return self.client.get("/api/v1/auth/me/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _claims_token(self):
+        return ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+
+    def test_claims_token_needs_no_user_query_once_cached(self):
+        token = self._claims_token()
+        response = self._me(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "ana")
+        self.assertTrue(response.json()["is_company_user"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._me(token).status_code, 200)
+
+    def test_deactivated_user_is_refused_before_token_expiry(self):
+        token = self._claims_token()
+        self.assertEqual(self._me(token).status_code, 200)
+        self.user.is_active = False
+        self.user.save()  # drops the cached is_active
+        self.assertEqual(self._me(token).status_code, 401)
+
+    def test_token_without_claims_falls_back_to_cached_lookup(self):
+        token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._me(token).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._me(token).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._me(token).status_code, 401)
+
+    def test_db_mode_uses_stock_authentication(self):
+        with override_settings(JWT_AUTH_MODE="db"):
+            self.assertNotIsInstance(get_jwt_authentication(), ClaimsJWTAuthentication)
+        with override_settings(JWT_AUTH_MODE="claims"):
+            self.assertIsInstance(get_jwt_authentication(), ClaimsJWTAuthentication)
+
+
+class SeedSyntheticTests(TestCase):
+    def _seed(self, *args):
+        call_command(
+            "seed_synthetic",
+            "--companies=1",
+            "--members-per-company=5",
+            "--seed=3",
+            *args,
+            stdout=io.StringIO(),
+        )
+        rows = (
+            list(
+                PensionAccount.objects.order_by("account_number").values_list(
+                    "account_number", "balance", "member__date_of_birth"
+                )
+            ),
+            list(Transaction.objects.order_by("date").values_list("amount", "date")),
+        )
+        Company.objects.all().delete()
+        return rows
+
+    def test_same_seed_and_as_of_give_the_same_rows(self):
+        first = self._seed()
+        self.assertEqual(self._seed(), first)
+        later = self._seed("--as-of=2030-06-30")
+        self.assertEqual([r[:2] for r in later[0]], [r[:2] for r in first[0]])
+        self.assertGreater(later[1][0][1], first[1][-1][1])
@@ -0,0 +1,86 @@
+# backend-django/api/tracing.py
+"""
+Request id, deadline and timing spans for calls proxied to FastAPI.
+
+RequestContextMiddleware (api/middleware.py) gives every request:
+- request.request_id: the caller's X-Request-ID when well formed, else a new
+  id; echoed back and forwarded to FastAPI so both services log the same id;
+- request.deadline: time.monotonic() by which the caller stops waiting, from
+  its X-Request-Timeout (None when it did not send one);
+- request.timings: spans recorded with span(); returned as Server-Timing,
+  followed by FastAPI's own spans (forward_timings()).
+
+upstream() turns these into the headers and httpx timeout for one FastAPI
+call: the budget sent on is the smaller of the view's own timeout and what is
+left of the caller's.
+"""
+
+import contextlib
+import re
+import time
+import uuid
+
+REQUEST_ID_HEADER = "X-Request-ID"
+DEADLINE_HEADER = "X-Request-Timeout"
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def incoming_request_id(request):
+    rid = request.headers.get(REQUEST_ID_HEADER)
+    if rid and _REQUEST_ID_RE.match(rid):
+        return rid
+    return uuid.uuid4().hex
+
+
+def parse_timeout(raw):
+    """X-Request-Timeout -> seconds; None when missing, malformed or negative."""
+    if not raw:
+        return None
+    try:
+        timeout = float(raw)
+    except ValueError:
+        return None
+    return timeout if timeout >= 0 else None  # also rejects nan
+
+
+def record(request, name, seconds):
+    timings = getattr(request, "timings", None)
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextlib.contextmanager
+def span(request, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(request, name, time.perf_counter() - started)
+
+
+def server_timing(timings):
+    return ", ".join(f"{name};dur={seconds * 1000.0:.3f}" for name, seconds in timings)
+
+
+def upstream(request, timeout):
+    """
+    (headers, timeout) for a FastAPI call made while serving `request`.
+    timeout <= 0 means the caller's deadline has already passed.
+    """
+    deadline = getattr(request, "deadline", None)
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+    headers = {DEADLINE_HEADER: f"{max(timeout, 0.0):.3f}"}
+    rid = getattr(request, "request_id", None)
+    if rid:
+        headers[REQUEST_ID_HEADER] = rid
+    return headers, timeout
+
+
+def forward_timings(request, response, prefix="fastapi-"):
+    """Keep FastAPI's Server-Timing entries, renamed with `prefix`, for our own header."""
+    forwarded = getattr(request, "upstream_timings", None)
+    raw = response.headers.get("server-timing")
+    if forwarded is None or not raw:
+        return
+    forwarded.extend(prefix + part.strip() for part in raw.split(",") if part.strip())
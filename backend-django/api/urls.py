@@ -3,6 +3,7 @@ from django.urls import path, include
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from .serializers import ClaimsTokenObtainPairSerializer
 from .views import (
     CompanyViewSet,
     MemberViewSet,
@@ -24,7 +25,11 @@ router.register(r"assumptions", AssumptionSetViewSet)
 urlpatterns = [
     path("", include(router.urls)),
     # JWT endpoints
-    path("auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path(
+        "auth/token/",
+        TokenObtainPairView.as_view(serializer_class=ClaimsTokenObtainPairSerializer),
+        name="token_obtain_pair",
+    ),
     path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     # convenience endpoint to return profile/role info
     path("auth/me/", me, name="me"),
@@ -11,50 +11,203 @@ from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import (
+    action,
     api_view,
     permission_classes,
     authentication_classes,
 )
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from . import exports, tracing
+from .authentication import get_jwt_authentication
+from .imports import ImportFileError, import_transactions
 from .models import Company, Member, PensionAccount, Transaction, AssumptionSet
+from .pagination import TransactionCursorPagination
 from .serializers import (
     CompanySerializer,
     MemberSerializer,
     PensionAccountSerializer,
     TransactionSerializer,
     AssumptionSetSerializer,
+    AssumptionVersionSerializer,
 )
+from .summaries import get_company_summary
 
 logger = logging.getLogger("pensionlib_api")
 
+# How long the FastAPI proxies wait at most (less if the caller sent a shorter
+# X-Request-Timeout). The budget is forwarded so FastAPI stops work nobody
+# will wait for; see api/tracing.py.
+FASTAPI_PROXY_TIMEOUT = 30.0
+FASTAPI_BATCH_TIMEOUT = 120.0
+
+
+def _deadline_exceeded(request):
+    logger.warning(
+        "deadline passed before proxying %s [%s]", request.path, request.request_id
+    )
+    return Response(
+        {"detail": "Request deadline exceeded"},
+        status=status.HTTP_504_GATEWAY_TIMEOUT,
+    )
+
 
 # ---- ViewSets ----
+class QueryParamFilterMixin:
+    """
+    Filter list querysets by integer query params, e.g. ?company=3&member=12.
+
+    `filter_params` maps a query param to the ORM lookup it filters on; every
+    lookup ends in an indexed foreign-key column.
+    """
+
+    filter_params = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for param, lookup in self.filter_params.items():
+            raw = self.request.query_params.get(param)
+            if raw in (None, ""):
+                continue
+            try:
+                value = int(raw)
+            except ValueError:
+                raise ValidationError({param: "Must be an integer id."})
+            queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+
+class ExportMixin:
+    """
+    GET <list>/export/?output=csv|ndjson streams every row matching the
+    list filters (no pagination) with `export_fields` as columns.
+    """
+
+    export_fields = ()
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        output = request.query_params.get("output", "csv")
+        if output not in exports.FORMATS:
+            raise ValidationError(
+                {"output": f"Must be one of: {', '.join(exports.FORMATS)}."}
+            )
+        return exports.export_response(
+            self.get_queryset(), self.export_fields, output, filename=self.basename
+        )
+
+
+# The serializers render foreign keys as ids read straight from the *_id
+# columns, so list querysets need no select_related; the joins would only
+# widen every row.
 class CompanyViewSet(viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
 
+    @action(detail=True, methods=["get"])
+    def summary(self, request, pk=None):
+        """Dashboard aggregates (AUM, counts, monthly flows), cached per company."""
+        return Response(get_company_summary(self.get_object()))
 
-class MemberViewSet(viewsets.ModelViewSet):
+
+class MemberViewSet(QueryParamFilterMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Member.objects.all()
     serializer_class = MemberSerializer
+    filter_params = {"company": "company_id"}
+    export_fields = (
+        "id",
+        "company_id",
+        "first_name",
+        "last_name",
+        "date_of_birth",
+        "national_id",
+        "annual_salary",
+        "created_at",
+    )
 
 
-class PensionAccountViewSet(viewsets.ModelViewSet):
+class PensionAccountViewSet(QueryParamFilterMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = PensionAccount.objects.all()
     serializer_class = PensionAccountSerializer
+    filter_params = {"member": "member_id", "company": "member__company_id"}
+    export_fields = (
+        "id",
+        "account_number",
+        "member_id",
+        "member__company_id",
+        "status",
+        "opening_balance",
+        "balance",
+        "created_at",
+    )
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(QueryParamFilterMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
+    pagination_class = TransactionCursorPagination
+    filter_params = {
+        "account": "account_id",
+        "member": "account__member_id",
+        "company": "account__member__company_id",
+    }
+    export_fields = (
+        "id",
+        "account_id",
+        "account__account_number",
+        "transaction_type",
+        "amount",
+        "date",
+        "source",
+    )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def bulk_import(self, request):
+        """
+        Upload a CSV (field 'file') of account_number, amount, transaction_type
+        [, date][, source]. 201 with the batch report, or 200 with the earlier
+        report when the same file was already imported.
+        """
+        uploaded = request.FILES.get("file")
+        if not uploaded:
+            raise ValidationError({"file": "No file provided."})
+        try:
+            batch, created = import_transactions(
+                uploaded, filename=uploaded.name, user=request.user
+            )
+        except ImportFileError as exc:
+            raise ValidationError({"file": str(exc)})
+        return Response(
+            {
+                "batch": batch.pk,
+                "duplicate": not created,
+                "total_rows": batch.total_rows,
+                "imported_rows": batch.imported_rows,
+                "error_rows": batch.error_rows,
+                "errors": batch.errors,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
 
 
-class AssumptionSetViewSet(viewsets.ModelViewSet):
+class AssumptionSetViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = AssumptionSet.objects.all()
     serializer_class = AssumptionSetSerializer
+    filter_params = {"company": "company_id"}
+
+    @action(detail=True)
+    def versions(self, request, pk=None):
+        """Every saved version of the set's values, newest first."""
+        versions = self.get_object().versions.order_by("-version")
+        return Response(AssumptionVersionSerializer(versions, many=True).data)
 
 
 # ---- Helpers ----
@@ -104,7 +257,7 @@ def upload_csv_and_process(request):
         )
 
     # Validate JWT (so we can give a helpful error)
-    jwt_auth = JWTAuthentication()
+    jwt_auth = get_jwt_authentication()
     try:
         parts = auth_header.split()
         if len(parts) != 2 or parts[0].lower() != "bearer":
@@ -162,12 +315,16 @@ def upload_csv_and_process(request):
         )
 
     # Forward the saved file to FastAPI
-    headers = {"Authorization": auth_header}
+    headers, timeout = tracing.upstream(request, FASTAPI_BATCH_TIMEOUT)
+    if timeout <= 0:
+        return _deadline_exceeded(request)
+    headers["Authorization"] = auth_header
     try:
-        with httpx.Client(timeout=120.0) as client:
-            with open(dest_path, "rb") as fobj:
+        with httpx.Client(timeout=timeout) as client:
+            with open(dest_path, "rb") as fobj, tracing.span(request, "proxy"):
                 files = {"file": (uploaded_file.name, fobj, "text/csv")}
                 resp = client.post(fastapi_batch, files=files, headers=headers)
+            tracing.forward_timings(request, resp)
             if resp.status_code >= 400:
                 logger.error(
                     "FastAPI batch returned %s: %s", resp.status_code, resp.text
@@ -228,19 +385,22 @@ def proxy_project_dc(request):
     auth_header = request.META.get("HTTP_AUTHORIZATION")
     content_type = request.META.get("CONTENT_TYPE", "application/json")
 
-    headers = {}
+    headers, timeout = tracing.upstream(request, FASTAPI_PROXY_TIMEOUT)
+    if timeout <= 0:
+        return _deadline_exceeded(request)
     if auth_header:
         headers["Authorization"] = auth_header
     if content_type:
         headers["Content-Type"] = content_type
 
     try:
-        with httpx.Client(timeout=30.0) as client:
+        with httpx.Client(timeout=timeout) as client, tracing.span(request, "proxy"):
             if content_type and "application/json" in content_type:
                 # use request.data (DRF parsed) to avoid double-JSON issues
                 resp = client.post(fastapi_url, json=request.data, headers=headers)
             else:
                 resp = client.post(fastapi_url, content=request.body, headers=headers)
+            tracing.forward_timings(request, resp)
 
             return HttpResponse(
                 resp.content,
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.RequestContextMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -126,6 +127,31 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# =========================
+# CACHE
+# =========================
+# "locmem" is per process; use "file" (shared directory) with several workers
+_cache_backend = os.environ.get("DJANGO_CACHE_BACKEND", "locmem")
+if _cache_backend == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION")
+            or str(BASE_DIR / "cache"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "pension-dashboard",
+        }
+    }
+# company dashboard summaries (also invalidated on writes, see api.summaries)
+COMPANY_SUMMARY_CACHE_SECONDS = int(
+    os.environ.get("COMPANY_SUMMARY_CACHE_SECONDS", 300)
+)
+
 # =========================
 # CUSTOM USER MODEL
 # =========================
@@ -134,12 +160,28 @@ AUTH_USER_MODEL = "api.CustomUser"
 # =========================
 # REST FRAMEWORK + JWT
 # =========================
+# "claims": build request.user from token claims (no DB query per request)
+# "db": load CustomUser from the database on every request
+JWT_AUTH_MODE = os.environ.get("JWT_AUTH_MODE", "claims")
+# per-process cache of is_active flags (claims) and of users loaded for tokens
+# issued without claims
+JWT_USER_CACHE_SECONDS = int(os.environ.get("JWT_USER_CACHE_SECONDS", 30))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        (
+            "api.authentication.ClaimsJWTAuthentication"
+            if JWT_AUTH_MODE == "claims"
+            else "rest_framework_simplejwt.authentication.JWTAuthentication"
+        ),
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # keyset pagination: no COUNT(*) / OFFSET, flat cost at any table size
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.IdCursorPagination",
+    "PAGE_SIZE": 100,
 }
+# rows fetched per DB round trip by the streaming export endpoints
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(
@@ -184,6 +226,12 @@ if not FASTAPI_BASE_URL or not FASTAPI_BATCH_URL:
         "Batch uploads will fail."
     )
 
+# pensionlib is imported directly by batch jobs (project_portfolio); it lives in
+# the actuarial-fastapi tree unless installed into this environment
+PENSIONLIB_PATH = os.environ.get("PENSIONLIB_PATH") or str(
+    BASE_DIR / "actuarial-fastapi"
+)
+
 # =========================
 # END OF SETTINGS
 # =========================
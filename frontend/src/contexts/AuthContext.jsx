@@ -107,8 +107,19 @@ export function AuthProvider({ children }) {
     return res;
   }
 
+  // WebSocket to the FastAPI service; browsers cannot send headers on a socket,
+  // so the token is offered as a "bearer.<jwt>" subprotocol (kept out of URLs
+  // and access logs) next to "pensionlib.v1", which the server selects
+  function openFastAPISocket(path) {
+    const base = new URL(FASTAPI_BASE, window.location.href);
+    base.protocol = base.protocol === "https:" ? "wss:" : "ws:";
+    const url = new URL(`${base.pathname.replace(/\/+$/, "")}${ensureLeadingSlash(path)}`, base);
+    const protocols = token ? ["pensionlib.v1", `bearer.${token}`] : ["pensionlib.v1"];
+    return new WebSocket(url.toString(), protocols);
+  }
+
   return (
-    <AuthContext.Provider value={{ token, login, logout, profile, callDjango, callFastAPI }}>
+    <AuthContext.Provider value={{ token, login, logout, profile, callDjango, callFastAPI, openFastAPISocket }}>
       {children}
     </AuthContext.Provider>
   );
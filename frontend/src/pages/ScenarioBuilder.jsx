@@ -1,9 +1,10 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import { useAuth } from "../contexts/AuthContext";
 import { useNavigate } from "react-router-dom";
 
 // ScenarioBuilder — polished, production-friendly single-file component
-// - Local projection preview (so UI is responsive even if API is slow)
+// - Local projection preview (so UI is responsive even if API is slow),
+//   replaced by the exact server projection streamed over /dc/live
 // - Calls callFastAPI('/dc/project', payload) from AuthContext
 // - Graceful fallback to local projection on API failure
 // - Validation, helpful UI hints, and responsive layout (Tailwind)
@@ -31,9 +32,21 @@ function computeProjection({ current_balance, annual_salary, years, contribution
   return out;
 }
 
+// server DCResponse rows -> preview rows
+function fromServerProjection(result, startBalance) {
+  let prev = Number(startBalance || 0);
+  return result.annual_balances.map((row) => {
+    const balance = Number(row.balance);
+    const contribution = Number(row.contribution);
+    const growth = +(balance - prev - contribution).toFixed(2);
+    prev = balance;
+    return { yearIndex: row.year, balance, contribution, growth, salary: Number(row.salary) };
+  });
+}
+
 export default function ScenarioBuilder() {
   const navigate = useNavigate();
-  const { callFastAPI } = useAuth();
+  const { callFastAPI, openFastAPISocket } = useAuth();
 
   const [form, setForm] = useState({
     current_balance: "1000.00",
@@ -47,9 +60,63 @@ export default function ScenarioBuilder() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [touched, setTouched] = useState({});
+  // exact projection for the latest edit, pushed by the server (null until it arrives)
+  const [exact, setExact] = useState(null);
+  const socketRef = useRef(null);
+  const seqRef = useRef(0);
+
+  // Live exact preview: the server debounces edits and only answers the latest
+  useEffect(() => {
+    let socket;
+    try {
+      socket = openFastAPISocket("/dc/live");
+    } catch (e) {
+      return undefined; // no socket: keep the local preview
+    }
+    socketRef.current = socket;
+    socket.onopen = () => sendEdit(socket);
+    socket.onmessage = (event) => {
+      let msg;
+      try {
+        msg = JSON.parse(event.data);
+      } catch (e) {
+        return;
+      }
+      if (msg.seq !== seqRef.current) return; // answer to an older edit
+      setExact(msg.type === "projection" ? msg.result : null);
+    };
+    socket.onclose = () => {
+      if (socketRef.current === socket) socketRef.current = null;
+    };
+    return () => {
+      socketRef.current = null;
+      socket.close();
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, []);
+
+  function sendEdit(socket = socketRef.current) {
+    if (!socket || socket.readyState !== WebSocket.OPEN) return;
+    socket.send(
+      JSON.stringify({
+        seq: seqRef.current,
+        current_balance: form.current_balance,
+        annual_salary: form.annual_salary,
+        years: Number(form.years),
+        assumptions: { contribution_rate: form.contribution_rate, salary_growth: form.salary_growth, rate_of_return: form.rate_of_return },
+      })
+    );
+  }
+
+  useEffect(() => {
+    seqRef.current += 1;
+    setExact(null);
+    sendEdit();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [form]);
 
   // Local preview projection (fast UI feedback)
-  const preview = useMemo(() => {
+  const localPreview = useMemo(() => {
     return computeProjection({
       current_balance: form.current_balance,
       annual_salary: form.annual_salary,
@@ -60,6 +127,11 @@ export default function ScenarioBuilder() {
     });
   }, [form]);
 
+  const preview = useMemo(
+    () => (exact ? fromServerProjection(exact, form.current_balance) : localPreview),
+    [exact, localPreview, form.current_balance]
+  );
+
   useEffect(() => {
     // clear error when user edits form
     if (error) setError(null);
@@ -266,7 +338,7 @@ export default function ScenarioBuilder() {
                 Save
               </button>
 
-              <div className="text-sm text-gray-500">Preview uses local calculation immediately. API result will replace on success.</div>
+              <div className="text-sm text-gray-500">Preview uses local calculation immediately; the exact server projection replaces it as you pause typing.</div>
             </div>
 
             <div className="text-right text-sm">
@@ -280,7 +352,7 @@ export default function ScenarioBuilder() {
             <div className="rounded-md border bg-gray-50 p-3">
               <div className="flex items-center justify-between mb-2">
                 <div className="text-sm font-medium">Preview (first 5 years)</div>
-                <div className="text-xs text-gray-500">Client-side estimate</div>
+                <div className="text-xs text-gray-500">{exact ? "Exact (server)" : "Client-side estimate"}</div>
               </div>
               <div className="overflow-x-auto">
                 <table className="w-full text-left text-sm">
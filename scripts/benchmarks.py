@@ -1,6 +1,599 @@
-﻿#!/usr/bin/env python3
+#!/usr/bin/env python3
 """
-Benchmark placeholders.
+Benchmarks for pensionlib and the actuarial-fastapi endpoints.
+
+Covers every public function in pensionlib.calculations (across horizon lengths
+and batch sizes), the engine's exact and fast precision modes, model-point
+compression, the goal-seek solvers, the scenario grid sweep, the Money
+arithmetic primitives, and the ASGI endpoints driven in-process through
+httpx.ASGITransport.
+
+Usage:
+  python scripts/benchmarks.py                         # run everything, print a table
+  python scripts/benchmarks.py --output bench.json     # also write machine-readable JSON
+  python scripts/benchmarks.py --compare baseline.json # exit 1 if anything regressed
+  python scripts/benchmarks.py --filter calculations --quick
+
+A benchmark regresses when its median time per op exceeds the baseline's by
+more than --threshold (default 10%).
 """
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ACTUARIAL_ROOT = os.path.join(REPO_ROOT, "actuarial-fastapi")
+if ACTUARIAL_ROOT not in sys.path:
+    sys.path.insert(0, ACTUARIAL_ROOT)
+# one in-process client would trip api.main's per-client rate limit
+os.environ.setdefault("RATE_LIMIT_MAX", "0")
+
+from pensionlib import (  # noqa: E402
+    calculations,
+    engine,
+    grid,
+    model_points,
+    models,
+    solver,
+)
+from pensionlib.money import Money  # noqa: E402
+
+HORIZONS = (1, 10, 40, 80)
+BATCH_SIZES = (100, 1000)
+
+
+class Benchmark:
+    """
+    One named measurement. `setup()` returns the zero-argument callable to time;
+    `ops` is how many logical operations (rows, requests) one call performs.
+    """
+
+    def __init__(self, name: str, setup: Callable[[], Callable], params=None, ops=1):
+        self.name = name
+        self.setup = setup
+        self.params = params or {}
+        self.ops = ops
+
+
+def _dc_input(years: int, i: int = 0) -> models.DCProjectionInput:
+    return models.DCProjectionInput(
+        current_balance=Decimal("10000.00") + i,
+        annual_salary=Decimal("40000.00") + i,
+        contribution_rate="0.10",
+        salary_growth="0.02",
+        rate_of_return="0.05",
+        years=years,
+    )
+
+
+# ---- pensionlib.calculations ----
+def calculation_benchmarks() -> List[Benchmark]:
+    benches: List[Benchmark] = []
+    for years in HORIZONS:
+        inp = _dc_input(years)
+        benches.append(
+            Benchmark(
+                f"calculations.project_dc_account[years={years}]",
+                lambda inp=inp: lambda: calculations.project_dc_account(inp),
+                {"years": years},
+            )
+        )
+    for size in BATCH_SIZES:
+        inputs = [_dc_input(40, i) for i in range(size)]
+        benches.append(
+            Benchmark(
+                f"calculations.project_dc_account.batch[rows={size},years=40]",
+                lambda inputs=inputs: lambda: [
+                    calculations.project_dc_account(x) for x in inputs
+                ],
+                {"rows": size, "years": 40},
+                ops=size,
+            )
+        )
+    for years in (10, 40):
+        inp = models.DBAccrualInput(
+            final_salary="60000", years_of_service=years, accrual_rate="0.0166667"
+        )
+        benches.append(
+            Benchmark(
+                f"calculations.project_db_accrual[years={years}]",
+                lambda inp=inp: lambda: calculations.project_db_accrual(inp),
+                {"years": years},
+            )
+        )
+    for periods in (12, 240, 480):
+        inp = models.AnnuityInput(
+            lump_sum="250000", rate_of_return="0.04", payment_periods=periods
+        )
+        benches.append(
+            Benchmark(
+                f"calculations.annuity_conversion[periods={periods}]",
+                lambda inp=inp: lambda: calculations.annuity_conversion(inp),
+                {"periods": periods},
+            )
+        )
+    benches.append(
+        Benchmark(
+            "calculations.commutation",
+            lambda: lambda: calculations.commutation(
+                Decimal("1000.00"), Decimal("0.25")
+            ),
+        )
+    )
+    benches.append(
+        Benchmark(
+            "calculations.apply_withdrawal",
+            lambda: lambda: calculations.apply_withdrawal(
+                Decimal("1000.00"), Decimal("200.00")
+            ),
+        )
+    )
+    for years in (1, 10):
+        benches.append(
+            Benchmark(
+                f"calculations.early_retirement_adjustment[years={years}]",
+                lambda years=years: lambda: calculations.early_retirement_adjustment(
+                    Decimal("10000.00"), years
+                ),
+                {"years": years},
+            )
+        )
+        benches.append(
+            Benchmark(
+                f"calculations.late_retirement_adjustment[years={years}]",
+                lambda years=years: lambda: calculations.late_retirement_adjustment(
+                    Decimal("10000.00"), years
+                ),
+                {"years": years},
+            )
+        )
+    return benches
+
+
+# ---- pensionlib.engine ----
+def engine_benchmarks() -> List[Benchmark]:
+    benches: List[Benchmark] = []
+    for mode in engine.MODES:
+        for years in (10, 40):
+            inp = _dc_input(years)
+            benches.append(
+                Benchmark(
+                    f"engine.project_dc[mode={mode},years={years}]",
+                    lambda inp=inp, mode=mode: lambda: engine.project_dc(inp, mode),
+                    {"mode": mode, "years": years},
+                )
+            )
+            benches.append(
+                Benchmark(
+                    f"engine.yearly_rows[mode={mode},years={years}]",
+                    lambda inp=inp, mode=mode: lambda: engine.yearly_rows(inp, mode),
+                    {"mode": mode, "years": years},
+                )
+            )
+    for years in (10, 40):
+        # the FAST serving path (no models); compare with project_dc[mode=exact]
+        inp = _dc_input(years)
+        benches.append(
+            Benchmark(
+                f"engine.fast_projection[years={years}]",
+                lambda inp=inp: lambda: engine.fast_projection(inp),
+                {"mode": engine.FAST, "years": years, "numpy": engine.np is not None},
+            )
+        )
+    for mode in engine.MODES:
+        inputs = [_dc_input(40, i) for i in range(1000)]
+        benches.append(
+            Benchmark(
+                f"engine.final_balances[mode={mode},rows=1000,years=40]",
+                lambda inputs=inputs, mode=mode: lambda: engine.final_balances(
+                    inputs, mode
+                ),
+                {
+                    "mode": mode,
+                    "rows": 1000,
+                    "years": 40,
+                    "numpy": engine.np is not None,
+                },
+                ops=1000,
+            )
+        )
+    return benches
+
+
+# ---- pensionlib.model_points ----
+def _scheme_members(size: int) -> List[model_points.MemberData]:
+    members = []
+    for i in range(size):
+        age = 20 + i % 45
+        members.append(
+            model_points.MemberData(
+                current_balance=Decimal(i * 37 % 500_000),
+                annual_salary=Decimal(15_000 + i * 53 % 105_000),
+                age=age,
+                years=65 - age,
+            )
+        )
+    return members
+
+
+def model_point_benchmarks() -> List[Benchmark]:
+    benches: List[Benchmark] = []
+    rates = (Decimal("0.10"), Decimal("0.02"), Decimal("0.05"))
+    for size in (10_000, 100_000):
+        members = _scheme_members(size)
+        benches.append(
+            Benchmark(
+                f"model_points.compress[members={size}]",
+                lambda members=members: lambda: model_points.compress(members),
+                {"members": size},
+                ops=size,
+            )
+        )
+    points = model_points.compress(_scheme_members(10_000))
+    benches.append(
+        Benchmark(
+            f"model_points.project_model_points[points={len(points)}]",
+            lambda: lambda: model_points.project_model_points(points, *rates),
+            {"points": len(points)},
+            ops=len(points),
+        )
+    )
+    return benches
+
+
+# ---- pensionlib.solver ----
+SOLVE_CONTRIBUTION_BODY = {
+    "current_balance": "10000.00",
+    "annual_salary": "40000.00",
+    "years": 40,
+    "salary_growth": "0.02",
+    "rate_of_return": "0.05",
+    "target_balance": "1000000.00",
+}
+
+
+def solver_benchmarks() -> List[Benchmark]:
+    rate_inp = models.ContributionRateSolveInput(**SOLVE_CONTRIBUTION_BODY)
+    years_inp = models.YearsSolveInput(
+        current_balance="10000.00",
+        annual_salary="40000.00",
+        contribution_rate="0.10",
+        salary_growth="0.02",
+        rate_of_return="0.05",
+        target_balance="1000000.00",
+    )
+    return [
+        Benchmark(
+            "solver.solve_contribution_rate[years=40]",
+            lambda: lambda: solver.solve_contribution_rate(rate_inp),
+            {"years": 40},
+        ),
+        Benchmark(
+            "solver.solve_years[target=1000000]",
+            lambda: lambda: solver.solve_years(years_inp),
+        ),
+    ]
+
+
+# ---- pensionlib.grid ----
+GRID_BODY = {
+    "current_balance": "10000.00",
+    "annual_salary": "40000.00",
+    "years": 40,
+    "rate_of_return": ["0.03", "0.04", "0.05", "0.06", "0.07"],
+    "contribution_rate": ["0.06", "0.08", "0.10", "0.12", "0.14"],
+    "salary_growth": ["0.01", "0.02", "0.03", "0.04"],
+}
+
+
+def grid_benchmarks() -> List[Benchmark]:
+    inp = models.DCGridInput(**GRID_BODY)
+    cells = (
+        len(inp.rate_of_return) * len(inp.contribution_rate) * len(inp.salary_growth)
+    )
+    return [
+        Benchmark(
+            f"grid.dc_grid[cells={cells},years=40]",
+            lambda: lambda: grid.dc_grid(inp),
+            {"cells": cells, "years": 40},
+            ops=cells,
+        )
+    ]
+
+
+# ---- Money primitives ----
+def money_benchmarks() -> List[Benchmark]:
+    a, b = Money("12345.67"), Money("3.21")
+    return [
+        Benchmark("money.construct[str]", lambda: lambda: Money("12345.67")),
+        Benchmark(
+            "money.construct[Decimal]", lambda: lambda: Money(Decimal("12345.67"))
+        ),
+        Benchmark("money.add", lambda: lambda: a + b),
+        Benchmark("money.sub", lambda: lambda: a - b),
+        Benchmark("money.mul", lambda: lambda: a * b),
+        Benchmark("money.truediv", lambda: lambda: a / b),
+        Benchmark("money.quantize", lambda: lambda: a.quantize()),
+    ]
+
+
+# ---- ASGI endpoints ----
+ENDPOINT_REQUESTS = 50
+DC_BODY = {
+    "current_balance": "10000.00",
+    "annual_salary": "40000.00",
+    "years": 40,
+    "assumptions": {
+        "contribution_rate": "0.10",
+        "salary_growth": "0.02",
+        "rate_of_return": "0.05",
+    },
+}
+
+
+def _asgi_benchmark(name: str, app, method: str, path: str, **request_kwargs):
+    """Time ENDPOINT_REQUESTS sequential in-process requests (one event loop per call)."""
+    import httpx
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            for _ in range(ENDPOINT_REQUESTS):
+                resp = await c.request(method, path, **request_kwargs)
+                if resp.status_code >= 400:
+                    raise RuntimeError(
+                        f"{path} -> {resp.status_code}: {resp.text[:200]}"
+                    )
+
+    return Benchmark(
+        name, lambda: lambda: asyncio.run(_run()), {"path": path}, ops=ENDPOINT_REQUESTS
+    )
+
+
+def endpoint_benchmarks() -> List[Benchmark]:
+    import logging
+
+    from fastapi import FastAPI
+
+    from api.auth_deps import verify_jwt
+    from api.main import app as main_app
+    from api.routes import router
+
+    # request logging would dominate the numbers; benchmark the handlers
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # the pensionlib router (also mounted in api.main under /v1) with auth
+    # stubbed out (signature checks are not the subject)
+    routes_app = FastAPI()
+    routes_app.include_router(router)
+    routes_app.dependency_overrides[verify_jwt] = lambda: {"user_id": 0}
+
+    csv_rows = [
+        "current_balance,annual_salary,years,contribution_rate,salary_growth,rate_of_return"
+    ]
+    csv_rows += ["10000,40000,40,0.10,0.02,0.05"] * 100
+    batch_csv = ("\n".join(csv_rows) + "\n").encode()
+
+    return [
+        _asgi_benchmark(
+            "asgi.main.dc_project", main_app, "POST", "/v1/dc/project", json=DC_BODY
+        ),
+        _asgi_benchmark(
+            "asgi.main.dc_project[precision=fast]",
+            main_app,
+            "POST",
+            "/v1/dc/project",
+            json=dict(DC_BODY, precision="fast"),
+        ),
+        _asgi_benchmark(
+            "asgi.routes.dc_balances", routes_app, "POST", "/dc/balances", json=DC_BODY
+        ),
+        _asgi_benchmark(
+            "asgi.routes.dc_balances[precision=fast]",
+            routes_app,
+            "POST",
+            "/dc/balances",
+            json=dict(DC_BODY, precision="fast"),
+        ),
+        _asgi_benchmark(
+            "asgi.routes.annuity_convert",
+            routes_app,
+            "POST",
+            "/annuity/convert",
+            json={
+                "lump_sum": "250000",
+                "rate_of_return": "0.04",
+                "payment_periods": 240,
+            },
+        ),
+        _asgi_benchmark(
+            "asgi.routes.solve_contribution_rate",
+            routes_app,
+            "POST",
+            "/solve/contribution_rate",
+            json=SOLVE_CONTRIBUTION_BODY,
+        ),
+        _asgi_benchmark(
+            "asgi.routes.dc_grid", routes_app, "POST", "/dc/grid", json=GRID_BODY
+        ),
+        _asgi_benchmark(
+            "asgi.routes.batch_dc_project[rows=100]",
+            routes_app,
+            "POST",
+            "/batch/dc_project",
+            files={"file": ("bench.csv", batch_csv, "text/csv")},
+        ),
+    ]
+
+
+def all_benchmarks(include_endpoints: bool = True) -> List[Benchmark]:
+    benches = (
+        calculation_benchmarks()
+        + engine_benchmarks()
+        + model_point_benchmarks()
+        + solver_benchmarks()
+        + grid_benchmarks()
+        + money_benchmarks()
+    )
+    if include_endpoints:
+        benches += endpoint_benchmarks()
+    return benches
+
+
+def uncovered_calculations(benches: List[Benchmark]) -> List[str]:
+    """Public pensionlib.calculations functions with no benchmark (keeps the suite honest)."""
+    names = {
+        b.name.split("[")[0].split(".")[1]
+        for b in benches
+        if b.name.startswith("calculations.")
+    }
+    return [
+        name
+        for name, fn in inspect.getmembers(calculations, inspect.isfunction)
+        if fn.__module__ == calculations.__name__
+        and not name.startswith("_")
+        and name not in names
+    ]
+
+
+# ---- runner ----
+def measure(bench: Benchmark, repeat: int, min_time: float) -> dict:
+    fn = bench.setup()
+    fn()  # warm-up (imports, caches)
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    per_call = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(per_call)
+    return {
+        "params": bench.params,
+        "ops_per_call": bench.ops,
+        "calls_per_sample": number,
+        "samples": repeat,
+        "median_us": median * 1e6,
+        "min_us": min(per_call) * 1e6,
+        "max_us": max(per_call) * 1e6,
+        "per_op_us": median / bench.ops * 1e6,
+        "ops_per_sec": bench.ops / median if median else None,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def run(benches: List[Benchmark], repeat: int, min_time: float) -> dict:
+    results: Dict[str, dict] = {}
+    for bench in benches:
+        results[bench.name] = measure(bench, repeat, min_time)
+        r = results[bench.name]
+        print(
+            f"{bench.name:<60} {r['per_op_us']:>12.2f} us/op {r['ops_per_sec']:>14,.0f} op/s",
+            flush=True,
+        )
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "min_time": min_time,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Print a comparison table; return names of benchmarks slower than the threshold."""
+    regressions = []
+    print(f"\n{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<60} {'-':>12} {cur['per_op_us']:>12.2f}      new")
+            continue
+        ratio = cur["per_op_us"] / base["per_op_us"] if base["per_op_us"] else 1.0
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1.0 - threshold:
+            flag = "  faster"
+        print(
+            f"{name:<60} {base['per_op_us']:>12.2f} {cur['per_op_us']:>12.2f} "
+            f"{(ratio - 1.0) * 100:>+7.1f}%{flag}"
+        )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", "-o", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON produced by --output")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument(
+        "--filter", "-k", help="only run benchmarks whose name contains this"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per sample"
+    )
+    parser.add_argument("--quick", action="store_true", help="repeat=3, min-time=0.05")
+    parser.add_argument(
+        "--no-endpoints", action="store_true", help="skip ASGI benchmarks"
+    )
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.05
+
+    benches = all_benchmarks(include_endpoints=not args.no_endpoints)
+    missing = uncovered_calculations(benches)
+    if missing:
+        print(
+            f"warning: no benchmark for calculations.{', '.join(missing)}",
+            file=sys.stderr,
+        )
+    if args.filter:
+        benches = [b for b in benches if args.filter in b.name]
+
+    current = run(benches, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(current, fh, indent=2, sort_keys=True)
+        print(f"\nwrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
 if __name__ == "__main__":
-    print("Add micro-benchmarks for pensionlib here.")
+    sys.exit(main())
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Closed-loop load generator for the FastAPI and Django services.
+
+By default the FastAPI app (api.main) is driven in-process through
+httpx.ASGITransport. The Django proxy endpoints forward to FastAPI over real
+HTTP, and Django's `api` app cannot share a process with FastAPI's `api`
+package, so for them the FastAPI app is also served on an ephemeral localhost
+port from a background thread and Django runs under uvicorn in a child process
+on localhost. Pass --fastapi-url / --django-url to drive already-running
+servers instead.
+
+Targets (--mix name=weight,...):
+  dc_project    POST {fastapi}/v1/dc/project                 (exact precision)
+  dc_preview    POST {fastapi}/v1/dc/project  precision=fast (interactive preview)
+  batch         POST {fastapi}/v1/batch/dc_project   (--batch-rows rows per upload)
+  django_proxy  POST {django}/api/v1/proxy/dc/project/
+
+Usage:
+  python scripts/loadtest.py --concurrency 1,8,32 --requests 500
+  python scripts/loadtest.py --mix dc_project=8,batch=1,django_proxy=1 --duration 10 -o load.json
+
+For every concurrency level and target it reports throughput, error rate,
+latency percentiles (p50/p90/p99/max) and a latency histogram.
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ACTUARIAL_ROOT = os.path.join(REPO_ROOT, "actuarial-fastapi")
+BACKEND_DJANGO = os.path.join(REPO_ROOT, "backend-django")
+if ACTUARIAL_ROOT not in sys.path:
+    sys.path.insert(0, ACTUARIAL_ROOT)
+# the in-process app sees every virtual user as one client: do not rate limit it
+os.environ.setdefault("RATE_LIMIT_MAX", "0")
+
+import httpx  # noqa: E402
+
+HISTOGRAM_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+DC_BODY = {
+    "current_balance": "10000.00",
+    "annual_salary": "40000.00",
+    "years": 40,
+    "assumptions": {
+        "contribution_rate": "0.10",
+        "salary_growth": "0.02",
+        "rate_of_return": "0.05",
+    },
+}
+
+
+def _batch_csv(rows: int) -> bytes:
+    lines = [
+        "current_balance,annual_salary,years,contribution_rate,salary_growth,rate_of_return"
+    ]
+    lines += ["10000,40000,40,0.10,0.02,0.05"] * rows
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _mint_token() -> str:
+    import jwt
+
+    from api.auth_deps import ALGORITHM, JWT_SIGNING_KEY
+
+    payload = {"user_id": 0, "token_type": "access", "exp": int(time.time()) + 3600}
+    return jwt.encode(payload, JWT_SIGNING_KEY, algorithm=ALGORITHM)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _fastapi_app():
+    """api.main's app (it mounts the pensionlib router under /v1 itself)."""
+    from api.main import app
+
+    return app
+
+
+def _serve_in_thread(app) -> str:
+    """Start uvicorn for `app` on an ephemeral localhost port; return its base URL."""
+    import uvicorn
+
+    port = _free_port()
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, name="loadtest-fastapi", daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("in-process FastAPI server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def _spawn_django(fastapi_base: str):
+    """Run Django's ASGI app under uvicorn on localhost; return (base URL, process)."""
+    port = _free_port()
+    env = dict(os.environ, FASTAPI_BASE_URL=fastapi_base.rstrip("/") + "/v1")
+    env.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.asgi:application",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DJANGO,
+        env=env,
+    )
+    deadline = time.time() + 30
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                break
+        except OSError:
+            if proc.poll() is not None or time.time() > deadline:
+                proc.kill()
+                raise RuntimeError("Django server did not start")
+            time.sleep(0.1)
+    return f"http://127.0.0.1:{port}", proc
+
+
+class Target:
+    def __init__(
+        self, name: str, client: httpx.AsyncClient, method: str, path: str, **kw
+    ):
+        self.name = name
+        self.client = client
+        self.method = method
+        self.path = path
+        self.kwargs = kw
+
+
+class Stats:
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+        self.status_counts: Dict[str, int] = {}
+
+    def record(self, latency_ms: float, status: str, ok: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        lat = sorted(self.latencies_ms)
+        n = len(lat)
+
+        def pct(p: float) -> Optional[float]:
+            if not lat:
+                return None
+            return round(lat[min(n - 1, max(0, int(round(p / 100.0 * n)) - 1))], 3)
+
+        # non-cumulative counts per upper bound (ms); "+Inf" catches the tail
+        counts = [0] * (len(HISTOGRAM_MS) + 1)
+        for value in lat:
+            counts[bisect.bisect_left(HISTOGRAM_MS, value)] += 1
+        histogram = dict(zip([str(b) for b in HISTOGRAM_MS] + ["+Inf"], counts))
+        return {
+            "requests": n,
+            "errors": self.errors,
+            "error_rate": (self.errors / n) if n else 0.0,
+            "throughput_rps": (n / elapsed) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": pct(50),
+                "p90": pct(90),
+                "p99": pct(99),
+                "max": round(lat[-1], 3) if lat else None,
+                "mean": round(sum(lat) / n, 3) if n else None,
+            },
+            "histogram": histogram,
+            "status": self.status_counts,
+        }
+
+
+async def run_level(
+    targets: List[Target],
+    weights: List[float],
+    concurrency: int,
+    total_requests: Optional[int],
+    duration: Optional[float],
+    seed: int,
+) -> dict:
+    per_target = {t.name: Stats() for t in targets}
+    issued = 0
+    started = time.perf_counter()
+    stop_at = started + duration if duration else None
+
+    async def worker(worker_id: int):
+        nonlocal issued
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            if total_requests is not None and issued >= total_requests:
+                return
+            if stop_at is not None and time.perf_counter() >= stop_at:
+                return
+            issued += 1
+            target = rng.choices(targets, weights=weights)[0]
+            t0 = time.perf_counter()
+            try:
+                resp = await target.client.request(
+                    target.method, target.path, **target.kwargs
+                )
+                status, ok = str(resp.status_code), resp.status_code < 400
+            except Exception as exc:
+                status, ok = type(exc).__name__, False
+            per_target[target.name].record(
+                (time.perf_counter() - t0) * 1000.0, status, ok
+            )
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    overall = Stats()
+    for stats in per_target.values():
+        overall.latencies_ms += stats.latencies_ms
+        overall.errors += stats.errors
+        for k, v in stats.status_counts.items():
+            overall.status_counts[k] = overall.status_counts.get(k, 0) + v
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "overall": overall.summary(elapsed),
+        "targets": {
+            name: s.summary(elapsed) for name, s in per_target.items() if s.latencies_ms
+        },
+    }
+
+
+def _parse_mix(raw: str) -> Dict[str, float]:
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def main_async(args) -> dict:
+    import logging
+
+    # keep request logging out of the measurements (and the terminal)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    mix = _parse_mix(args.mix)
+    unknown = set(mix) - {"dc_project", "dc_preview", "batch", "django_proxy"}
+    if unknown:
+        raise SystemExit(f"unknown target(s) in --mix: {', '.join(sorted(unknown))}")
+
+    headers = {"Authorization": f"Bearer {args.token or _mint_token()}"}
+    timeout = httpx.Timeout(args.timeout)
+    clients: List[httpx.AsyncClient] = []
+    django_proc = None
+
+    fastapi_client = django_client = None
+    if {"dc_project", "dc_preview", "batch"} & set(mix):
+        if args.fastapi_url:
+            fastapi_client = httpx.AsyncClient(
+                base_url=args.fastapi_url, headers=headers, timeout=timeout
+            )
+        else:
+            fastapi_client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=_fastapi_app()),
+                base_url="http://fastapi",
+                headers=headers,
+                timeout=timeout,
+            )
+        clients.append(fastapi_client)
+
+    if "django_proxy" in mix:
+        django_url = args.django_url
+        if not django_url:
+            # the proxy view calls FastAPI over HTTP: give it a real server
+            fastapi_base = args.fastapi_url or _serve_in_thread(_fastapi_app())
+            django_url, django_proc = _spawn_django(fastapi_base)
+        django_client = httpx.AsyncClient(
+            base_url=django_url, headers=headers, timeout=timeout
+        )
+        clients.append(django_client)
+
+    targets: List[Target] = []
+    weights: List[float] = []
+    for name, weight in mix.items():
+        if name == "dc_project":
+            targets.append(
+                Target(name, fastapi_client, "POST", "/v1/dc/project", json=DC_BODY)
+            )
+        elif name == "dc_preview":
+            targets.append(
+                Target(
+                    name,
+                    fastapi_client,
+                    "POST",
+                    "/v1/dc/project",
+                    json=dict(DC_BODY, precision="fast"),
+                )
+            )
+        elif name == "batch":
+            csv_bytes = _batch_csv(args.batch_rows)
+            targets.append(
+                Target(
+                    name,
+                    fastapi_client,
+                    "POST",
+                    "/v1/batch/dc_project",
+                    files={"file": ("load.csv", csv_bytes, "text/csv")},
+                )
+            )
+        else:
+            targets.append(
+                Target(
+                    name,
+                    django_client,
+                    "POST",
+                    "/api/v1/proxy/dc/project/",
+                    json=DC_BODY,
+                )
+            )
+        weights.append(weight)
+
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            result = await run_level(
+                targets,
+                weights,
+                concurrency,
+                None if args.duration else args.requests,
+                args.duration,
+                args.seed,
+            )
+            levels.append(result)
+            o = result["overall"]
+            print(
+                f"c={concurrency:<4} {o['requests']:>7} req {o['throughput_rps']:>9.1f} req/s "
+                f"p50={o['latency_ms']['p50']}ms p99={o['latency_ms']['p99']}ms "
+                f"errors={o['error_rate']:.2%}",
+                flush=True,
+            )
+            for name, t in result["targets"].items():
+                print(
+                    f"       {name:<14} {t['requests']:>7} req "
+                    f"p50={t['latency_ms']['p50']}ms p90={t['latency_ms']['p90']}ms "
+                    f"p99={t['latency_ms']['p99']}ms errors={t['error_rate']:.2%}",
+                    flush=True,
+                )
+    finally:
+        for client in clients:
+            await client.aclose()
+        if django_proc is not None:
+            django_proc.terminate()
+            django_proc.wait(timeout=10)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "mix": mix,
+            "requests_per_level": None if args.duration else args.requests,
+            "duration_per_level_s": args.duration,
+            "batch_rows": args.batch_rows,
+            "in_process": not (args.fastapi_url or args.django_url),
+        },
+        "levels": levels,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[1, 8, 32],
+        help="comma-separated concurrency levels",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="requests per level")
+    parser.add_argument(
+        "--duration", type=float, help="seconds per level (overrides --requests)"
+    )
+    parser.add_argument("--mix", default="dc_project=1", help="target=weight,...")
+    parser.add_argument("--batch-rows", type=int, default=50)
+    parser.add_argument("--fastapi-url", help="e.g. http://127.0.0.1:8001")
+    parser.add_argument("--django-url", help="e.g. http://127.0.0.1:8000")
+    parser.add_argument("--token", help="Bearer token (default: minted locally)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"wrote {args.output}")
+    failed = any(level["overall"]["errors"] for level in report["levels"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,122 @@
-﻿#!/usr/bin/env python3
+#!/usr/bin/env python3
 """
-Seed synthetic dataset (placeholder).
+Generate synthetic projection CSVs for the FastAPI /batch/dc_project endpoint
+and benchmarks, without touching a database.
+
+Rows are streamed to disk, so 10M-row files need no more memory than 10k-row
+ones, and output is byte-for-byte deterministic for a given --seed and --rows.
+
+    python scripts/seed_synthetic.py --rows 1m -o proj_1m.csv
+    python scripts/seed_synthetic.py --rows 10k --rows 1m --rows 10m -o proj_{rows}.csv
+
+To seed the Django database (companies, members, accounts, transactions) use
+the management command instead, which can also write the matching CSV:
+
+    python backend-django/manage.py seed_synthetic --companies 20 \\
+        --members-per-company 50000 --seed 7 --projection-csv proj_seeded.csv
 """
+
+import argparse
+import csv
+import random
+import sys
+import time
+
+COLUMNS = (
+    "current_balance",
+    "annual_salary",
+    "years",
+    "contribution_rate",
+    "salary_growth",
+    "rate_of_return",
+)
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+# assumption grids are small so generated files compress well and hit caches
+# realistically; balances/salaries/years are drawn per row
+CONTRIBUTION_RATES = ("0.05", "0.08", "0.10", "0.12", "0.15")
+SALARY_GROWTHS = ("0.02", "0.025", "0.03", "0.035")
+RATES_OF_RETURN = ("0.04", "0.05", "0.06", "0.07")
+
+
+def parse_rows(raw: str) -> int:
+    raw = raw.strip().lower()
+    mult = SUFFIXES.get(raw[-1:], 1)
+    digits = raw[:-1] if raw[-1:] in SUFFIXES else raw
+    try:
+        n = int(float(digits) * mult)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid row count: {raw!r}")
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"invalid row count: {raw!r}")
+    return n
+
+
+def generate_rows(n: int, seed: int):
+    """Yield `n` CSV rows (tuples of str) deterministically for `seed`."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield (
+            f"{rng.randint(0, 5_000_000) / 100:.2f}",
+            f"{rng.randint(1_500_000, 15_000_000) / 100:.2f}",
+            str(rng.randint(1, 43)),
+            rng.choice(CONTRIBUTION_RATES),
+            rng.choice(SALARY_GROWTHS),
+            rng.choice(RATES_OF_RETURN),
+        )
+
+
+def write_csv(path: str, n: int, seed: int, chunk: int = 10_000) -> None:
+    out = sys.stdout if path == "-" else open(path, "w", newline="")
+    try:
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+        rows = generate_rows(n, seed)
+        buf = []
+        for row in rows:
+            buf.append(row)
+            if len(buf) >= chunk:
+                writer.writerows(buf)
+                buf.clear()
+        writer.writerows(buf)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rows",
+        type=parse_rows,
+        action="append",
+        help="row count, e.g. 10000, 10k, 1m (repeatable; default 10k)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="proj_{rows}.csv",
+        help="output path; '{rows}' is replaced by the row count, '-' for stdout",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sizes = args.rows or [10_000]
+    if len(sizes) > 1 and "{rows}" not in args.output:
+        parser.error("--output must contain '{rows}' when several sizes are given")
+
+    for n in sizes:
+        path = args.output.replace("{rows}", str(n))
+        started = time.perf_counter()
+        write_csv(path, n, args.seed)
+        if path != "-":
+            elapsed = time.perf_counter() - started
+            print(
+                f"{path}: {n} rows in {elapsed:.1f}s ({n / max(elapsed, 1e-9):,.0f} rows/s)",
+                file=sys.stderr,
+            )
+    return 0
+
+
 if __name__ == "__main__":
-    print("Run your data generation logic here.")
+    sys.exit(main())